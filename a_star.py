@@ -1,79 +1,101 @@
 # I M P O R T S   &   D E P E N D E N C I E S ----------------------
-import heapq
-from typing import Dict, Set, Tuple, Optional, Callable
+from typing import TYPE_CHECKING, Dict, Set, Tuple, Optional, Callable
 
+from compiledGraph import as_compiled
+from priorityQueues import make_queue
+from searchState import SearchState
 
-# A*   A L G O R I T H M -------------------------------------------
-def a_star(graph, start_node: int, end_node: int, heuristic: Callable[[int, int], float], positions: Dict[int, Tuple[float, float]]) -> Tuple[Dict[int, float], Dict[int, Optional[int]], Set[int]]:
-
-    # Validate input nodes
-    graph_nodes = set(graph.nodes())
-    if start_node not in graph_nodes or end_node not in graph_nodes:
-        raise ValueError("Start or end node not in graph")
-
-    # Initialize data structures
-    g_score = {node: float('infinity') for node in graph_nodes}
-    f_score = {node: float('infinity') for node in graph_nodes}
-    g_score[start_node] = 0
-    f_score[start_node] = heuristic(start_node, end_node)
-
-    # Track previous nodes for path reconstruction
-    previous: Dict[int, Optional[int]] = {node: None for node in graph_nodes}
+if TYPE_CHECKING:
+    from instrumentation import SearchStats
 
-    # Priority queue and visited tracking
-    open_set = []
-    heapq.heappush(open_set, (f_score[start_node], start_node))
 
-    # Keep track of nodes in open set to avoid duplicates
-    in_open_set = {start_node}
-
-    # Efficiently track visited nodes
-    visited: Set[int] = set()
+# A*   A L G O R I T H M -------------------------------------------
+# graph may be an osmnx graph (compiled once and cached) or a CompiledGraph
+# state defaults to the graph's shared SearchState, so nothing O(V) is allocated per query
+# stats (an instrumentation.SearchStats) collects counters and phase timings; None runs uninstrumented
+# queue picks the priority queue backend (see priorityQueues.QUEUE_BACKENDS); the default is plain heapq
+def a_star(graph, start_node: int, end_node: int, heuristic: Callable[[int, int], float], positions: Dict[int, Tuple[float, float]], state: Optional[SearchState] = None, stats: Optional['SearchStats'] = None, queue: str = 'heapq') -> Tuple[Dict[int, float], Dict[int, Optional[int]], Set[int]]:
+
+    # Work on the compact CSR form (validates input nodes)
+    compiled = as_compiled(graph)
+    offsets, targets, weights = compiled.adjacency()
+    node_list = compiled.node_list()
+    source = compiled.node_index(start_node)
+    target = compiled.node_index(end_node)
+
+    # Start a new epoch: every node not stamped with it has g_score infinity
+    state = state or compiled.search_state()
+    epoch = state.begin(source)
+    g_score, previous, stamp, closed = state.dist, state.prev, state.stamp, state.closed
+    touched, settled = state.touched, state.settled
+
+    # Heuristic providers (e.g. HaversineHeuristic) score by index with the target hoisted;
+    # plain callables keep the heuristic(osm_id, osm_id) contract
+    if hasattr(heuristic, 'for_target'):
+        h = heuristic.for_target(target)
+    else:
+        h = lambda node: heuristic(node_list[node], end_node)
+
+    # Heap operations as locals (swapped for timed wrappers when instrumented)
+    open_set, push, pop = make_queue(queue)
+    if stats is not None:
+        push, pop, h = stats.begin('a_star', push, pop, h)
+    pops = 0
+    found = False
+
+    # Priority queue of (f_score, node); improved nodes are re-pushed (or decreased in place by the
+    # indexed backend) and stale entries skipped
+    push(open_set, (h(source), source))
 
     while open_set:
 
         # Get the node with lowest f_score
-        _, current_node = heapq.heappop(open_set)
-        in_open_set.remove(current_node)
+        _, current_node = pop(open_set)
+        pops += 1
 
         # if same node don't calculate
-        if current_node == end_node:
+        if current_node == target:
+            found = True
             break
 
+        # Skip stale entries for nodes already expanded
+        if closed[current_node] == epoch:
+            continue
+
         # Mark node as visited
-        visited.add(current_node)
+        closed[current_node] = epoch
+        settled.append(current_node)
+        current_g = g_score[current_node]
 
         # Explore neighbors
-        for neighbor in graph.neighbors(current_node):
-            # Skip already visited nodes
-            if neighbor in visited:
-                continue
+        for edge in range(offsets[current_node], offsets[current_node + 1]):
+            neighbor = targets[edge]
 
-            # Get edge weight using length from OSMMX
-            try:
-                edge_data = graph.get_edge_data(current_node, neighbor)[0]
-                edge_length = edge_data.get('length', 1)  # in meters
-                
-            except Exception as e:
-                print(f"Error getting edge data: {e}")
+            # Skip already visited nodes
+            if closed[neighbor] == epoch:
                 continue
 
             # Calculate tentative g_score
-            tentative_g_score = g_score[current_node] + edge_length
+            tentative_g_score = current_g + weights[edge]
+
+            # First time reached this query
+            if stamp[neighbor] != epoch:
+                stamp[neighbor] = epoch
+                touched.append(neighbor)
 
             # Potentially better path
-            if tentative_g_score < g_score[neighbor]:
-                # Update tracking
-                previous[neighbor] = current_node
-                g_score[neighbor] = tentative_g_score
+            elif tentative_g_score >= g_score[neighbor]:
+                continue
+
+            # Update tracking
+            previous[neighbor] = current_node
+            g_score[neighbor] = tentative_g_score
 
-                # Calculate f_score
-                f_new = tentative_g_score + heuristic(neighbor, end_node)
-                f_score[neighbor] = f_new
+            # Calculate f_score and push with the improved priority
+            f_new = tentative_g_score + h(neighbor)
+            push(open_set, (f_new, neighbor))
 
-                # Add to open set if not already there
-                if neighbor not in in_open_set:
-                    heapq.heappush(open_set, (f_new, neighbor))
-                    in_open_set.add(neighbor)
+    if stats is not None:
+        stats.end(compiled, state, pops, len(open_set), found, open_set)
 
-    return g_score, previous, visited
+    return compiled.export_search(state)
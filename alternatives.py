@@ -0,0 +1,299 @@
+# I M P O R T S   &   D E P E N D E N C I E S ----------------------
+import argparse
+import heapq
+import random
+import sys
+import time
+from typing import Dict, List, NamedTuple, Optional, Set, Tuple
+
+import numpy as np
+
+from compiledGraph import as_compiled
+from dijkstras import dijkstra, dijkstra_tree
+
+# C O N S T A N T S ------------------------------------------------
+
+# Alternatives may be at most this much longer than the shortest route
+MAX_STRETCH = 1.4
+
+# ... and share at most this fraction of their length with any route already chosen
+MAX_OVERLAP = 0.7
+
+# Wall-clock cap per request; whatever has been accepted when it runs out is returned
+MAX_MILLISECONDS = 100.0
+
+
+# A L T E R N A T I V E   R O U T E S ------------------------------
+
+# One route of a k-alternatives answer (path as OSM ids)
+#   stretch -> distance / shortest distance
+#   overlap -> largest share of its length used by an earlier route in the answer
+#   method  -> 'shortest', 'via' (via-node over the two shared trees) or 'spur' (Yen spur search)
+class Alternative(NamedTuple):
+    distance: float
+    path: List[int]
+    stretch: float
+    overlap: float
+    method: str
+
+
+# Every k-alternatives query: the routes plus what it cost
+class AlternativesResult(NamedTuple):
+    routes: List[Alternative]
+    nodes_visited: int
+    elapsed: float
+    timed_out: bool
+
+
+# Cheapest CSR weight of each consecutive (u, v) on an index path
+def _edge_weights(offsets, targets, weights, path: List[int]) -> List[float]:
+    costs = []
+    for u, v in zip(path, path[1:]):
+        costs.append(min(weights[edge] for edge in range(offsets[u], offsets[u + 1]) if targets[edge] == v))
+    return costs
+
+
+# Path from source to a via node (forward tree) and on to the target (reverse tree), as indices
+# The trees are plain lists here (indexing NumPy arrays one scalar at a time is far slower)
+# Returns None if the two halves meet in a loop
+def _via_path(forward_prev: List[int], backward_prev: List[int], via: int) -> Optional[List[int]]:
+    head = [via]
+    while forward_prev[head[-1]] >= 0:
+        head.append(forward_prev[head[-1]])
+    on_head = set(head)
+    head.reverse()
+
+    node = backward_prev[via]
+    while node >= 0:
+        if node in on_head:
+            return None
+        head.append(node)
+        node = backward_prev[node]
+    return head
+
+
+# Yen spur search from `spur` to `target`, as A* with the reverse tree as heuristic
+# The reverse tree holds exact distances to the target in the unmodified graph, which stay lower
+# bounds once nodes and edges are banned, so the search is admissible, expands little beyond the
+# detour it is looking for, and gives up as soon as every open path exceeds `limit`.
+# Returns (cost, index path) or None.
+def _spur_search(offsets, targets, weights, to_target: List[float], spur: int, target: int, limit: float,
+                 banned_nodes: Set[int], banned_edges: Set[int]) -> Tuple[Optional[Tuple[float, List[int]]], int]:
+    distances: Dict[int, float] = {spur: 0.0}
+    previous: Dict[int, int] = {}
+    closed: Set[int] = set()
+    pq = [(to_target[spur], 0.0, spur)]
+
+    while pq:
+        estimate, distance, node = heapq.heappop(pq)
+        if estimate > limit:
+            break
+        if node in closed:
+            continue
+        closed.add(node)
+
+        if node == target:
+            path = [node]
+            while path[-1] != spur:
+                path.append(previous[path[-1]])
+            return (distance, path[::-1]), len(closed)
+
+        for edge in range(offsets[node], offsets[node + 1]):
+            neighbor = targets[edge]
+            if neighbor in closed or neighbor in banned_nodes or edge in banned_edges:
+                continue
+            candidate = distance + weights[edge]
+            if candidate < distances.get(neighbor, float('inf')):
+                distances[neighbor] = candidate
+                previous[neighbor] = node
+                heapq.heappush(pq, (candidate + to_target[neighbor], candidate, neighbor))
+
+    return None, len(closed)
+
+
+# Up to k reasonable routes from start_node to end_node, shortest first
+# 1. One forward tree from the start and one reverse tree to the end, both bounded at
+#    max_stretch * shortest, give every via-node route s -> v -> t without further searches
+# 2. If that yields fewer than k, Yen's spur searches over the accepted routes fill in, pruned
+#    by the same bound and guided by the reverse tree
+# Candidates longer than max_stretch * shortest or sharing more than max_overlap of their length
+# with an accepted route are dropped. The whole query stops after max_ms milliseconds.
+def alternative_routes(graph, start_node: int, end_node: int, k: int = 3, max_stretch: float = MAX_STRETCH,
+                       max_overlap: float = MAX_OVERLAP, max_ms: float = MAX_MILLISECONDS) -> AlternativesResult:
+    query_start_time = time.perf_counter()
+    deadline = query_start_time + max_ms / 1000
+
+    compiled = as_compiled(graph)
+    offsets, targets, weights = compiled.adjacency()
+    source, target = compiled.node_index(start_node), compiled.node_index(end_node)
+    node_ids = compiled.node_ids
+
+    # The shortest distance fixes the bound both shared trees are grown to
+    distances, _, visited = dijkstra(compiled, start_node, end_node)
+    shortest = distances[end_node]
+    if shortest == float('inf'):
+        return AlternativesResult([], len(visited), time.perf_counter() - query_start_time, False)
+    bound = shortest * max_stretch
+
+    # Beyond the bound the trees only hold tentative distances; mark those nodes unreachable, which
+    # is exact for pruning because any route through them is longer than the bound
+    from_source, forward_prev = dijkstra_tree(compiled, start_node, budget=bound)
+    to_target, backward_prev = dijkstra_tree(compiled, end_node, reverse=True, budget=bound)
+    from_source[from_source > bound] = np.inf
+    to_target[to_target > bound] = np.inf
+    forward_prev, backward_prev = forward_prev.tolist(), backward_prev.tolist()
+    nodes_visited = len(visited) + int(np.isfinite(from_source).sum() + np.isfinite(to_target).sum())
+
+    accepted: List[Tuple[List[int], float, float, str]] = []
+    accepted_edges: List[Dict[Tuple[int, int], float]] = []
+    seen_paths: Set[Tuple[int, ...]] = set()
+
+    # Accepts a candidate index path if it passes the stretch and overlap filters
+    def consider(path: List[int], method: str) -> bool:
+        key = tuple(path)
+        if key in seen_paths:
+            return False
+        seen_paths.add(key)
+
+        costs = _edge_weights(offsets, targets, weights, path)
+        length = sum(costs)
+        if length > bound + 1e-9:
+            return False
+        overlap = 0.0
+        if length > 0:
+            for edges in accepted_edges:
+                shared = sum(cost for u, v, cost in zip(path, path[1:], costs) if (u, v) in edges)
+                overlap = max(overlap, shared / length)
+                if overlap > max_overlap:
+                    return False
+        accepted.append((path, length, overlap, method))
+        accepted_edges.append({(u, v): cost for u, v, cost in zip(path, path[1:], costs)})
+        return True
+
+    consider(_via_path(forward_prev, backward_prev, target), 'shortest')
+
+    # Via nodes in order of the detour through them; nodes already on a built route are skipped,
+    # since every via node of a route rebuilds that same route
+    via_cost = from_source + to_target
+    candidates = np.flatnonzero(via_cost <= bound)
+    candidates = candidates[np.argsort(via_cost[candidates], kind='stable')]
+    covered = np.zeros(compiled.num_nodes, dtype=bool)
+    timed_out = False
+    for via in candidates.tolist():
+        if len(accepted) >= k:
+            break
+        if time.perf_counter() > deadline:
+            timed_out = True
+            break
+        if covered[via]:
+            continue
+        path = _via_path(forward_prev, backward_prev, via)
+        if path is None:
+            covered[via] = True
+            continue
+        covered[path] = True
+        consider(path, 'via')
+
+    # Yen spur searches around the accepted routes, cheapest candidate first
+    spur_queue: List[Tuple[float, Tuple[int, ...]]] = []
+    lower_bounds = to_target.tolist() if len(accepted) < k else []
+    spurred = 0
+    while len(accepted) < k and not timed_out:
+        if spurred < len(accepted):
+            base, _, _, _ = accepted[spurred]
+            spurred += 1
+            root_cost = 0.0
+            base_costs = _edge_weights(offsets, targets, weights, base)
+            for i, spur in enumerate(base[:-1]):
+                if time.perf_counter() > deadline:
+                    timed_out = True
+                    break
+                root = base[:i + 1]
+
+                # Leaving the spur node along any accepted route that shares this root is banned
+                banned_edges = set()
+                for path, _, _, _ in accepted:
+                    if len(path) > i + 1 and path[:i + 1] == root:
+                        banned_edges.update(edge for edge in range(offsets[spur], offsets[spur + 1])
+                                            if targets[edge] == path[i + 1])
+
+                found, settled = _spur_search(offsets, targets, weights, lower_bounds, spur, target,
+                                              bound - root_cost, set(root[:-1]), banned_edges)
+                nodes_visited += settled
+                if found is not None:
+                    spur_cost, spur_path = found
+                    heapq.heappush(spur_queue, (root_cost + spur_cost, tuple(root[:-1] + spur_path)))
+                root_cost += base_costs[i]
+            continue
+
+        if not spur_queue:
+            break
+        _, path = heapq.heappop(spur_queue)
+        consider(list(path), 'spur')
+
+    routes = [Alternative(length, node_ids[path].tolist(), length / shortest if shortest > 0 else 1.0, overlap,
+                          method)
+              for path, length, overlap, method in accepted]
+    return AlternativesResult(routes, nodes_visited, time.perf_counter() - query_start_time, timed_out)
+
+
+# M A I N ----------------------------------------------------------
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="K alternative routes: latency, stretch and overlap on random pairs")
+    parser.add_argument("graph_file", help="GraphML file (e.g. data/gainesville.graphml)")
+    parser.add_argument("-k", type=int, default=3, help="Routes per query, shortest included")
+    parser.add_argument("--queries", type=int, default=100, help="Random OD pairs")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--max-stretch", type=float, default=MAX_STRETCH)
+    parser.add_argument("--max-overlap", type=float, default=MAX_OVERLAP)
+    parser.add_argument("--max-ms", type=float, default=MAX_MILLISECONDS, help="Latency cap per query")
+    args = parser.parse_args(argv)
+
+    from graphCache import load_compiled
+
+    compiled = load_compiled(args.graph_file)
+    rng = random.Random(args.seed)
+    nodes = compiled.node_list()
+
+    latencies, found, methods, stretches, overlaps = [], [], {}, [], []
+    mismatches = timeouts = 0
+    for _ in range(args.queries):
+        start_node, end_node = rng.choice(nodes), rng.choice(nodes)
+        result = alternative_routes(compiled, start_node, end_node, k=args.k, max_stretch=args.max_stretch,
+                                    max_overlap=args.max_overlap, max_ms=args.max_ms)
+        if not result.routes:
+            continue
+        latencies.append(result.elapsed)
+        found.append(len(result.routes))
+        timeouts += result.timed_out
+        for route in result.routes[1:]:
+            methods[route.method] = methods.get(route.method, 0) + 1
+            stretches.append(route.stretch)
+            overlaps.append(route.overlap)
+
+        # The first route must be the shortest one
+        expected = dijkstra(compiled, start_node, end_node)[0][end_node]
+        if abs(result.routes[0].distance - expected) > 1e-6:
+            mismatches += 1
+
+    if not latencies:
+        print("No routable queries")
+        return 0
+
+    latencies.sort()
+    print(f"{len(latencies)} routable queries, k={args.k}: {np.mean(found):.2f} routes per query "
+          f"({', '.join(f'{count} {method}' for method, count in methods.items()) or 'no alternatives'})")
+    print(f"Latency p50 {latencies[len(latencies) // 2] * 1000:.1f} ms, "
+          f"p95 {latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))] * 1000:.1f} ms, "
+          f"{timeouts} hit the {args.max_ms:.0f} ms cap")
+    if stretches:
+        print(f"Alternatives: mean stretch {np.mean(stretches):.3f}, mean overlap {np.mean(overlaps):.1%}")
+
+    if mismatches:
+        print(f"{mismatches} queries where the first route is not the shortest", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
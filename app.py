@@ -1,13 +1,34 @@
 # I M P O R T S   &   D E P E N D E N C I E S ----------------------
+import importlib
+import threading
 import tkinter as tk
 from tkinter import ttk
 from tkinter import messagebox
-import os
+
+from graphRegistry import default_registry
+
+# C O N S T A N T S ------------------------------------------------
+
+# Modules the map window needs, imported in the background while the menu is on screen
+WARM_MODULES = ("main", "osmnx", "matplotlib.pyplot")
+
+
+# Imports the map window's dependencies so starting the pathfinder does not wait on them
+def warm_imports():
+    for module in WARM_MODULES:
+        try:
+            importlib.import_module(module)
+        except ImportError as e:
+            print(f"Could not preload {module}: {e}")
+
 
 # M A I N    M E N U   S E T   U P ---------------------------------
 class PathfinderMenu:
     def __init__(self, root):
         self.root = root
+
+        # City chosen on start (None if the menu was closed)
+        self.selected_city = None
         self.root.title("Florida Traffic Optimization")
         self.root.configure(bg='black')
 
@@ -55,6 +76,10 @@ class PathfinderMenu:
         city_combo.pack(pady=5)
         if city_maps:
             city_combo.set(city_maps[0])
+            self.warm_city()
+
+        # Start loading whichever city is picked before Start is pressed
+        city_combo.bind('<<ComboboxSelected>>', self.warm_city)
 
         # Start Button
         self.start_button = tk.Button(
@@ -73,15 +98,15 @@ class PathfinderMenu:
         )
         self.start_button.pack(pady=30)
 
-    # Gets list of maps from graph folerd
+    # Gets list of maps from the graph folders (discovered only, nothing is parsed here)
     def get_available_maps(self):
-        maps = []
-        data_dir = "graphml_files"
-        if os.path.exists(data_dir):
-            for file in os.listdir(data_dir):
-                if file.endswith(".graphml"):
-                    maps.append(file.replace(".graphml", ""))
-        return maps
+        return default_registry().discover()
+
+    # Loads the selected city's graph on a background thread while the menu is still open
+    def warm_city(self, event=None):
+        city = self.city_var.get()
+        if city:
+            default_registry().warm(city)
 
     # Launches main with desired city
     def start_pathfinder(self):
@@ -93,18 +118,27 @@ class PathfinderMenu:
 
         print(f"Starting pathfinder in {city}")
 
+        self.selected_city = city
         self.root.destroy()
 
+# M A I N ----------------------------------------------------------
+# Closing the map window returns to the menu; cities already loaded stay in the registry,
+# so switching back to one does not reload it
+def main():
+    threading.Thread(target=warm_imports, name="import-warm", daemon=True).start()
+
+    while True:
+        root = tk.Tk()
+        app = PathfinderMenu(root)
+        root.mainloop()
+
+        if app.selected_city is None:
+            break
+
         import main
 
         # Algorithm selectoin for main
-        main.main('dijkstra', city_map=city)
-
-# M A I N ----------------------------------------------------------
-def main():
-    root = tk.Tk()
-    app = PathfinderMenu(root)
-    root.mainloop()
+        main.main('dijkstra', city_map=app.selected_city)
 
 if __name__ == "__main__":
     main()
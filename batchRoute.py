@@ -0,0 +1,199 @@
+# I M P O R T S   &   D E P E N D E N C I E S ----------------------
+import argparse
+import csv
+import multiprocessing
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from typing import Iterable, Iterator, List, Optional, Sequence
+
+import numpy as np
+
+from a_star import a_star
+from compiledGraph import CompiledGraph
+from dijkstras import dijkstra, reconstruct_path
+from graphCache import fork_context, load_compiled, load_spatial_index
+from heuristics import HaversineHeuristic
+from spatialIndex import SpatialIndex
+
+# C O N S T A N T S ------------------------------------------------
+ALGORITHMS = ('dijkstra', 'astar')
+
+OUTPUT_COLUMNS = ['start_node', 'end_node', 'distance', 'path_nodes', 'nodes_visited', 'latency_ms', 'error']
+
+# Per-process graph, loaded once by _init_worker (inherited copy-on-write when forked)
+_compiled: Optional[CompiledGraph] = None
+_heuristic: Optional[HaversineHeuristic] = None
+_spatial: Optional[SpatialIndex] = None
+_graph_file: Optional[str] = None
+
+
+# H E L P E R   F U N C T I O N S ----------------------------------
+
+# Loads the compiled graph for this process (memory-mapped from the snapshot cache)
+def _init_worker(graph_file: str) -> None:
+    global _compiled, _heuristic, _graph_file
+    _graph_file = graph_file
+    if _compiled is None:
+        _compiled = load_compiled(graph_file)
+        _heuristic = HaversineHeuristic(_compiled)
+
+
+# Spatial index for lat/lon snapping, loaded on first use (node-id inputs never pay for it)
+def _spatial_index() -> SpatialIndex:
+    global _spatial
+    if _spatial is None:
+        _spatial = load_spatial_index(_graph_file)
+    return _spatial
+
+
+# Turns an input row into (start_node, end_node)
+#   2 columns -> node ids
+#   4 columns -> start_lat, start_lon, end_lat, end_lon (snapped to nearest nodes)
+def parse_pair(row: Sequence[str]):
+    if len(row) == 2:
+        return int(row[0]), int(row[1])
+    if len(row) == 4:
+        start_lat, start_lon, end_lat, end_lon = map(float, row)
+        nodes = _spatial_index().nearest_nodes_latlon(np.array([start_lat, end_lat]), np.array([start_lon, end_lon]))
+        return int(nodes[0]), int(nodes[1])
+    raise ValueError(f"Expected 2 or 4 columns, got {len(row)}")
+
+
+# Routes one chunk of rows inside a worker process
+def route_chunk(rows: List[List[str]], algorithm: str) -> List[list]:
+    results = []
+    for row in rows:
+        try:
+            start_node, end_node = parse_pair(row)
+
+            query_start_time = time.perf_counter()
+            if algorithm == 'astar':
+                distances, previous, visited = a_star(_compiled, start_node, end_node, _heuristic, {})
+            else:
+                distances, previous, visited = dijkstra(_compiled, start_node, end_node)
+            latency = time.perf_counter() - query_start_time
+
+            distance = distances[end_node]
+            path_nodes = len(reconstruct_path(previous, start_node, end_node)) if distance != float('inf') else 0
+            results.append([start_node, end_node, f"{distance:.3f}", path_nodes, len(visited),
+                            f"{latency * 1000:.3f}", ''])
+        except (ValueError, KeyError) as e:
+            results.append([*row[:2], '', '', '', '', str(e)])
+    return results
+
+
+# True if every non-empty cell parses as a number
+def _numeric(row: Sequence[str]) -> bool:
+    try:
+        for cell in row:
+            if cell:
+                float(cell)
+    except ValueError:
+        return False
+    return True
+
+
+# Reads OD rows lazily, skipping blank lines and an optional header (the first non-blank row, if
+# it is not numeric). Every other row must have one of `widths` fields, all non-empty; anything
+# else raises ValueError with its line number rather than being routed with shifted columns.
+def read_pairs(stream: Iterable[str], widths: Sequence[int] = (2, 4)) -> Iterator[List[str]]:
+    reader = csv.reader(stream)
+    first = True
+    for row in reader:
+        row = [cell.strip() for cell in row]
+        if not any(row):
+            continue
+        if first:
+            first = False
+            if not _numeric(row):
+                continue
+        if len(row) not in widths:
+            raise ValueError(f"line {reader.line_num}: expected {' or '.join(map(str, widths))} fields, "
+                             f"got {len(row)}")
+        if not all(row):
+            raise ValueError(f"line {reader.line_num}: field {row.index('') + 1} is empty")
+        yield row
+
+
+# Groups a row stream into fixed-size chunks
+def chunked(rows: Iterator[List[str]], size: int) -> Iterator[List[List[str]]]:
+    while True:
+        chunk = list(islice(rows, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+# B A T C H   R O U T I N G ----------------------------------------
+
+# Streams OD pairs through a process pool and writes results in input order
+# At most workers * 2 chunks are in flight, so memory stays flat for any input size
+def route_stream(graph_file: str, pairs: Iterator[List[str]], out, algorithm: str = 'dijkstra',
+                 workers: Optional[int] = None, chunk_size: int = 256) -> int:
+
+    if algorithm not in ALGORITHMS:
+        raise ValueError(f"Unknown algorithm {algorithm!r}, expected one of {ALGORITHMS}")
+
+    # Load once in the parent: builds the snapshot and lets forked workers inherit it
+    _init_worker(graph_file)
+
+    writer = csv.writer(out)
+    writer.writerow(OUTPUT_COLUMNS)
+
+    workers = workers or multiprocessing.cpu_count()
+    written = 0
+
+    with ProcessPoolExecutor(max_workers=workers, mp_context=fork_context(),
+                             initializer=_init_worker, initargs=(graph_file,)) as pool:
+        pending = deque()
+        for chunk in chunked(pairs, chunk_size):
+            pending.append(pool.submit(route_chunk, chunk, algorithm))
+
+            # Backpressure: wait on the oldest chunk before reading further
+            if len(pending) >= workers * 2:
+                rows = pending.popleft().result()
+                writer.writerows(rows)
+                written += len(rows)
+
+        while pending:
+            rows = pending.popleft().result()
+            writer.writerows(rows)
+            written += len(rows)
+
+    out.flush()
+    return written
+
+
+# M A I N ----------------------------------------------------------
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Headless batch routing over origin-destination pairs")
+    parser.add_argument("graph_file", help="GraphML file to route on")
+    parser.add_argument("--input", default="-", help="CSV of start,end node ids or start_lat,start_lon,end_lat,end_lon (default stdin)")
+    parser.add_argument("--output", default="-", help="Output CSV (default stdout)")
+    parser.add_argument("--algorithm", choices=ALGORITHMS, default='dijkstra')
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--chunk-size", type=int, default=256)
+    args = parser.parse_args(argv)
+
+    source = sys.stdin if args.input == '-' else open(args.input, newline='')
+    out = sys.stdout if args.output == '-' else open(args.output, 'w', newline='')
+
+    try:
+        batch_start_time = time.perf_counter()
+        count = route_stream(args.graph_file, read_pairs(source), out, algorithm=args.algorithm,
+                             workers=args.workers, chunk_size=args.chunk_size)
+        print(f"Routed {count} pairs in {time.perf_counter() - batch_start_time:.2f} seconds", file=sys.stderr)
+    except ValueError as e:
+        sys.exit(f"{'stdin' if args.input == '-' else args.input}: {e}")
+    finally:
+        if source is not sys.stdin:
+            source.close()
+        if out is not sys.stdout:
+            out.close()
+
+
+if __name__ == "__main__":
+    main()
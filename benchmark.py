@@ -0,0 +1,320 @@
+# I M P O R T S   &   D E P E N D E N C I E S ----------------------
+import argparse
+import json
+import os
+import platform
+import random
+import sys
+import time
+import tracemalloc
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from a_star import a_star
+from bidirectional import bidirectional_a_star, bidirectional_dijkstra
+from compiledGraph import CompiledGraph
+from dijkstras import dijkstra
+from graphRegistry import GRAPH_DIRS
+from heuristics import HaversineHeuristic
+
+# C O N S T A N T S ------------------------------------------------
+# Straight-line distance buckets in metres: (name, low, high)
+BUCKETS = (
+    ("0-1km", 0, 1000),
+    ("1-3km", 1000, 3000),
+    ("3-10km", 3000, 10000),
+    ("10km+", 10000, float('inf')),
+)
+
+# Distances closer than this count as equal when checking variants against Dijkstra
+TOLERANCE = 1e-6
+
+# A query: (start_node, end_node) -> (distance, nodes_visited)
+Query = Callable[[int, int], Tuple[float, int]]
+
+
+# A L G O R I T H M   R E G I S T R Y ------------------------------
+
+# Each factory returns a query function for a graph, or None if the mode is unavailable for it
+def _dijkstra(compiled: CompiledGraph, graph_file: str) -> Optional[Query]:
+    def query(start_node, end_node):
+        distances, _, visited = dijkstra(compiled, start_node, end_node)
+        return distances[end_node], len(visited)
+    return query
+
+
+def _a_star(compiled: CompiledGraph, graph_file: str) -> Optional[Query]:
+    heuristic = HaversineHeuristic(compiled)
+
+    def query(start_node, end_node):
+        distances, _, visited = a_star(compiled, start_node, end_node, heuristic, {})
+        return distances[end_node], len(visited)
+    return query
+
+
+# Dijkstra / A* on another priority queue backend (priorityQueues.QUEUE_BACKENDS)
+def _with_queue(algorithm: str, backend: str) -> Callable[[CompiledGraph, str], Optional[Query]]:
+    def factory(compiled: CompiledGraph, graph_file: str) -> Optional[Query]:
+        heuristic = HaversineHeuristic(compiled) if algorithm == 'a_star' else None
+
+        def query(start_node, end_node):
+            if heuristic is None:
+                distances, _, visited = dijkstra(compiled, start_node, end_node, queue=backend)
+            else:
+                distances, _, visited = a_star(compiled, start_node, end_node, heuristic, {}, queue=backend)
+            return distances[end_node], len(visited)
+        return query
+    return factory
+
+
+def _bidirectional_dijkstra(compiled: CompiledGraph, graph_file: str) -> Optional[Query]:
+    def query(start_node, end_node):
+        distances, _, visited = bidirectional_dijkstra(compiled, start_node, end_node)
+        return distances[end_node], len(visited)
+    return query
+
+
+def _bidirectional_a_star(compiled: CompiledGraph, graph_file: str) -> Optional[Query]:
+    heuristic = HaversineHeuristic(compiled)
+
+    def query(start_node, end_node):
+        distances, _, visited = bidirectional_a_star(compiled, start_node, end_node, heuristic)
+        return distances[end_node], len(visited)
+    return query
+
+
+def _a_star_alt(compiled: CompiledGraph, graph_file: str) -> Optional[Query]:
+    from landmarks import load_landmarks
+
+    heuristic = load_landmarks(graph_file, compiled)
+    if heuristic is None:
+        return None
+
+    def query(start_node, end_node):
+        distances, _, visited = a_star(compiled, start_node, end_node, heuristic, {})
+        return distances[end_node], len(visited)
+    return query
+
+
+def _contraction_hierarchies(compiled: CompiledGraph, graph_file: str) -> Optional[Query]:
+    from contraction import ContractionHierarchy, ch_path
+    from graphCache import file_hash
+
+    if not os.path.exists(ch_path(graph_file)):
+        return None
+    ch = ContractionHierarchy.load(ch_path(graph_file), file_hash(graph_file))
+    if ch is None:
+        return None
+
+    def query(start_node, end_node):
+        distance, _, visited = ch.query(start_node, end_node)
+        return distance, visited
+    return query
+
+
+# Registered modes; dijkstra must stay first since every other mode is checked against it
+ALGORITHMS: Dict[str, Callable[[CompiledGraph, str], Optional[Query]]] = {
+    'dijkstra': _dijkstra,
+    'a_star': _a_star,
+    'bidirectional_dijkstra': _bidirectional_dijkstra,
+    'bidirectional_a_star': _bidirectional_a_star,
+    'a_star_alt': _a_star_alt,
+    'contraction_hierarchies': _contraction_hierarchies,
+    'dijkstra_indexed_heap': _with_queue('dijkstra', 'indexed'),
+    'dijkstra_radix_heap': _with_queue('dijkstra', 'radix'),
+    'a_star_indexed_heap': _with_queue('a_star', 'indexed'),
+    'a_star_radix_heap': _with_queue('a_star', 'radix'),
+}
+
+
+# H E L P E R   F U N C T I O N S ----------------------------------
+
+# Every GraphML file in the registry's graph folders
+def discover_graphs(directories=GRAPH_DIRS) -> List[str]:
+    graphs = []
+    for directory in directories:
+        if os.path.isdir(directory):
+            for file in sorted(os.listdir(directory)):
+                if file.endswith(".graphml"):
+                    graphs.append(os.path.join(directory, file))
+    return graphs
+
+
+# Seeded OD pairs, pairs_per_bucket per straight-line distance bucket
+def bucketed_pairs(compiled: CompiledGraph, pairs_per_bucket: int, seed: int,
+                   max_attempts: int = 200000) -> Dict[str, List[Tuple[int, int]]]:
+    rng = random.Random(seed)
+    straight = HaversineHeuristic(compiled)
+    nodes = compiled.node_list()
+    pairs: Dict[str, List[Tuple[int, int]]] = {name: [] for name, _, _ in BUCKETS}
+
+    for _ in range(max_attempts):
+        if all(len(bucket) >= pairs_per_bucket for bucket in pairs.values()):
+            break
+        source, target = rng.randrange(len(nodes)), rng.randrange(len(nodes))
+        if source == target:
+            continue
+
+        distance = straight.metres(source, target)
+        for name, low, high in BUCKETS:
+            if low <= distance < high:
+                if len(pairs[name]) < pairs_per_bucket:
+                    pairs[name].append((nodes[source], nodes[target]))
+                break
+
+    return pairs
+
+
+# Latency percentiles in milliseconds
+def _percentiles(latencies: List[float]) -> Dict[str, float]:
+    values = np.asarray(latencies) * 1000
+    return {
+        'p50_ms': float(np.percentile(values, 50)),
+        'p95_ms': float(np.percentile(values, 95)),
+        'p99_ms': float(np.percentile(values, 99)),
+        'mean_ms': float(values.mean()),
+    }
+
+
+# Distances match if both unreachable or within TOLERANCE
+def _same_distance(a: float, b: float) -> bool:
+    return a == b or abs(a - b) <= TOLERANCE
+
+
+# B E N C H M A R K ------------------------------------------------
+
+# Runs every available algorithm on one graph; returns (report, mismatches)
+def benchmark_graph(graph_file: str, compiled: CompiledGraph, algorithms: List[str], pairs_per_bucket: int,
+                    seed: int, warmup: int, repetitions: int) -> Tuple[dict, List[dict]]:
+
+    pairs = bucketed_pairs(compiled, pairs_per_bucket, seed)
+    queries = {name: ALGORITHMS[name](compiled, graph_file) for name in algorithms}
+    report = {'nodes': compiled.num_nodes, 'edges': compiled.num_edges, 'buckets': {}, 'skipped': []}
+    mismatches: List[dict] = []
+
+    for name, query in queries.items():
+        if query is None:
+            report['skipped'].append(name)
+
+    for bucket, bucket_pairs in pairs.items():
+        if not bucket_pairs:
+            continue
+        bucket_report = report['buckets'][bucket] = {'pairs': len(bucket_pairs)}
+
+        # Reference distances from Dijkstra
+        reference = {pair: queries['dijkstra'](*pair)[0] for pair in bucket_pairs}
+
+        for name, query in queries.items():
+            if query is None:
+                continue
+
+            # Warmup (first-touch list mirrors, heuristic setup, caches)
+            for pair in bucket_pairs[:warmup]:
+                query(*pair)
+
+            latencies: List[float] = []
+            visited: List[int] = []
+            for repetition in range(repetitions):
+                for pair in bucket_pairs:
+                    query_start_time = time.perf_counter()
+                    distance, nodes_visited = query(*pair)
+                    latencies.append(time.perf_counter() - query_start_time)
+                    visited.append(nodes_visited)
+
+                    if repetition == 0 and not _same_distance(distance, reference[pair]):
+                        mismatches.append({'graph': graph_file, 'algorithm': name, 'start_node': pair[0],
+                                           'end_node': pair[1], 'distance': distance, 'dijkstra': reference[pair]})
+
+            # Peak traced memory in a separate pass so tracing does not skew latency
+            tracemalloc.start()
+            for pair in bucket_pairs:
+                query(*pair)
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+
+            bucket_report[name] = {
+                **_percentiles(latencies),
+                'nodes_visited_mean': float(np.mean(visited)),
+                'peak_memory_kb': peak / 1024,
+                'queries': len(latencies),
+            }
+
+    return report, mismatches
+
+
+# Benchmarks every graph; returns the full JSON-ready report
+def run(graph_files: List[str], algorithms: List[str], pairs_per_bucket: int = 20, seed: int = 0,
+        warmup: int = 3, repetitions: int = 3) -> dict:
+    from graphCache import load_compiled
+
+    results = {
+        'meta': {
+            'seed': seed,
+            'pairs_per_bucket': pairs_per_bucket,
+            'warmup': warmup,
+            'repetitions': repetitions,
+            'algorithms': algorithms,
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'timestamp': time.time(),
+        },
+        'graphs': {},
+        'mismatches': [],
+    }
+
+    for graph_file in graph_files:
+        try:
+            compiled = load_compiled(graph_file)
+        except Exception as e:
+            print(f"Skipping {graph_file}: {e}", file=sys.stderr)
+            results['graphs'][graph_file] = {'error': str(e)}
+            continue
+
+        print(f"Benchmarking {graph_file} ({compiled.num_nodes} nodes)", file=sys.stderr)
+        report, mismatches = benchmark_graph(graph_file, compiled, algorithms, pairs_per_bucket,
+                                             seed, warmup, repetitions)
+        results['graphs'][graph_file] = report
+        results['mismatches'].extend(mismatches)
+
+    return results
+
+
+# M A I N ----------------------------------------------------------
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark every search algorithm across cities")
+    parser.add_argument("graphs", nargs='*', help="GraphML files (default: everything in data/ and graphml_files/)")
+    parser.add_argument("--algorithms", default=','.join(ALGORITHMS), help="Comma separated algorithm names")
+    parser.add_argument("--pairs", type=int, default=20, help="OD pairs per distance bucket")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--warmup", type=int, default=3)
+    parser.add_argument("--repetitions", type=int, default=3)
+    parser.add_argument("--output", default="-", help="JSON output path (default stdout)")
+    args = parser.parse_args(argv)
+
+    algorithms = [name.strip() for name in args.algorithms.split(',') if name.strip()]
+    unknown = [name for name in algorithms if name not in ALGORITHMS]
+    if unknown:
+        parser.error(f"Unknown algorithms: {', '.join(unknown)}")
+    if 'dijkstra' not in algorithms:
+        algorithms.insert(0, 'dijkstra')
+
+    results = run(args.graphs or discover_graphs(), algorithms, args.pairs, args.seed,
+                  args.warmup, args.repetitions)
+
+    output = json.dumps(results, indent=2)
+    if args.output == '-':
+        print(output)
+    else:
+        with open(args.output, 'w') as f:
+            f.write(output)
+
+    # Fail if any variant disagrees with Dijkstra
+    if results['mismatches']:
+        print(f"{len(results['mismatches'])} distance mismatches against dijkstra", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
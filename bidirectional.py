@@ -0,0 +1,147 @@
+# I M P O R T S   &   D E P E N D E N C I E S ----------------------
+import heapq
+from typing import Callable, Dict, Optional, Set, Tuple
+
+from compiledGraph import CompiledGraph, as_compiled
+
+
+# H E L P E R   F U N C T I O N S ----------------------------------
+
+# Index-based lower bounds (to_target(v) <= d(v, t), from_source(v) <= d(s, v)) from an a_star heuristic
+# Providers may supply for_source for asymmetric bounds; plain callables are assumed symmetric
+def _bounds(compiled: CompiledGraph, heuristic, source: int, target: int) -> Tuple[Callable[[int], float], Callable[[int], float]]:
+    if hasattr(heuristic, 'for_target'):
+        to_target = heuristic.for_target(target)
+        from_source = heuristic.for_source(source) if hasattr(heuristic, 'for_source') else heuristic.for_target(source)
+        return to_target, from_source
+
+    node_list = compiled.node_list()
+    start_node, end_node = node_list[source], node_list[target]
+    return (lambda v: heuristic(node_list[v], end_node)), (lambda v: heuristic(node_list[v], start_node))
+
+
+# Core bidirectional search over out-edges (forward) and in-edges (backward)
+# potential(v) shifts forward keys and -potential(v) shifts backward keys; their sum is zero,
+# so the search stops once top_forward + top_backward >= best connection found (mu)
+def _bidirectional(compiled: CompiledGraph, source: int, target: int,
+                   potential: Optional[Callable[[int], float]]):
+
+    offsets, targets, weights = compiled.adjacency()
+    rev_offsets, rev_sources, rev_weights = compiled.reverse_adjacency()
+
+    forward = compiled.search_state('forward')
+    backward = compiled.search_state('backward')
+    f_epoch = forward.begin(source)
+    b_epoch = backward.begin(target)
+
+    # Per-direction views: (dist, prev, stamp, closed, epoch, touched, settled, csr)
+    sides = (
+        (forward.dist, forward.prev, forward.stamp, forward.closed, f_epoch, forward.touched, forward.settled,
+         offsets, targets, weights),
+        (backward.dist, backward.prev, backward.stamp, backward.closed, b_epoch, backward.touched, backward.settled,
+         rev_offsets, rev_sources, rev_weights),
+    )
+
+    # Best s-t distance so far and the node where the two trees meet
+    mu = float('infinity')
+    meet = source if source == target else -1
+    if source == target:
+        mu = 0
+
+    # Priority queues of (key, node)
+    if potential is None:
+        queues = ([(0, source)], [(0, target)])
+    else:
+        queues = ([(potential(source), source)], [(-potential(target), target)])
+
+    while queues[0] and queues[1]:
+
+        # Stopping criterion
+        if queues[0][0][0] + queues[1][0][0] >= mu:
+            break
+
+        # Expand the side with the smaller frontier
+        side = 0 if len(queues[0]) <= len(queues[1]) else 1
+        dist, prev, stamp, closed, epoch, touched, settled, row, cols, wts = sides[side]
+        other_dist, _, other_stamp, _, other_epoch = sides[1 - side][:5]
+        queue = queues[side]
+
+        _, current_node = heapq.heappop(queue)
+        if closed[current_node] == epoch:
+            continue
+        closed[current_node] = epoch
+        settled.append(current_node)
+        current_distance = dist[current_node]
+
+        for edge in range(row[current_node], row[current_node + 1]):
+            neighbor = cols[edge]
+            if closed[neighbor] == epoch:
+                continue
+
+            distance = current_distance + wts[edge]
+
+            if stamp[neighbor] != epoch:
+                stamp[neighbor] = epoch
+                touched.append(neighbor)
+            elif distance >= dist[neighbor]:
+                continue
+
+            dist[neighbor] = distance
+            prev[neighbor] = current_node
+
+            if potential is None:
+                heapq.heappush(queue, (distance, neighbor))
+            elif side == 0:
+                heapq.heappush(queue, (distance + potential(neighbor), neighbor))
+            else:
+                heapq.heappush(queue, (distance - potential(neighbor), neighbor))
+
+            # Neighbour already reached from the other side: candidate connection
+            if other_stamp[neighbor] == other_epoch:
+                total = distance + other_dist[neighbor]
+                if total < mu:
+                    mu = total
+                    meet = neighbor
+
+    return _export(compiled, forward, backward, meet, mu)
+
+
+# Merges both trees into the single-direction (distances, previous, visited) contract
+# The backward chain from the meeting node is re-linked so reconstruct_path(previous, s, t) works
+def _export(compiled: CompiledGraph, forward, backward, meet: int, mu: float):
+    distances, previous, visited = compiled.export_search(forward)
+    node_list = compiled.node_list()
+    visited |= {node_list[i] for i in backward.settled}
+
+    if meet < 0:
+        return distances, previous, visited
+
+    node = meet
+    while backward.prev[node] >= 0:
+        next_node = backward.prev[node]
+        previous[node_list[next_node]] = node_list[node]
+        distances[node_list[next_node]] = mu - backward.dist[next_node]
+        node = next_node
+
+    return distances, previous, visited
+
+
+# B I D I R E C T I O N A L   S E A R C H E S ----------------------
+
+# Bidirectional Dijkstra: same signature and return contract as dijkstra()
+def bidirectional_dijkstra(graph, start_node: int, end_node: int) -> Tuple[Dict[int, float], Dict[int, Optional[int]], Set[int]]:
+    compiled = as_compiled(graph)
+    source = compiled.node_index(start_node)
+    target = compiled.node_index(end_node)
+    return _bidirectional(compiled, source, target, None)
+
+
+# Bidirectional A*: same signature and return contract as a_star()
+# Uses the average potential (h_t(v) - h_s(v)) / 2, which stays consistent in both directions
+def bidirectional_a_star(graph, start_node: int, end_node: int, heuristic, positions=None) -> Tuple[Dict[int, float], Dict[int, Optional[int]], Set[int]]:
+    compiled = as_compiled(graph)
+    source = compiled.node_index(start_node)
+    target = compiled.node_index(end_node)
+    to_target, from_source = _bounds(compiled, heuristic, source, target)
+    potential = lambda v: (to_target(v) - from_source(v)) / 2
+    return _bidirectional(compiled, source, target, potential)
@@ -0,0 +1,271 @@
+# I M P O R T S   &   D E P E N D E N C I E S ----------------------
+import copy
+import os
+import weakref
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from searchState import SearchState
+
+
+# C O M P I L E D   G R A P H --------------------------------------
+
+# Compact CSR (compressed sparse row) form of an osmnx MultiDiGraph
+#   node_ids[i]                         -> OSM id of contiguous node i
+#   targets[offsets[i]:offsets[i + 1]]  -> out-neighbours of node i
+#   weights[offsets[i]:offsets[i + 1]]  -> matching edge weights
+#   lat[i], lon[i]                      -> node coordinates in degrees
+class CompiledGraph:
+    def __init__(self, node_ids: np.ndarray, offsets: np.ndarray, targets: np.ndarray,
+                 weights: np.ndarray, lat: np.ndarray, lon: np.ndarray, weight: str = 'length'):
+
+        self.node_ids = node_ids
+        self.offsets = offsets
+        self.targets = targets
+        self.weights = weights
+        self.lat = lat
+        self.lon = lon
+        self.weight = weight
+
+        # Set on graphs shared between callers (e.g. by the graph registry); set_weights then refuses
+        self.read_only = False
+
+        # OSM id -> contiguous index
+        self.index: Dict[int, int] = {node: i for i, node in enumerate(node_ids.tolist())}
+
+        # Python list mirrors used by the search loops (list indexing beats numpy scalars)
+        self._adjacency: Optional[Tuple[List[int], List[int], List[float]]] = None
+        self._node_list: Optional[List[int]] = None
+        self._reverse: Optional[Tuple[np.ndarray, np.ndarray, np.ndarray]] = None
+        self._reverse_slots: Optional[np.ndarray] = None
+        self._reverse_adjacency: Optional[Tuple[List[int], List[int], List[float]]] = None
+        self._search_states: Dict[str, SearchState] = {}
+
+    # Pickle only the arrays; list mirrors and scratch state are rebuilt on demand
+    def __getstate__(self) -> dict:
+        state = self.__dict__.copy()
+        for cached in ('_adjacency', '_node_list', '_reverse', '_reverse_slots', '_reverse_adjacency'):
+            state[cached] = None
+        state['_search_states'] = {}
+        return state
+
+    @property
+    def num_nodes(self) -> int:
+        return len(self.node_ids)
+
+    @property
+    def num_edges(self) -> int:
+        return len(self.targets)
+
+    # Returns (offsets, targets, weights) as plain lists for the hot loops
+    def adjacency(self) -> Tuple[List[int], List[int], List[float]]:
+        if self._adjacency is None:
+            self._adjacency = (self.offsets.tolist(), self.targets.tolist(), self.weights.tolist())
+        return self._adjacency
+
+    # In-edge CSR (rev_offsets, rev_sources, rev_weights): rev_sources[rev_offsets[v]:rev_offsets[v + 1]]
+    # are the nodes with an edge into v, for searches that run backward from the target
+    def reverse(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        if self._reverse is None:
+            sources = np.repeat(np.arange(self.num_nodes, dtype=np.int32), np.diff(self.offsets))
+            order = np.argsort(self.targets, kind='stable')
+            rev_offsets = np.zeros(self.num_nodes + 1, dtype=np.int64)
+            np.cumsum(np.bincount(self.targets, minlength=self.num_nodes), out=rev_offsets[1:])
+            self._reverse = (rev_offsets, sources[order], self.weights[order])
+
+            # In-edge slot of every forward edge, so weight updates can patch both directions
+            self._reverse_slots = np.empty(len(order), dtype=np.int64)
+            self._reverse_slots[order] = np.arange(len(order))
+        return self._reverse
+
+    # Returns the in-edge CSR as plain lists for the hot loops
+    def reverse_adjacency(self) -> Tuple[List[int], List[int], List[float]]:
+        if self._reverse_adjacency is None:
+            rev_offsets, rev_sources, rev_weights = self.reverse()
+            self._reverse_adjacency = (rev_offsets.tolist(), rev_sources.tolist(), rev_weights.tolist())
+        return self._reverse_adjacency
+
+    # Source index of every edge (the row each CSR slot belongs to)
+    def edge_sources(self) -> np.ndarray:
+        return np.repeat(np.arange(self.num_nodes, dtype=np.int64), np.diff(self.offsets))
+
+    # CSR edge ids for (u, v) OSM id pairs; -1 where the graph has no such edge
+    # Rows are sorted by target, so the edge keys u * n + v are globally sorted
+    def edge_ids(self, us, vs) -> np.ndarray:
+        index = self.index
+        u = np.fromiter((index.get(node, -1) for node in us), dtype=np.int64)
+        v = np.fromiter((index.get(node, -1) for node in vs), dtype=np.int64)
+
+        keys = self.edge_sources() * self.num_nodes + self.targets
+        wanted = u * self.num_nodes + v
+        ids = np.minimum(np.searchsorted(keys, wanted), max(len(keys) - 1, 0))
+        found = (u >= 0) & (v >= 0) & (len(keys) > 0)
+        found[found] &= keys[ids[found]] == wanted[found]
+        return np.where(found, ids, -1)
+
+    # Copy sharing the topology arrays and id index but owning its weights, for callers that change
+    # weights (e.g. live traffic) on a graph others also use
+    def with_private_weights(self) -> 'CompiledGraph':
+        clone = copy.copy(self)
+        clone.weights = np.array(self.weights, dtype=np.float64)
+        clone.read_only = False
+        for cached in ('_adjacency', '_reverse', '_reverse_slots', '_reverse_adjacency'):
+            setattr(clone, cached, None)
+        clone._search_states = {}
+        return clone
+
+    # Overwrites some edge weights in place (e.g. live traffic)
+    # The list mirrors and the in-edge CSR are patched too, so the cost is O(changed edges)
+    def set_weights(self, edge_ids: np.ndarray, values: np.ndarray) -> None:
+        if self.read_only:
+            raise ValueError("Graph is shared read-only; change weights on a with_private_weights() copy")
+        if not self.weights.flags.writeable:
+            self.weights = np.array(self.weights)
+        self.weights[edge_ids] = values
+        values = self.weights[edge_ids].tolist()
+
+        if self._adjacency is not None:
+            weights = self._adjacency[2]
+            for edge, value in zip(edge_ids.tolist(), values):
+                weights[edge] = value
+
+        if self._reverse is not None:
+            slots = self._reverse_slots[edge_ids]
+            self._reverse[2][slots] = values
+            if self._reverse_adjacency is not None:
+                rev_weights = self._reverse_adjacency[2]
+                for slot, value in zip(slots.tolist(), values):
+                    rev_weights[slot] = value
+
+    # Returns node_ids as a plain list for index -> OSM id translation
+    def node_list(self) -> List[int]:
+        if self._node_list is None:
+            self._node_list = self.node_ids.tolist()
+        return self._node_list
+
+    # Returns the scratch state shared by queries on this graph (allocated once per slot)
+    # Bidirectional searches use separate 'forward' and 'backward' slots
+    def search_state(self, slot: str = 'forward') -> SearchState:
+        if slot not in self._search_states:
+            self._search_states[slot] = SearchState(self.num_nodes)
+        return self._search_states[slot]
+
+    # Writes the arrays as one .npy file each so they can be memory-mapped back
+    def save(self, directory: str) -> None:
+        os.makedirs(directory, exist_ok=True)
+        for name in _ARRAY_FIELDS:
+            np.save(os.path.join(directory, f"{name}.npy"), getattr(self, name))
+
+    # Loads arrays written by save(); mmap_mode='r' maps them instead of reading them in
+    @classmethod
+    def load(cls, directory: str, weight: str = 'length', mmap_mode: Optional[str] = 'r') -> 'CompiledGraph':
+        arrays = {name: np.load(os.path.join(directory, f"{name}.npy"), mmap_mode=mmap_mode)
+                  for name in _ARRAY_FIELDS}
+        return cls(weight=weight, **arrays)
+
+    # Translates an OSM id to its contiguous index
+    def node_index(self, node: int) -> int:
+        try:
+            return self.index[node]
+        except KeyError:
+            raise ValueError(f"Node {node} not in graph") from None
+
+    # Builds the (distances, previous, visited) contract from a finished search
+    # Results are detached copies, so the state can be reused by the next query
+    def export_search(self, state: SearchState) -> Tuple['DistanceMap', 'PredecessorMap', set]:
+
+        node_list = self.node_list()
+        dist, prev = state.dist, state.prev
+        distances = DistanceMap()
+        previous = PredecessorMap()
+
+        # Only nodes the search reached are materialised
+        for i in state.touched:
+            node = node_list[i]
+            distances[node] = dist[i]
+            p = prev[i]
+            previous[node] = node_list[p] if p >= 0 else None
+
+        visited = {node_list[i] for i in state.settled}
+
+        return distances, previous, visited
+
+
+# Array attributes persisted by CompiledGraph.save / load
+_ARRAY_FIELDS = ('node_ids', 'offsets', 'targets', 'weights', 'lat', 'lon')
+
+
+# R E S U L T   M A P S --------------------------------------------
+
+# Distances keyed by OSM id; nodes the search never reached are infinitely far
+class DistanceMap(dict):
+    def __missing__(self, node):
+        return float('infinity')
+
+
+# Predecessors keyed by OSM id; nodes the search never reached have no parent
+class PredecessorMap(dict):
+    def __missing__(self, node):
+        return None
+
+
+# C O M P I L E   S T E P ------------------------------------------
+
+# Turns a loaded osmnx graph into a CompiledGraph
+def compile_graph(graph, weight: str = 'length') -> CompiledGraph:
+
+    # Contiguous ids in graph iteration order
+    node_ids = np.fromiter(graph.nodes(), dtype=np.int64, count=graph.number_of_nodes())
+    index = {node: i for i, node in enumerate(node_ids.tolist())}
+    num_nodes = len(node_ids)
+
+    # Coordinates (osmnx stores lon as x and lat as y on unprojected graphs)
+    lat = np.fromiter((data.get('y', np.nan) for _, data in graph.nodes(data=True)),
+                      dtype=np.float64, count=num_nodes)
+    lon = np.fromiter((data.get('x', np.nan) for _, data in graph.nodes(data=True)),
+                      dtype=np.float64, count=num_nodes)
+
+    # Flatten every edge (including parallel ones) into arrays
+    sources: List[int] = []
+    dests: List[int] = []
+    lengths: List[float] = []
+    for u, v, data in graph.edges(data=True):
+        sources.append(index[u])
+        dests.append(index[v])
+        lengths.append(float(data.get(weight, 1)))
+
+    src = np.asarray(sources, dtype=np.int32)
+    dst = np.asarray(dests, dtype=np.int32)
+    wts = np.asarray(lengths, dtype=np.float64)
+
+    # Sort by (source, target, weight) so the cheapest parallel edge comes first
+    order = np.lexsort((wts, dst, src))
+    src, dst, wts = src[order], dst[order], wts[order]
+
+    # Collapse parallel edges to their minimum weight
+    if len(src):
+        keep = np.ones(len(src), dtype=bool)
+        keep[1:] = (src[1:] != src[:-1]) | (dst[1:] != dst[:-1])
+        src, dst, wts = src[keep], dst[keep], wts[keep]
+
+    # Row offsets from out-degree counts
+    offsets = np.zeros(num_nodes + 1, dtype=np.int64)
+    np.cumsum(np.bincount(src, minlength=num_nodes), out=offsets[1:])
+
+    return CompiledGraph(node_ids, offsets, dst, wts, lat, lon, weight=weight)
+
+
+# Compiled graphs cached per loaded graph so repeated queries compile once
+_compiled_cache: 'weakref.WeakKeyDictionary' = weakref.WeakKeyDictionary()
+
+
+# Returns graph itself if already compiled, otherwise its (cached) compiled form
+def as_compiled(graph, weight: str = 'length') -> CompiledGraph:
+    if isinstance(graph, CompiledGraph):
+        return graph
+
+    per_weight = _compiled_cache.setdefault(graph, {})
+    if weight not in per_weight:
+        per_weight[weight] = compile_graph(graph, weight=weight)
+    return per_weight[weight]
@@ -0,0 +1,394 @@
+# I M P O R T S   &   D E P E N D E N C I E S ----------------------
+import argparse
+import heapq
+import os
+import random
+import sys
+import time
+from typing import Dict, List, Optional, Set, Tuple
+
+import numpy as np
+
+from compiledGraph import CompiledGraph, DistanceMap, PredecessorMap, as_compiled
+
+# C O N S T A N T S ------------------------------------------------
+
+# Witness searches give up after settling this many nodes (a missed witness only adds a shortcut)
+WITNESS_SETTLE_LIMIT = 200
+
+# Bump when the artifact layout changes so old artifacts are rebuilt
+CH_VERSION = 1
+
+_CH_ARRAYS = ('node_ids', 'rank',
+              'up_offsets', 'up_targets', 'up_weights', 'up_middle',
+              'down_offsets', 'down_sources', 'down_weights', 'down_middle')
+
+
+# C O N T R A C T I O N   H I E R A R C H Y ------------------------
+
+# Contracted graph: every node has a rank, and every edge (original or shortcut) points upward
+#   up_*   : out-edges v -> x with rank[x] > rank[v], used by the forward search from s
+#   down_* : in-edges x -> v with rank[x] > rank[v], used by the backward search from t
+#   *_middle[e] is the contracted node a shortcut bypasses, or -1 for an original edge
+class ContractionHierarchy:
+    def __init__(self, node_ids: np.ndarray, rank: np.ndarray,
+                 up_offsets: np.ndarray, up_targets: np.ndarray, up_weights: np.ndarray, up_middle: np.ndarray,
+                 down_offsets: np.ndarray, down_sources: np.ndarray, down_weights: np.ndarray, down_middle: np.ndarray,
+                 source_hash: str = ''):
+
+        self.node_ids = node_ids
+        self.rank = rank
+        self.up_offsets, self.up_targets, self.up_weights, self.up_middle = up_offsets, up_targets, up_weights, up_middle
+        self.down_offsets, self.down_sources, self.down_weights, self.down_middle = down_offsets, down_sources, down_weights, down_middle
+        self.source_hash = source_hash
+
+        # OSM id -> index, and list mirrors for the query loops
+        self.index: Dict[int, int] = {node: i for i, node in enumerate(node_ids.tolist())}
+        self._node_list = node_ids.tolist()
+        self._up = (up_offsets.tolist(), up_targets.tolist(), up_weights.tolist(), up_middle.tolist())
+        self._down = (down_offsets.tolist(), down_sources.tolist(), down_weights.tolist(), down_middle.tolist())
+
+    @property
+    def num_shortcuts(self) -> int:
+        return int(np.count_nonzero(self.up_middle >= 0) + np.count_nonzero(self.down_middle >= 0))
+
+    # Saves the hierarchy as a compressed .npz artifact
+    def save(self, path: str) -> None:
+        tmp = path + ".part.npz"
+        np.savez_compressed(tmp, version=CH_VERSION, source_hash=self.source_hash,
+                            **{name: getattr(self, name) for name in _CH_ARRAYS})
+        os.replace(tmp, path)
+
+    # Loads an artifact written by save(); returns None if it is from another version or source
+    @classmethod
+    def load(cls, path: str, source_hash: Optional[str] = None) -> Optional['ContractionHierarchy']:
+        with np.load(path) as data:
+            if int(data['version']) != CH_VERSION:
+                return None
+            stored_hash = str(data['source_hash'])
+            if source_hash is not None and stored_hash != source_hash:
+                return None
+            arrays = {name: data[name] for name in _CH_ARRAYS}
+        return cls(source_hash=stored_hash, **arrays)
+
+    # Unpacks a (possibly shortcut) edge a -> b into original edges [(a, x, w), ...]
+    def _unpack(self, a: int, b: int, weight: float, middle: int, out: List[Tuple[int, int, float]]) -> None:
+        up_offsets, up_targets, up_weights, up_middle = self._up
+        down_offsets, down_sources, down_weights, down_middle = self._down
+
+        stack = [(a, b, weight, middle)]
+        while stack:
+            a, b, weight, middle = stack.pop()
+            if middle < 0:
+                out.append((a, b, weight))
+                continue
+
+            # a -> middle is stored as a down edge of middle, middle -> b as an up edge of middle
+            first = second = None
+            for e in range(down_offsets[middle], down_offsets[middle + 1]):
+                if down_sources[e] == a:
+                    first = (a, middle, down_weights[e], down_middle[e])
+                    break
+            for e in range(up_offsets[middle], up_offsets[middle + 1]):
+                if up_targets[e] == b:
+                    second = (middle, b, up_weights[e], up_middle[e])
+                    break
+
+            # Push second first so edges come out in path order
+            stack.append(second)
+            stack.append(first)
+
+    # Bidirectional upward query between two OSM ids
+    # Returns (distance, path of OSM ids, nodes settled); path is [] if unreachable
+    def query(self, start_node: int, end_node: int) -> Tuple[float, List[int], int]:
+        try:
+            source, target = self.index[start_node], self.index[end_node]
+        except KeyError:
+            raise ValueError("Start or end node not in graph") from None
+
+        up_offsets, up_targets, up_weights, up_middle = self._up
+        down_offsets, down_sources, down_weights, down_middle = self._down
+
+        # Sparse per-query state: dist and (parent, edge weight, middle) per direction
+        dist = ({source: 0.0}, {target: 0.0})
+        parent: Tuple[Dict[int, tuple], Dict[int, tuple]] = ({}, {})
+        queues = ([(0.0, source)], [(0.0, target)])
+        settled: Tuple[Set[int], Set[int]] = (set(), set())
+        csr = ((up_offsets, up_targets, up_weights, up_middle), (down_offsets, down_sources, down_weights, down_middle))
+
+        mu = 0.0 if source == target else float('infinity')
+        meet = source if source == target else -1
+
+        # Alternate directions until neither queue can improve mu
+        side = 0
+        while queues[0] or queues[1]:
+            if not queues[side] or queues[side][0][0] >= mu:
+                side = 1 - side
+                if not queues[side] or queues[side][0][0] >= mu:
+                    break
+
+            d, v = heapq.heappop(queues[side])
+            if v in settled[side]:
+                continue
+            settled[side].add(v)
+
+            # Meeting point candidate
+            other = dist[1 - side].get(v)
+            if other is not None and d + other < mu:
+                mu = d + other
+                meet = v
+
+            offsets, cols, weights, middles = csr[side]
+            for e in range(offsets[v], offsets[v + 1]):
+                x = cols[e]
+                nd = d + weights[e]
+                if nd < dist[side].get(x, float('infinity')):
+                    dist[side][x] = nd
+                    parent[side][x] = (v, weights[e], middles[e])
+                    heapq.heappush(queues[side], (nd, x))
+
+            side = 1 - side
+
+        visited = len(settled[0]) + len(settled[1])
+        if meet < 0:
+            return float('infinity'), [], visited
+
+        # Forward chain s -> meet and backward chain meet -> t, then unpack shortcuts
+        edges: List[Tuple[int, int, float, int]] = []
+        v = meet
+        while v in parent[0]:
+            u, w, m = parent[0][v]
+            edges.append((u, v, w, m))
+            v = u
+        edges.reverse()
+        v = meet
+        while v in parent[1]:
+            x, w, m = parent[1][v]
+            edges.append((v, x, w, m))
+            v = x
+
+        original: List[Tuple[int, int, float]] = []
+        for a, b, w, m in edges:
+            self._unpack(a, b, w, m, original)
+
+        path = [self._node_list[source]] + [self._node_list[b] for _, b, _ in original]
+        return mu, path, visited
+
+    # Same (distances, previous, visited) contract as dijkstra(), covering the unpacked path
+    def search(self, start_node: int, end_node: int) -> Tuple[Dict[int, float], Dict[int, Optional[int]], int]:
+        distance, path, visited = self.query(start_node, end_node)
+        distances, previous = DistanceMap(), PredecessorMap()
+        distances[start_node] = 0.0
+        previous[start_node] = None
+        if path:
+            distances[end_node] = distance
+            for a, b in zip(path, path[1:]):
+                previous[b] = a
+        return distances, previous, visited
+
+
+# P R E P R O C E S S I N G ----------------------------------------
+
+# Limited Dijkstra over uncontracted nodes used to find witness paths
+def _witness_search(out_adj: List[Dict[int, tuple]], source: int, skip: int, max_cost: float,
+                    limit: int = WITNESS_SETTLE_LIMIT) -> Dict[int, float]:
+    dist = {source: 0.0}
+    pq = [(0.0, source)]
+    settled = 0
+
+    while pq:
+        d, x = heapq.heappop(pq)
+        if d > dist[x]:
+            continue
+        if d > max_cost or settled >= limit:
+            break
+        settled += 1
+
+        for y, (w, _) in out_adj[x].items():
+            if y == skip:
+                continue
+            nd = d + w
+            if nd < dist.get(y, float('infinity')):
+                dist[y] = nd
+                heapq.heappush(pq, (nd, y))
+
+    return dist
+
+
+# Shortcuts needed to contract v: [(u, x, cost)] for u -> v -> x pairs with no witness path
+def _needed_shortcuts(out_adj, in_adj, v: int) -> List[Tuple[int, int, float]]:
+    outs = out_adj[v]
+    shortcuts = []
+    for u, (w_in, _) in in_adj[v].items():
+        costs = {x: w_in + w_out for x, (w_out, _) in outs.items() if x != u}
+        if not costs:
+            continue
+        dist = _witness_search(out_adj, u, v, max(costs.values()))
+        for x, cost in costs.items():
+            if dist.get(x, float('infinity')) > cost:
+                shortcuts.append((u, x, cost))
+    return shortcuts
+
+
+# Builds a ContractionHierarchy from a compiled graph
+# Nodes are contracted in edge-difference order with lazy priority updates
+def contract_graph(graph, source_hash: str = '', verbose: bool = False) -> ContractionHierarchy:
+    compiled = as_compiled(graph)
+    n = compiled.num_nodes
+    offsets, targets, weights = compiled.adjacency()
+
+    # Remaining graph as adjacency dicts: neighbour -> (weight, middle)
+    out_adj: List[Dict[int, tuple]] = [dict() for _ in range(n)]
+    in_adj: List[Dict[int, tuple]] = [dict() for _ in range(n)]
+    for u in range(n):
+        for e in range(offsets[u], offsets[u + 1]):
+            v = targets[e]
+            if v != u:
+                out_adj[u][v] = (weights[e], -1)
+                in_adj[v][u] = (weights[e], -1)
+
+    deleted_neighbours = [0] * n
+
+    def priority(v: int) -> int:
+        shortcuts = len(_needed_shortcuts(out_adj, in_adj, v))
+        return shortcuts - len(out_adj[v]) - len(in_adj[v]) + deleted_neighbours[v]
+
+    queue = [(priority(v), v) for v in range(n)]
+    heapq.heapify(queue)
+
+    rank = np.zeros(n, dtype=np.int32)
+    up_edges: List[List[tuple]] = [[] for _ in range(n)]
+    down_edges: List[List[tuple]] = [[] for _ in range(n)]
+    contracted = [False] * n
+    order = 0
+
+    while queue:
+        _, v = heapq.heappop(queue)
+        if contracted[v]:
+            continue
+
+        # Lazy update: re-push if v is no longer the cheapest node to contract
+        current = priority(v)
+        if queue and current > queue[0][0]:
+            heapq.heappush(queue, (current, v))
+            continue
+
+        # Edges still attached to v all lead to higher-ranked nodes
+        up_edges[v] = [(x, w, m) for x, (w, m) in out_adj[v].items()]
+        down_edges[v] = [(u, w, m) for u, (w, m) in in_adj[v].items()]
+
+        for u, x, cost in _needed_shortcuts(out_adj, in_adj, v):
+            if cost < out_adj[u].get(x, (float('infinity'),))[0]:
+                out_adj[u][x] = (cost, v)
+                in_adj[x][u] = (cost, v)
+
+        # Detach v from the remaining graph
+        for x in out_adj[v]:
+            del in_adj[x][v]
+            deleted_neighbours[x] += 1
+        for u in in_adj[v]:
+            del out_adj[u][v]
+            deleted_neighbours[u] += 1
+        out_adj[v] = {}
+        in_adj[v] = {}
+
+        contracted[v] = True
+        rank[v] = order
+        order += 1
+
+        if verbose and order % 10000 == 0:
+            print(f"Contracted {order}/{n} nodes")
+
+    # Pack the upward edge lists into CSR arrays
+    def pack(edge_lists: List[List[tuple]]):
+        counts = np.fromiter((len(edges) for edges in edge_lists), dtype=np.int64, count=n)
+        csr_offsets = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(counts, out=csr_offsets[1:])
+        flat = [edge for edges in edge_lists for edge in edges]
+        cols = np.fromiter((edge[0] for edge in flat), dtype=np.int32, count=len(flat))
+        wts = np.fromiter((edge[1] for edge in flat), dtype=np.float64, count=len(flat))
+        mids = np.fromiter((edge[2] for edge in flat), dtype=np.int32, count=len(flat))
+        return csr_offsets, cols, wts, mids
+
+    return ContractionHierarchy(compiled.node_ids, rank, *pack(up_edges), *pack(down_edges), source_hash=source_hash)
+
+
+# P E R S I S T E N C E --------------------------------------------
+
+# CH artifact path stored alongside the GraphML file
+def ch_path(graph_file: str) -> str:
+    return os.path.splitext(graph_file)[0] + ".ch.npz"
+
+
+# Loads the CH artifact for a GraphML file, contracting and saving it if missing or stale
+def load_or_build(graph_file: str, compiled: Optional[CompiledGraph] = None,
+                  verbose: bool = False) -> ContractionHierarchy:
+    from graphCache import file_hash, load_compiled
+
+    source_hash = file_hash(graph_file)
+    path = ch_path(graph_file)
+    if os.path.exists(path):
+        ch = ContractionHierarchy.load(path, source_hash)
+        if ch is not None:
+            return ch
+
+    compiled = compiled or load_compiled(graph_file)
+    ch = contract_graph(compiled, source_hash=source_hash, verbose=verbose)
+    ch.save(path)
+    return ch
+
+
+# M A I N ----------------------------------------------------------
+
+# Reports preprocessing time, artifact size and query latency against plain dijkstra()
+def main(argv=None) -> int:
+    from dijkstras import dijkstra
+    from graphCache import file_hash, load_compiled
+
+    parser = argparse.ArgumentParser(description="Contraction Hierarchies preprocessing and report")
+    parser.add_argument("graph_file", nargs='?', default="data/gainesville.graphml")
+    parser.add_argument("--pairs", type=int, default=200, help="Random queries to compare")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    compiled = load_compiled(args.graph_file)
+
+    preprocess_start_time = time.perf_counter()
+    ch = contract_graph(compiled, source_hash=file_hash(args.graph_file), verbose=True)
+    preprocess_time = time.perf_counter() - preprocess_start_time
+    ch.save(ch_path(args.graph_file))
+
+    print(f"Nodes: {compiled.num_nodes}  Edges: {compiled.num_edges}  Shortcuts: {ch.num_shortcuts}")
+    print(f"Preprocessing time: {preprocess_time:.2f} seconds")
+    print(f"Artifact size: {os.path.getsize(ch_path(args.graph_file)) / 1e6:.2f} MB ({ch_path(args.graph_file)})")
+
+    rng = random.Random(args.seed)
+    nodes = compiled.node_list()
+    dijkstra_time = ch_time = 0.0
+    mismatches = 0
+    for _ in range(args.pairs):
+        start_node, end_node = rng.sample(nodes, 2)
+
+        query_start_time = time.perf_counter()
+        distances, _, _ = dijkstra(compiled, start_node, end_node)
+        dijkstra_time += time.perf_counter() - query_start_time
+
+        query_start_time = time.perf_counter()
+        distance, _, _ = ch.query(start_node, end_node)
+        ch_time += time.perf_counter() - query_start_time
+
+        if not (distance == distances[end_node] or abs(distance - distances[end_node]) < 1e-6):
+            mismatches += 1
+
+    print(f"Mean query latency: dijkstra {dijkstra_time / args.pairs * 1000:.3f} ms, "
+          f"CH {ch_time / args.pairs * 1000:.3f} ms ({dijkstra_time / max(ch_time, 1e-12):.1f}x)")
+    print(f"Distance mismatches vs dijkstra: {mismatches}")
+
+    if mismatches:
+        print(f"{mismatches} CH distances differ from Dijkstra", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,69 +1,203 @@
 # I M P O R T S   &   D E P E N D E N C I E S ----------------------
 import heapq
-from typing import Dict, List, Set, Tuple, Optional, Mapping
+import numpy as np
+from typing import TYPE_CHECKING, Dict, Iterable, List, Set, Tuple, Optional, Mapping
 
+from compiledGraph import as_compiled
+from priorityQueues import make_queue
+from searchState import SearchState
 
-# F U N C T I O N S ------------------------------------------------
-
-# Dijkstras Algorithm Implementation
-def dijkstra(graph, start_node: int, end_node: int) -> Tuple[Dict[int, float], Dict[int,Optional[int]], Set[int]]:
+if TYPE_CHECKING:
+    from instrumentation import SearchStats
 
-    # Set all unknown node distances to infinity
-    distances = {node: float('infinity') for node in graph.nodes()}
 
-    # Set distance from starting_node to starting_node to 0
-    distances[start_node] = 0
+# F U N C T I O N S ------------------------------------------------
 
-    # Dictionary to store previous nodes for optimal path
-    previous: Dict[int, Optional[int]] = {node: None for node in graph.nodes()}
+# Dijkstras Algorithm Implementation
+# graph may be an osmnx graph (compiled once and cached) or a CompiledGraph
+# state defaults to the graph's shared SearchState, so nothing O(V) is allocated per query
+# stats (an instrumentation.SearchStats) collects counters and phase timings; None runs uninstrumented
+# queue picks the priority queue backend (see priorityQueues.QUEUE_BACKENDS); the default is plain heapq
+def dijkstra(graph, start_node: int, end_node: int, state: Optional[SearchState] = None,
+             stats: Optional['SearchStats'] = None, queue: str = 'heapq') -> Tuple[Dict[int, float], Dict[int,Optional[int]], Set[int]]:
+
+    # Work on the compact CSR form
+    compiled = as_compiled(graph)
+    offsets, targets, weights = compiled.adjacency()
+    source = compiled.node_index(start_node)
+    target = compiled.node_index(end_node)
+
+    # Start a new epoch: every node not stamped with it is at distance infinity
+    state = state or compiled.search_state()
+    epoch = state.begin(source)
+    distances, previous, stamp, closed = state.dist, state.prev, state.stamp, state.closed
+    touched, settled = state.touched, state.settled
+
+    # Heap operations as locals (swapped for timed wrappers when instrumented)
+    pq, push, pop = make_queue(queue)
+    if stats is not None:
+        push, pop, _ = stats.begin('dijkstra', push, pop)
+    pops = 0
+    found = False
 
     # Priority queu to store distance to node pairs as we discover
     # Add one item start_node to start_node distance of 0
-    pq = [(0, start_node)]
-
-    # Set to keep track of those visited
-    visited: Set[int] = set()
+    push(pq, (0, source))
 
     # While my PQ is not empty
     while pq:
 
         # Unpack from pq using heapop()
-        current_distance, current_node = heapq.heappop(pq)
+        current_distance, current_node = pop(pq)
+        pops += 1
 
         # Check if we are at end node
-        if current_node == end_node:
+        if current_node == target:
+            found = True
             break
 
         # Check if the node we are at has been visited
-        if current_node in visited:
+        if closed[current_node] == epoch:
             continue    # Skip if it has been visited
         # Add current_node to those visited
-        visited.add(current_node)
+        closed[current_node] = epoch
+        settled.append(current_node)
 
         # Check all neighbors of the current node
-        for neighbor in graph.neighbors(current_node):
+        for edge in range(offsets[current_node], offsets[current_node + 1]):
+            neighbor = targets[edge]
+
             # If we have already seen neighbor then skip
-            if neighbor in visited:
+            if closed[neighbor] == epoch:
                 continue
 
-            # Get edge data from current to neighbor
-            edge_data = graph.get_edge_data(current_node, neighbor)
-
-            # Get the first edge and get length attribute
-            edge_length = edge_data[0]['length']
+            distance = current_distance + weights[edge]
 
-            distance = current_distance + edge_length
+            # First time reached this query
+            if stamp[neighbor] != epoch:
+                stamp[neighbor] = epoch
+                touched.append(neighbor)
 
             # Perform Relaxation
-            if distance < distances[neighbor]:
-                distances[neighbor] = distance
-                previous[neighbor] = current_node
+            elif distance >= distances[neighbor]:
+                continue
+
+            distances[neighbor] = distance
+            previous[neighbor] = current_node
+
+            # Push new edge into pq
+            push(pq, (distance, neighbor))
+
+    if stats is not None:
+        stats.end(compiled, state, pops, len(pq), found, pq)
+
+    return compiled.export_search(state)
+
+# One-to-many Dijkstra: a single search from start_node that stops once every end node is settled
+# Returns the same (distances, previous, visited) contract, so one tree answers all targets
+# reverse=True searches in-edges: distances are *to* start_node and previous is the next hop towards it
+def dijkstra_one_to_many(graph, start_node: int, end_nodes: Iterable[int], state: Optional[SearchState] = None,
+                         reverse: bool = False) -> Tuple[Dict[int, float], Dict[int,Optional[int]], Set[int]]:
+
+    # Work on the compact CSR form
+    compiled = as_compiled(graph)
+    offsets, targets, weights = compiled.reverse_adjacency() if reverse else compiled.adjacency()
+    source = compiled.node_index(start_node)
+
+    # Targets still waiting to be settled
+    remaining = {compiled.node_index(node) for node in end_nodes}
+
+    state = state or compiled.search_state()
+    epoch = state.begin(source)
+    distances, previous, stamp, closed = state.dist, state.prev, state.stamp, state.closed
+    touched, settled = state.touched, state.settled
+
+    pq = [(0, source)]
+
+    while pq and remaining:
+        current_distance, current_node = heapq.heappop(pq)
+
+        if closed[current_node] == epoch:
+            continue
+        closed[current_node] = epoch
+        settled.append(current_node)
+
+        # Stop as soon as the last requested target is settled
+        remaining.discard(current_node)
+        if not remaining:
+            break
+
+        for edge in range(offsets[current_node], offsets[current_node + 1]):
+            neighbor = targets[edge]
+            if closed[neighbor] == epoch:
+                continue
+
+            distance = current_distance + weights[edge]
+
+            if stamp[neighbor] != epoch:
+                stamp[neighbor] = epoch
+                touched.append(neighbor)
+            elif distance >= distances[neighbor]:
+                continue
+
+            distances[neighbor] = distance
+            previous[neighbor] = current_node
+            heapq.heappush(pq, (distance, neighbor))
+
+    return compiled.export_search(state)
+
+# Full one-to-all Dijkstra returning dense per-index arrays (dist, prev), prev -1 for none
+# reverse=True searches in-edges, giving distances from every node *to* start_node
+# budget bounds the search (service areas, isochrones): it stops once the cheapest open node costs
+# more than budget, so every node with dist <= budget is exact and settled; nodes beyond it hold
+# tentative distances or inf
+def dijkstra_tree(graph, start_node: int, reverse: bool = False,
+                  budget: float = float('inf')) -> Tuple[np.ndarray, np.ndarray]:
+
+    compiled = as_compiled(graph)
+    offsets, targets, weights = compiled.reverse_adjacency() if reverse else compiled.adjacency()
+    source = compiled.node_index(start_node)
+
+    state = compiled.search_state('tree')
+    epoch = state.begin(source)
+    distances, previous, stamp, closed = state.dist, state.prev, state.stamp, state.closed
+    touched = state.touched
+
+    pq = [(0, source)]
+
+    while pq:
+        current_distance, current_node = heapq.heappop(pq)
+        if current_distance > budget:
+            break
+        if closed[current_node] == epoch:
+            continue
+        closed[current_node] = epoch
+
+        for edge in range(offsets[current_node], offsets[current_node + 1]):
+            neighbor = targets[edge]
+            if closed[neighbor] == epoch:
+                continue
+
+            distance = current_distance + weights[edge]
+
+            if stamp[neighbor] != epoch:
+                stamp[neighbor] = epoch
+                touched.append(neighbor)
+            elif distance >= distances[neighbor]:
+                continue
 
-                # Push new edge into pq
-                heapq.heappush(pq, (distance, neighbor))
+            distances[neighbor] = distance
+            previous[neighbor] = current_node
+            heapq.heappush(pq, (distance, neighbor))
 
+    # Scatter the reached nodes into dense arrays
+    dist = np.full(compiled.num_nodes, np.inf)
+    prev = np.full(compiled.num_nodes, -1, dtype=np.int64)
+    reached = np.asarray(touched, dtype=np.int64)
+    dist[reached] = [distances[i] for i in touched]
+    prev[reached] = [previous[i] for i in touched]
 
-    return distances, previous, visited
+    return dist, prev
 
 # Reconstructs path from start -> end using previous dict
 def reconstruct_path(previous: Mapping[int, Optional[int]], start_node: int, end_node: int) -> List[int]:
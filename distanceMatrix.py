@@ -0,0 +1,83 @@
+# I M P O R T S   &   D E P E N D E N C I E S ----------------------
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from compiledGraph import CompiledGraph, as_compiled
+from dijkstras import dijkstra_one_to_many
+from graphCache import fork_context
+
+# C O N S T A N T S ------------------------------------------------
+
+# Below this many sources the process pool costs more than it saves
+PARALLEL_THRESHOLD = 64
+
+# Per-process graph for pool workers
+_worker_graph: Optional[CompiledGraph] = None
+
+
+# H E L P E R   F U N C T I O N S ----------------------------------
+
+def _init_worker(compiled: CompiledGraph) -> None:
+    global _worker_graph
+    _worker_graph = compiled
+
+
+# Runs one search per source and fills the matching matrix rows
+def _rows(compiled: CompiledGraph, sources: Sequence[int], targets: Sequence[int],
+          keep_trees: bool) -> Tuple[np.ndarray, Optional[List[Dict[int, Optional[int]]]]]:
+
+    rows = np.full((len(sources), len(targets)), np.inf)
+    trees: Optional[List[Dict[int, Optional[int]]]] = [] if keep_trees else None
+
+    for i, source in enumerate(sources):
+        distances, previous, _ = dijkstra_one_to_many(compiled, source, targets)
+        rows[i] = [distances[target] for target in targets]
+        if trees is not None:
+            trees.append(previous)
+
+    return rows, trees
+
+
+def _worker_rows(sources: Sequence[int], targets: Sequence[int], keep_trees: bool):
+    return _rows(_worker_graph, sources, targets, keep_trees)
+
+
+# D I S T A N C E   M A T R I X ------------------------------------
+
+# Many-to-many shortest path distances
+# Returns (matrix, trees): matrix[i, j] is the distance sources[i] -> targets[j] (inf if unreachable),
+# trees[i] is the predecessor map of sources[i]'s search (usable with reconstruct_path) or None
+def distance_matrix(graph, sources: Sequence[int], targets: Sequence[int], return_predecessors: bool = False,
+                    workers: Optional[int] = None) -> Tuple[np.ndarray, Optional[List[Dict[int, Optional[int]]]]]:
+
+    compiled = as_compiled(graph)
+    sources, targets = list(sources), list(targets)
+
+    # Validate up front rather than inside a worker
+    for node in sources + targets:
+        compiled.node_index(node)
+
+    workers = workers or multiprocessing.cpu_count()
+    if workers <= 1 or len(sources) < PARALLEL_THRESHOLD:
+        return _rows(compiled, sources, targets, return_predecessors)
+
+    # Deal sources round-robin across worker processes
+    blocks = [sources[i::workers] for i in range(workers)]
+    matrix = np.full((len(sources), len(targets)), np.inf)
+    trees: Optional[List] = [None] * len(sources) if return_predecessors else None
+
+    with ProcessPoolExecutor(max_workers=workers, mp_context=fork_context(),
+                             initializer=_init_worker, initargs=(compiled,)) as pool:
+        futures = [pool.submit(_worker_rows, block, targets, return_predecessors) for block in blocks]
+
+        # Block b holds sources b, b + workers, b + 2 * workers, ...
+        for b, future in enumerate(futures):
+            rows, block_trees = future.result()
+            matrix[b::workers] = rows
+            if trees is not None:
+                trees[b::workers] = block_trees
+
+    return matrix, trees
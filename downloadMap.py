@@ -1,33 +1,314 @@
 # I M P O R T S   &   D E P E N D E N C I E S ----------------------
 import osmnx as ox
+import argparse
+import hashlib
+import json
 import os
+import re
+import tempfile
+import time
+import xml.etree.ElementTree as ET
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Dict, List, Optional, Sequence, Union
+from xml.sax.saxutils import quoteattr
 
-# Download GraphML files for a list of cities using osmnx and save them locally.
-def download_graphml_for_cities(cities, output_folder="graphml_files"):
+from graphCache import file_hash
+from graphRegistry import BACKBONE_SUFFIX
+
+# C O N S T A N T S ------------------------------------------------
+MANIFEST_NAME = "manifest.json"
+
+# Optional file in a source folder mapping osmnx cache files (hash-named) to the city they belong to
+SOURCE_MANIFEST_NAME = "sources.json"
+SOURCE_EXTENSIONS = (".osm", ".xml", ".json")
+
+# Drive network for offline sources, as tag -> excluded values (regex, as Overpass `!~` matches)
+# Mirrors osmnx's network_type="drive" Overpass filter; ways also need a highway tag
+DRIVE_EXCLUDED = {
+    'area': 'yes',
+    'access': 'private',
+    'highway': 'abandoned|bridleway|bus_guideway|construction|corridor|cycleway|elevator|escalator|footway|no|'
+               'path|pedestrian|planned|platform|proposed|raceway|razed|rest_area|service|services|steps|track',
+    'motor_vehicle': 'no',
+    'motorcar': 'no',
+    'service': 'alley|driveway|emergency_access|parking|parking_aisle|private',
+}
+
+# Statewide backbone: major roads only, joining the city graphs for statewideRouting.py
+BACKBONE_FILTER = '["highway"~"motorway|motorway_link|trunk|trunk_link|primary|primary_link"]'
+
+
+# H E L P E R   F U N C T I O N S ----------------------------------
+
+# Format city name to create a valid filename
+def city_filename(city: str) -> str:
+    return city.replace(", ", "_").replace(" ", "_").replace("/", "-") + ".graphml"
+
+
+# Filename of the backbone graph for a region
+def backbone_filename(region: str) -> str:
+    return city_filename(region)[:-len(".graphml")] + BACKBONE_SUFFIX + ".graphml"
+
+
+# True if a way's tags pass the drive network filter
+def is_drivable(tags: Dict[str, str]) -> bool:
+    if 'highway' not in tags:
+        return False
+    return not any(key in tags and re.search(pattern, tags[key]) for key, pattern in DRIVE_EXCLUDED.items())
+
+
+# Nodes and ways of one offline source as Overpass-style element dicts
+#   .osm / .xml -> OSM XML export
+#   .json       -> Overpass response with "elements" (e.g. an osmnx HTTP cache file); other JSON,
+#                  such as the Nominatim responses osmnx caches next to them, yields nothing
+def read_elements(source: str) -> List[dict]:
+    if source.endswith(".json"):
+        with open(source) as f:
+            response = json.load(f)
+        if not isinstance(response, dict) or "elements" not in response:
+            return []
+        return [element for element in response["elements"] if element.get("type") in ("node", "way")]
+
+    elements = []
+    for _, item in ET.iterparse(source):
+        if item.tag in ("node", "way"):
+            element = {'type': item.tag, 'id': int(item.get('id')),
+                       'tags': {tag.get('k'): tag.get('v') for tag in item.iter('tag')}}
+            if item.tag == "node":
+                element['lat'], element['lon'] = float(item.get('lat')), float(item.get('lon'))
+            else:
+                element['nodes'] = [int(nd.get('ref')) for nd in item.iter('nd')]
+            elements.append(element)
+            item.clear()
+    return elements
+
+
+# Writes nodes and ways as an OSM XML file
+def write_osm_xml(path: str, nodes: Dict[int, dict], ways: Dict[int, dict]) -> None:
+    def tags(element: dict) -> str:
+        return "".join(f"<tag k={quoteattr(k)} v={quoteattr(str(v))}/>"
+                       for k, v in element.get('tags', {}).items())
+
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write('<?xml version="1.0" encoding="UTF-8"?>\n<osm version="0.6" generator="downloadMap">\n')
+        for node in nodes.values():
+            f.write(f'<node id="{node["id"]}" lat="{node["lat"]}" lon="{node["lon"]}">{tags(node)}</node>\n')
+        for way in ways.values():
+            refs = "".join(f'<nd ref="{ref}"/>' for ref in way['nodes'])
+            f.write(f'<way id="{way["id"]}">{refs}{tags(way)}</way>\n')
+        f.write('</osm>\n')
+
+
+# Builds a drive network graph from offline sources instead of querying Overpass
+# Several files may cover one city (osmnx splits large areas into several Overpass queries), so
+# their elements are merged by id, filtered to drivable ways and loaded with ox.graph_from_xml
+def graph_from_source(sources: Union[str, Sequence[str]]):
+    sources = [sources] if isinstance(sources, str) else list(sources)
+
+    nodes: Dict[int, dict] = {}
+    ways: Dict[int, dict] = {}
+    for source in sources:
+        for element in read_elements(source):
+            if element['type'] == "node":
+                nodes[element['id']] = element
+            elif is_drivable(element.get('tags', {})):
+                ways[element['id']] = element
+    if not ways:
+        raise ValueError(f"No drivable ways in {', '.join(sources)}")
+
+    # Keep only the nodes the drivable ways use; ways whose nodes are missing are clipped
+    used = {ref for way in ways.values() for ref in way['nodes']}
+    nodes = {node_id: node for node_id, node in nodes.items() if node_id in used}
+    for way in ways.values():
+        way['nodes'] = [ref for ref in way['nodes'] if ref in nodes]
+    ways = {way_id: way for way_id, way in ways.items() if len(way['nodes']) > 1}
+
+    fd, path = tempfile.mkstemp(suffix=".osm")
+    os.close(fd)
+    try:
+        write_osm_xml(path, nodes, ways)
+        return ox.graph_from_xml(path, bidirectional=False, simplify=True, retain_all=False)
+    finally:
+        os.remove(path)
+
+
+# Offline sources for a city in source_dir, any of:
+#   <City_File_Stem>.osm / .xml / .json   -> one export or saved response
+#   <City_File_Stem>/                     -> every .osm / .xml / .json inside (several responses)
+#   sources.json                          -> {"<cache file>": "<city>"}, for osmnx's hash-named cache
+# Returns None if there are none
+def find_sources(city: str, source_dir: Optional[str]) -> Optional[List[str]]:
+    if not source_dir:
+        return None
+    stem = city_filename(city)[:-len(".graphml")]
+    found = [os.path.join(source_dir, stem + ext) for ext in SOURCE_EXTENSIONS]
+
+    folder = os.path.join(source_dir, stem)
+    if os.path.isdir(folder):
+        found.extend(os.path.join(folder, name) for name in sorted(os.listdir(folder)))
+
+    manifest_path = os.path.join(source_dir, SOURCE_MANIFEST_NAME)
+    if os.path.exists(manifest_path):
+        with open(manifest_path) as f:
+            mapping = json.load(f)
+        found.extend(os.path.join(source_dir, name) for name, owner in sorted(mapping.items()) if owner == city)
+
+    sources = [path for path in dict.fromkeys(found) if path.endswith(SOURCE_EXTENSIONS) and os.path.isfile(path)]
+    return sources or None
+
+
+# Combined SHA-1 over a city's source files (order independent)
+def sources_hash(sources: Sequence[str]) -> str:
+    digest = hashlib.sha1()
+    for file_digest in sorted(file_hash(source) for source in sources):
+        digest.update(file_digest.encode())
+    return digest.hexdigest()
+
+
+# Reads the manifest of completed cities
+def load_manifest(output_folder: str) -> Dict[str, dict]:
+    path = os.path.join(output_folder, MANIFEST_NAME)
+    if not os.path.exists(path):
+        return {}
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+# Writes the manifest atomically (temp file then rename)
+def save_manifest(output_folder: str, manifest: Dict[str, dict]) -> None:
+    path = os.path.join(output_folder, MANIFEST_NAME)
+    tmp = path + ".part"
+    with open(tmp, 'w') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    os.replace(tmp, path)
+
+
+# True if the manifest says this output is complete and the file on disk still matches
+def is_up_to_date(entry: Optional[dict], filepath: str, sources: Optional[Sequence[str]]) -> bool:
+    if not entry or not os.path.exists(filepath):
+        return False
+    if entry.get('sha1') != file_hash(filepath):
+        return False
+    if sources is not None and entry.get('source_sha1') != sources_hash(sources):
+        return False
+    return True
+
+
+# Worker: builds and saves one city graph, returns its manifest entry
+# Runs in a separate process, so it only takes and returns plain data
+# custom_filter replaces the drive network filter (the backbone downloads unsimplified, so every
+# node where a city street meets a major road keeps the OSM id the city graph uses)
+def build_city(city: str, filepath: str, sources: Optional[List[str]] = None,
+               custom_filter: Optional[str] = None) -> dict:
+    start_time = time.perf_counter()
+
+    # Offline sources if given, otherwise download the street network graph for the city
+    if sources is not None:
+        graph = graph_from_source(sources)
+    elif custom_filter is not None:
+        graph = ox.graph_from_place(city, custom_filter=custom_filter, simplify=False)
+    else:
+        graph = ox.graph_from_place(city, network_type="drive")
+
+    # Save to a temp file then rename so a crash never leaves a half-written graph
+    tmp = filepath + ".part"
+    ox.save_graphml(graph, tmp)
+    os.replace(tmp, filepath)
+
+    return {
+        'city': city,
+        'sha1': file_hash(filepath),
+        'sources': sources,
+        'source_sha1': sources_hash(sources) if sources is not None else None,
+        'nodes': graph.number_of_nodes(),
+        'edges': graph.number_of_edges(),
+        'seconds': time.perf_counter() - start_time,
+        'built_at': time.time(),
+    }
+
+
+# I N G E S T I O N ------------------------------------------------
+
+# Builds GraphML files for many cities concurrently, skipping outputs the manifest marks up to date
+def ingest_cities(cities: Sequence[str], output_folder: str = "graphml_files", workers: Optional[int] = None,
+                  sources: Optional[Dict[str, Union[str, List[str]]]] = None, source_dir: Optional[str] = None,
+                  force: bool = False, backbone: Optional[str] = None) -> List[dict]:
 
     # Ensure the output folder exists
     os.makedirs(output_folder, exist_ok=True)
+    manifest = load_manifest(output_folder)
+    sources = dict(sources or {})
+
+    # Every city, plus the backbone of the region if one was asked for
+    targets = [(city, city_filename(city), None) for city in cities]
+    if backbone:
+        targets.append((backbone, backbone_filename(backbone), BACKBONE_FILTER))
+
+    # Work out what actually needs building
+    jobs = []
+    results = []
+    for city, filename, custom_filter in targets:
+        filepath = os.path.join(output_folder, filename)
+        city_sources = None if custom_filter else sources.get(city) or find_sources(city, source_dir)
+        if isinstance(city_sources, str):
+            city_sources = [city_sources]
+
+        if not force and is_up_to_date(manifest.get(filename), filepath, city_sources):
+            print(f"Graph for {city} is up to date, skipping")
+            results.append({'city': city, 'status': 'skipped', 'seconds': 0.0})
+            continue
+        jobs.append((city, filename, filepath, city_sources, custom_filter))
+
+    if not jobs:
+        return results
 
-    for city in cities:
-        try:
-            print(f"Downloading graph for {city}...")
+    # Fan the builds out over a process pool
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {}
+        for city, filename, filepath, city_sources, custom_filter in jobs:
+            print(f"Building graph for {city}{' from ' + ', '.join(city_sources) if city_sources else ''}...")
+            futures[pool.submit(build_city, city, filepath, city_sources, custom_filter)] = (city, filename, filepath)
 
-            # Download the street network graph for the city
-            graph = ox.graph_from_place(city, network_type="drive")
+        for future in as_completed(futures):
+            city, filename, filepath = futures[future]
+            try:
+                entry = future.result()
+            except Exception as e:
+                print(f"Failed to build graph for {city}. Error: {e}")
+                results.append({'city': city, 'status': 'failed', 'error': str(e)})
+                continue
 
-            # Format city name to create a valid filename
-            filename = city.replace(", ", "_").replace(" ", "_").replace("/", "-") + ".graphml"
-            filepath = os.path.join(output_folder, filename)
+            # Record completion immediately so an interrupted run resumes from here
+            manifest[filename] = entry
+            save_manifest(output_folder, manifest)
+            print(f"Graph for {city} saved to {filepath} in {entry['seconds']:.1f} seconds")
+            results.append({'city': city, 'status': 'built', 'seconds': entry['seconds']})
+
+    return results
+
+
+# Download GraphML files for a list of cities using osmnx and save them locally.
+def download_graphml_for_cities(cities, output_folder="graphml_files"):
+    return ingest_cities(cities, output_folder=output_folder)
 
-            # Save the graph to a GraphML file
-            ox.save_graphml(graph, filepath)
-            print(f"Graph for {city} saved to {filepath}")
-        except Exception as e:
-            print(f"Failed to download graph for {city}. Error: {e}")
 
 # M A I N ----------------------------------------------------------
 if __name__ == "__main__":
 
+    parser = argparse.ArgumentParser(description="Build GraphML street networks for Florida cities")
+    parser.add_argument("--output", default="graphml_files", help="Output folder for GraphML files")
+    parser.add_argument("--workers", type=int, default=None, help="Number of worker processes")
+    parser.add_argument("--source-dir", default=None,
+                        help="Folder of offline sources to build from: <City_File_Stem>.osm/.xml/.json, a "
+                             "<City_File_Stem>/ folder of them, or osmnx cache files listed in sources.json")
+    parser.add_argument("--force", action="store_true", help="Rebuild even if the manifest says up to date")
+    parser.add_argument("--backbone", action="store_true",
+                        help="Also build the statewide major-road backbone used by statewideRouting.py")
+    args = parser.parse_args()
+
     # Major cities in Florida
     cities_in_florida = [
         "Miami, Florida, USA",
@@ -43,4 +324,10 @@ if __name__ == "__main__":
     ]
 
     # Download GraphML files for these cities
-    download_graphml_for_cities(cities_in_florida)
+    results = ingest_cities(cities_in_florida, output_folder=args.output, workers=args.workers,
+                            source_dir=args.source_dir, force=args.force,
+                            backbone="Florida, USA" if args.backbone else None)
+
+    # Per-city timing summary
+    for result in results:
+        print(f"{result['city']:<35} {result['status']:<8} {result.get('seconds', 0.0):8.1f}s")
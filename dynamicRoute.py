@@ -0,0 +1,188 @@
+# I M P O R T S   &   D E P E N D E N C I E S ----------------------
+import heapq
+from typing import Dict, List, Set, Tuple
+
+from compiledGraph import CompiledGraph, DistanceMap, PredecessorMap
+from trafficWeights import TrafficLayer, WeightChange
+
+
+# D Y N A M I C   R O U T E ----------------------------------------
+
+# A Dijkstra route that keeps its search (settled set, tentative distances, tree) alive between
+# traffic updates and repairs it instead of searching again from scratch
+#   an increased tree edge invalidates only the subtree below it
+#   a decreased edge out of the settled region invalidates settled nodes farther than its new key
+# Everything still valid stays settled; the search then resumes from the repaired frontier
+class DynamicRoute:
+    def __init__(self, compiled: CompiledGraph, start_node: int, end_node: int):
+        self.compiled = compiled
+        self.start_node, self.end_node = start_node, end_node
+        self.source = compiled.node_index(start_node)
+        self.target = compiled.node_index(end_node)
+
+        # Nodes settled by the last search or repair (work done)
+        self.nodes_visited = 0
+
+        self._restart()
+
+    # Fresh search from the source
+    def _restart(self) -> None:
+        # Sparse private state (indices): tentative distance and parent of every reached node
+        self.dist: Dict[int, float] = {self.source: 0.0}
+        self.prev: Dict[int, int] = {self.source: -1}
+        self.settled: Set[int] = set()
+
+        # The heap survives between repairs; entries whose key no longer matches dist are stale
+        self.pq: List[Tuple[float, int]] = [(0.0, self.source)]
+        self._resume()
+
+    # Dijkstra on the kept heap until the target is popped; settled nodes are never reopened
+    def _resume(self) -> None:
+        offsets, targets, weights = self.compiled.adjacency()
+        dist, prev, settled, target, pq = self.dist, self.prev, self.settled, self.target, self.pq
+        visited = 0
+
+        while pq:
+            current_distance, current_node = heapq.heappop(pq)
+            if current_node in settled or current_distance != dist.get(current_node):
+                continue
+            if current_node == target:
+                break
+            settled.add(current_node)
+            visited += 1
+
+            for edge in range(offsets[current_node], offsets[current_node + 1]):
+                neighbor = targets[edge]
+                if neighbor in settled:
+                    continue
+                distance = current_distance + weights[edge]
+                if distance < dist.get(neighbor, float('inf')):
+                    dist[neighbor] = distance
+                    prev[neighbor] = current_node
+                    heapq.heappush(pq, (distance, neighbor))
+
+        self.nodes_visited = visited
+
+    # Repairs the search after a weight change; returns True if anything was invalidated
+    def repair(self, change: WeightChange) -> bool:
+        dist, prev, settled = self.dist, self.prev, self.settled
+        inf = float('inf')
+
+        roots: List[int] = []
+        cut = inf
+        heads: Set[int] = set()
+        for tail, head, old, new in zip(change.tails.tolist(), change.heads.tolist(),
+                                        change.old.tolist(), change.new.tolist()):
+
+            # Edges out of unsettled nodes were never relaxed, so they cannot matter yet
+            if tail not in settled:
+                continue
+            heads.add(head)
+
+            if new > old and prev.get(head) == tail:
+                roots.append(head)
+            elif new < old and dist[tail] + new < dist.get(head, inf):
+                cut = min(cut, dist[tail] + new)
+
+        if not roots and cut == inf:
+            self.nodes_visited = 0
+            return False
+
+        # Settled nodes beyond the cheapest improved key may now have shorter paths
+        if cut < inf:
+            roots.extend(node for node in settled if dist[node] > cut)
+
+        # Everything below an invalid node in the shortest path tree is invalid too
+        # (children are the out-neighbours whose parent is the node)
+        offsets, targets, _ = self.compiled.adjacency()
+        invalid: Set[int] = set()
+        stack = roots
+        while stack:
+            node = stack.pop()
+            if node in invalid:
+                continue
+            invalid.add(node)
+            for edge in range(offsets[node], offsets[node + 1]):
+                child = targets[edge]
+                if prev.get(child) == node and child not in invalid:
+                    stack.append(child)
+
+        # Most of the search is invalid: starting over is cheaper than patching
+        if len(invalid) * 2 > len(settled):
+            self._restart()
+            return True
+
+        settled -= invalid
+
+        # Best entry into each invalid node (and each changed head) from the still-valid region
+        rev_offsets, rev_sources, rev_weights = self.compiled.reverse_adjacency()
+        for node in invalid | (heads - settled):
+            best, parent = inf, -1
+            for slot in range(rev_offsets[node], rev_offsets[node + 1]):
+                source = rev_sources[slot]
+                if source in settled:
+                    distance = dist[source] + rev_weights[slot]
+                    if distance < best:
+                        best, parent = distance, source
+            if parent >= 0:
+                dist[node], prev[node] = best, parent
+                heapq.heappush(self.pq, (best, node))
+            else:
+                dist.pop(node, None)
+                prev.pop(node, None)
+
+        # The target's entry was consumed when the last search stopped
+        if self.target in dist:
+            heapq.heappush(self.pq, (dist[self.target], self.target))
+
+        self._resume()
+        return True
+
+    # (distances, previous, visited) keyed by OSM id, like dijkstra()
+    def result(self) -> Tuple[DistanceMap, PredecessorMap, Set[int]]:
+        node_list = self.compiled.node_list()
+        distances, previous = DistanceMap(), PredecessorMap()
+        for node, distance in self.dist.items():
+            distances[node_list[node]] = distance
+            parent = self.prev[node]
+            previous[node_list[node]] = node_list[parent] if parent >= 0 else None
+        return distances, previous, {node_list[node] for node in self.settled}
+
+    @property
+    def distance(self) -> float:
+        return self.dist.get(self.target, float('inf'))
+
+    # Route as OSM ids (empty if unreachable)
+    def path(self) -> List[int]:
+        if self.target not in self.dist:
+            return []
+        node_list = self.compiled.node_list()
+        path, node = [], self.target
+        while node >= 0:
+            path.append(node_list[node])
+            node = self.prev[node]
+        return path[::-1]
+
+
+# A C T I V E   R O U T E S ----------------------------------------
+
+# Routes kept up to date as the traffic layer changes
+class ActiveRoutes:
+    def __init__(self, layer: TrafficLayer):
+        self.layer = layer
+        self.routes: Dict[Tuple[int, int], DynamicRoute] = {}
+        layer.listeners.append(self.repair_all)
+
+    # Adds (or returns the existing) live route between two OSM ids
+    def add(self, start_node: int, end_node: int) -> DynamicRoute:
+        key = (start_node, end_node)
+        if key not in self.routes:
+            self.routes[key] = DynamicRoute(self.layer.compiled, start_node, end_node)
+        return self.routes[key]
+
+    def remove(self, start_node: int, end_node: int) -> None:
+        self.routes.pop((start_node, end_node), None)
+
+    # Repairs every route touched by the change; returns the routes whose search was redone
+    def repair_all(self, change: WeightChange) -> List[DynamicRoute]:
+        return [route for route in self.routes.values() if route.repair(change)]
@@ -0,0 +1,242 @@
+# I M P O R T S   &   D E P E N D E N C I E S ----------------------
+import hashlib
+import json
+import multiprocessing
+import os
+import pickle
+import shutil
+import tempfile
+import threading
+from typing import Dict, Optional, Tuple
+
+from compiledGraph import CompiledGraph, compile_graph
+from spatialIndex import SpatialIndex
+
+
+# C O N S T A N T S ------------------------------------------------
+SNAPSHOT_DIR = os.path.join("cache", "graphs")
+
+# Bump when the snapshot layout changes so old snapshots are rebuilt
+SNAPSHOT_VERSION = 3
+
+# File hashes already computed in this process, keyed by (absolute path, size, mtime_ns)
+_hashes: Dict[Tuple[str, int, int], str] = {}
+_hashes_lock = threading.Lock()
+
+
+# F U N C T I O N S ------------------------------------------------
+
+# Memo key for a file: a rewrite changes its size or modification time
+def _hash_key(path: str) -> Tuple[str, int, int]:
+    stat = os.stat(path)
+    return os.path.abspath(path), stat.st_size, stat.st_mtime_ns
+
+
+# SHA-1 of a file's contents, read in chunks
+# Memoized per process, so the several callers that key caches on one GraphML hash it once
+def file_hash(path: str) -> str:
+    key = _hash_key(path)
+    with _hashes_lock:
+        if key in _hashes:
+            return _hashes[key]
+
+    sha = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            sha.update(chunk)
+
+    with _hashes_lock:
+        _hashes[key] = sha.hexdigest()
+    return _hashes[key]
+
+
+# Seeds the hash memo from a snapshot built from this exact file (same path, size and mtime), so a
+# fresh process with a warm snapshot cache never reads the GraphML just to find its snapshot
+def _recall_hash(path: str, cache_dir: str) -> None:
+    key = _hash_key(path)
+    with _hashes_lock:
+        if key in _hashes:
+            return
+    stem = os.path.splitext(os.path.basename(path))[0]
+    suffix = f"-{key[2]}"
+    if not os.path.isdir(cache_dir):
+        return
+    for name in os.listdir(cache_dir):
+        if not (name.startswith(f"{stem}-") and name.endswith(suffix)):
+            continue
+        try:
+            with open(os.path.join(cache_dir, name, "meta.json")) as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            continue
+        if (meta.get('source'), meta.get('source_size'), meta.get('source_mtime_ns')) == key and meta.get('source_sha1'):
+            with _hashes_lock:
+                _hashes[key] = meta['source_sha1']
+            return
+
+
+# Snapshot key for a source file: content hash plus modification time
+def snapshot_key(path: str, cache_dir: str = SNAPSHOT_DIR) -> str:
+    _recall_hash(path, cache_dir)
+    mtime_ns = os.stat(path).st_mtime_ns
+    return f"{file_hash(path)[:16]}-{mtime_ns}"
+
+
+# Directory holding the snapshot for a given source file and key
+def snapshot_path(path: str, key: str, cache_dir: str = SNAPSHOT_DIR) -> str:
+    stem = os.path.splitext(os.path.basename(path))[0]
+    return os.path.join(cache_dir, f"{stem}-{key}")
+
+
+# Removes every other snapshot built from the same source file
+def _drop_stale(path: str, keep: str, cache_dir: str) -> None:
+    stem = os.path.splitext(os.path.basename(path))[0]
+    if not os.path.isdir(cache_dir):
+        return
+    for name in os.listdir(cache_dir):
+        full = os.path.join(cache_dir, name)
+        if name.startswith(f"{stem}-") and full != keep and os.path.isdir(full):
+            # Only touch snapshot dirs for this exact stem (stem-<hash>-<mtime>)
+            if name[len(stem) + 1:].count('-') == 1:
+                shutil.rmtree(full, ignore_errors=True)
+
+
+# Writes graph, projected graph and compiled arrays to a snapshot directory atomically
+def save_snapshot(path: str, key: str, graph, graph_proj, compiled: CompiledGraph,
+                  cache_dir: str = SNAPSHOT_DIR) -> str:
+    target = snapshot_path(path, key, cache_dir)
+    os.makedirs(cache_dir, exist_ok=True)
+
+    # Build in a temp dir next to the target, then rename into place
+    tmp = tempfile.mkdtemp(dir=cache_dir, prefix=".tmp-")
+    try:
+        with open(os.path.join(tmp, "graphs.pkl"), 'wb') as f:
+            pickle.dump((graph, graph_proj), f, protocol=pickle.HIGHEST_PROTOCOL)
+
+        compiled.save(os.path.join(tmp, "compiled"))
+        SpatialIndex.from_graph(graph_proj).save(os.path.join(tmp, "spatial"))
+
+        source, source_size, source_mtime_ns = _hash_key(path)
+        meta = {
+            'version': SNAPSHOT_VERSION,
+            'source': source,
+            'source_size': source_size,
+            'source_mtime_ns': source_mtime_ns,
+            'source_sha1': file_hash(path),
+            'key': key,
+            'weight': compiled.weight,
+        }
+        with open(os.path.join(tmp, "meta.json"), 'w') as f:
+            json.dump(meta, f)
+
+        if os.path.exists(target):
+            shutil.rmtree(target)
+        os.replace(tmp, target)
+    except BaseException:
+        shutil.rmtree(tmp, ignore_errors=True)
+        raise
+
+    _drop_stale(path, target, cache_dir)
+    return target
+
+
+# Reads a snapshot's meta.json if it exists and matches the key, otherwise returns None
+def load_snapshot_meta(target: str, key: str) -> Optional[dict]:
+    meta_file = os.path.join(target, "meta.json")
+    if not os.path.exists(meta_file):
+        return None
+    try:
+        with open(meta_file) as f:
+            meta = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if meta.get('version') != SNAPSHOT_VERSION or meta.get('key') != key:
+        return None
+    return meta
+
+
+# Loads a snapshot if it exists and matches the key, otherwise returns None
+def load_snapshot(path: str, key: str, cache_dir: str = SNAPSHOT_DIR) -> Optional[Tuple[object, object, CompiledGraph]]:
+    target = snapshot_path(path, key, cache_dir)
+    meta = load_snapshot_meta(target, key)
+    if meta is None:
+        return None
+
+    try:
+        with open(os.path.join(target, "graphs.pkl"), 'rb') as f:
+            graph, graph_proj = pickle.load(f)
+
+        # Compiled arrays are memory-mapped rather than read in
+        compiled = CompiledGraph.load(os.path.join(target, "compiled"), weight=meta['weight'])
+    except (OSError, ValueError, EOFError, pickle.UnpicklingError) as e:
+        print(f"Ignoring unreadable snapshot {target}: {e}")
+        return None
+
+    return graph, graph_proj, compiled
+
+
+# Loads a GraphML file through the snapshot cache
+# Returns (graph, graph_proj, compiled); parses and projects only on a cache miss
+def load_graph(path: str, cache_dir: str = SNAPSHOT_DIR, use_cache: bool = True):
+    key = snapshot_key(path, cache_dir)
+
+    if use_cache:
+        cached = load_snapshot(path, key, cache_dir)
+        if cached is not None:
+            return cached
+
+    # Cache miss: parse, project and compile, then store the snapshot
+    # (osmnx pulls in geopandas, shapely and pyproj, so it is only imported when a parse is needed)
+    import osmnx as ox
+
+    graph = ox.load_graphml(path)
+    graph_proj = ox.project_graph(graph)
+    compiled = compile_graph(graph)
+
+    if use_cache:
+        try:
+            save_snapshot(path, key, graph, graph_proj, compiled, cache_dir)
+        except OSError as e:
+            print(f"Could not write graph snapshot for {path}: {e}")
+
+    return graph, graph_proj, compiled
+
+
+# Loads only the compiled search arrays for a GraphML file (building the snapshot if needed)
+# Cheap enough to call from every worker process: the arrays are memory-mapped and shared
+def load_compiled(path: str, cache_dir: str = SNAPSHOT_DIR) -> CompiledGraph:
+    key = snapshot_key(path, cache_dir)
+    target = snapshot_path(path, key, cache_dir)
+
+    meta = load_snapshot_meta(target, key)
+    if meta is None:
+        # Build the snapshot (parses the GraphML once)
+        compiled = load_graph(path, cache_dir=cache_dir)[2]
+        meta = load_snapshot_meta(target, key)
+        if meta is None:
+            # Snapshot could not be written; use the in-memory arrays
+            return compiled
+
+    return CompiledGraph.load(os.path.join(target, "compiled"), weight=meta['weight'])
+
+
+# Multiprocessing context for worker pools over loaded graphs
+# Fork where the platform has it, so workers inherit whatever the parent already loaded copy-on-write;
+# elsewhere workers start fresh and load_compiled memory-maps the same snapshot
+def fork_context():
+    methods = multiprocessing.get_all_start_methods()
+    return multiprocessing.get_context('fork' if 'fork' in methods else None)
+
+
+# Loads the projected-coordinate spatial index for a GraphML file (building the snapshot if needed)
+def load_spatial_index(path: str, cache_dir: str = SNAPSHOT_DIR) -> SpatialIndex:
+    key = snapshot_key(path, cache_dir)
+    target = snapshot_path(path, key, cache_dir)
+
+    if load_snapshot_meta(target, key) is None:
+        graph_proj = load_graph(path, cache_dir=cache_dir)[1]
+        if load_snapshot_meta(target, key) is None:
+            # Snapshot could not be written; build in memory
+            return SpatialIndex.from_graph(graph_proj)
+
+    return SpatialIndex.load(os.path.join(target, "spatial"))
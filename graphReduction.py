@@ -0,0 +1,354 @@
+# I M P O R T S   &   D E P E N D E N C I E S ----------------------
+import argparse
+import json
+import random
+import sys
+import time
+from collections import deque
+from typing import Dict, Iterable, List, Tuple
+
+import numpy as np
+from scipy.sparse import csr_matrix
+from scipy.sparse.csgraph import connected_components
+
+from compiledGraph import CompiledGraph
+from dijkstras import dijkstra
+
+# C O N S T A N T S ------------------------------------------------
+
+# Random pairs per city for the query speedup report
+REPORT_QUERIES = 100
+
+
+# H E L P E R   F U N C T I O N S ----------------------------------
+
+# Strongly connected component label of every node (scipy's Tarjan over the CSR arrays)
+def scc_labels(compiled: CompiledGraph) -> Tuple[int, np.ndarray]:
+    matrix = csr_matrix((np.ones(compiled.num_edges, dtype=np.int8), compiled.targets, compiled.offsets),
+                        shape=(compiled.num_nodes, compiled.num_nodes))
+    return connected_components(matrix, directed=True, connection='strong')
+
+
+# CSR arrays of the subgraph induced by a node mask, re-indexed densely
+def _induced(compiled: CompiledGraph, keep: np.ndarray):
+    new_index = np.full(compiled.num_nodes, -1, dtype=np.int64)
+    new_index[keep] = np.arange(int(keep.sum()))
+
+    sources = compiled.edge_sources()
+    edges = keep[sources] & keep[compiled.targets]
+    src, dst, wts = new_index[sources[edges]], new_index[compiled.targets[edges]], compiled.weights[edges]
+    offsets = np.zeros(int(keep.sum()) + 1, dtype=np.int64)
+    np.cumsum(np.bincount(src, minlength=len(offsets) - 1), out=offsets[1:])
+    return np.flatnonzero(keep), offsets, dst, np.asarray(wts, dtype=np.float64)
+
+
+# R E A C H A B I L I T Y ------------------------------------------
+
+# Answers "can start reach end at all" without a search, for graphs kept whole
+# Nodes in the same strongly connected component always can; otherwise a BFS over the
+# condensation (one vertex per component, usually a few hundred) decides, which is far cheaper
+# than a Dijkstra that settles everything reachable before returning inf.
+class Reachability:
+    def __init__(self, compiled: CompiledGraph):
+        self.compiled = compiled
+        self.num_components, self.labels = scc_labels(compiled)
+
+        # Condensation edges between distinct components, deduplicated, as CSR
+        sources = self.labels[compiled.edge_sources()]
+        targets = self.labels[compiled.targets]
+        between = sources != targets
+        pairs = np.unique(np.stack([sources[between], targets[between]], axis=1), axis=0)
+        self.offsets = np.zeros(self.num_components + 1, dtype=np.int64)
+        np.cumsum(np.bincount(pairs[:, 0], minlength=self.num_components), out=self.offsets[1:])
+        self.successors = pairs[:, 1].tolist()
+        self.offset_list = self.offsets.tolist()
+
+    # True if some path leads from start_node to end_node (OSM ids)
+    def reachable(self, start_node: int, end_node: int) -> bool:
+        source = self.labels[self.compiled.node_index(start_node)]
+        target = self.labels[self.compiled.node_index(end_node)]
+        if source == target:
+            return True
+
+        offsets, successors = self.offset_list, self.successors
+        seen = {source}
+        frontier = deque([source])
+        while frontier:
+            component = frontier.popleft()
+            for successor in successors[offsets[component]:offsets[component + 1]]:
+                if successor == target:
+                    return True
+                if successor not in seen:
+                    seen.add(successor)
+                    frontier.append(successor)
+        return False
+
+
+# R E D U C E D   G R A P H ----------------------------------------
+
+# Graph after reduction, searched with dense int32 ids
+#   compiled            -> CompiledGraph whose node ids are 0..n-1 (int32), so searches take dense ids
+#   osm_ids[i]          -> OSM id of dense node i (the reverse map)
+#   via_nodes[via_offsets[e]:via_offsets[e + 1]] -> OSM ids of the shape nodes collapsed into edge e
+# Distances between kept nodes are exactly those of the original graph.
+class ReducedGraph:
+    def __init__(self, compiled: CompiledGraph, osm_ids: np.ndarray, via_offsets: np.ndarray,
+                 via_nodes: np.ndarray, shape_to: Dict[int, int], report: dict):
+        self.compiled = compiled
+        self.osm_ids = osm_ids
+        self.via_offsets = via_offsets
+        self.via_nodes = via_nodes
+        self.report = report
+
+        # OSM id -> dense id for kept nodes; collapsed shape nodes map to the kept node their chain starts at
+        self.dense: Dict[int, int] = {node: i for i, node in enumerate(osm_ids.tolist())}
+        self.shape_to = shape_to
+
+    # Dense id for an OSM id (shape nodes snap to the start of their chain)
+    def to_dense(self, node: int) -> int:
+        if node in self.dense:
+            return self.dense[node]
+        if node in self.shape_to:
+            return self.shape_to[node]
+        raise ValueError(f"Node {node} is outside the strongly connected core")
+
+    # OSM ids of a dense path, with the shape nodes of every collapsed edge put back for drawing
+    def to_osm(self, path: List[int]) -> List[int]:
+        if not path:
+            return []
+        offsets, targets, weights = self.compiled.adjacency()
+        via_offsets, via_nodes, osm_ids = self.via_offsets, self.via_nodes, self.osm_ids
+
+        expanded = [int(osm_ids[path[0]])]
+        for u, v in zip(path, path[1:]):
+            edge = min((edge for edge in range(offsets[u], offsets[u + 1]) if targets[edge] == v),
+                       key=weights.__getitem__)
+            expanded.extend(via_nodes[via_offsets[edge]:via_offsets[edge + 1]].tolist())
+            expanded.append(int(osm_ids[v]))
+        return expanded
+
+
+# R E D U C T I O N   P I P E L I N E ------------------------------
+
+# Nodes that only continue a road: exactly two distinct neighbours and either a one-way pass
+# (one edge in, one out) or a two-way pass (both neighbours in both directions)
+def _chain_nodes(offsets: np.ndarray, targets: np.ndarray, num_nodes: int) -> np.ndarray:
+    sources = np.repeat(np.arange(num_nodes, dtype=np.int64), np.diff(offsets))
+    real = sources != targets
+    looped = np.bincount(sources[~real], minlength=num_nodes) > 0
+    sources, targets = sources[real], targets[real]
+
+    out_degree = np.bincount(sources, minlength=num_nodes)
+    in_degree = np.bincount(targets, minlength=num_nodes)
+    undirected = np.unique(np.stack([np.minimum(sources, targets), np.maximum(sources, targets)], axis=1), axis=0)
+    neighbours = np.bincount(undirected.ravel(), minlength=num_nodes)
+
+    one_way = (out_degree == 1) & (in_degree == 1)
+    two_way = (out_degree == 2) & (in_degree == 2)
+    return (neighbours == 2) & (one_way | two_way) & ~looped
+
+
+# Collapses degree-2 chains of a CSR graph into single edges
+# Returns (kept mask, edges as (tail, head, weight, shape node indices)) over the input indices
+# Chains leaving and re-entering the same kept node come back as self loops, for their shape nodes
+def _compress_chains(offsets: np.ndarray, targets: np.ndarray, weights: np.ndarray,
+                     removable: np.ndarray) -> Tuple[np.ndarray, List[Tuple[int, int, float, List[int]]]]:
+    offset_list, target_list, weight_list = offsets.tolist(), targets.tolist(), weights.tolist()
+    removable_list = removable.tolist()
+    visited = np.zeros(len(removable), dtype=bool)
+
+    # Walks from every kept node through removable nodes until the next kept node
+    # Chains are only ever entered from a kept end, so pure cycles of shape nodes stay unvisited
+    edges: List[Tuple[int, int, float, List[int]]] = []
+    for u in np.flatnonzero(~removable).tolist():
+        for edge in range(offset_list[u], offset_list[u + 1]):
+            previous, current, total, shape = u, target_list[edge], weight_list[edge], []
+            while removable_list[current]:
+                shape.append(current)
+                step = next(e for e in range(offset_list[current], offset_list[current + 1])
+                            if target_list[e] != previous)
+                previous, current = current, target_list[step]
+                total += weight_list[step]
+            edges.append((u, current, total, shape))
+            visited[shape] = True
+
+    # Unvisited shape nodes (isolated cycles) are kept with their original edges
+    restored = removable & ~visited
+    for u in np.flatnonzero(restored).tolist():
+        for edge in range(offset_list[u], offset_list[u + 1]):
+            edges.append((u, target_list[edge], weight_list[edge], []))
+    return ~removable | restored, edges
+
+
+# Runs the whole pipeline on a compiled graph
+#   1. keep the largest strongly connected component (drops islands and dead-end fragments)
+#   2. collapse degree-2 chains into weighted edges that remember their shape nodes
+#   3. renumber the survivors to dense int32 ids with an OSM id reverse map
+# protect lists OSM ids that must survive step 2 (depots, landmarks)
+def reduce_graph(compiled: CompiledGraph, protect: Iterable[int] = (), compress: bool = True) -> ReducedGraph:
+    reduction_start_time = time.perf_counter()
+    report = {'nodes': compiled.num_nodes, 'edges': compiled.num_edges}
+
+    # 1. Strongly connected core
+    num_components, labels = scc_labels(compiled)
+    largest = np.argmax(np.bincount(labels))
+    kept_ids, offsets, targets, weights = _induced(compiled, labels == largest)
+    report.update(components=int(num_components), core_nodes=len(kept_ids), core_edges=len(targets))
+
+    # 2. Chain compression over the core
+    removable = np.zeros(len(kept_ids), dtype=bool)
+    if compress:
+        removable = _chain_nodes(offsets, targets, len(kept_ids))
+        removable &= ~np.isin(compiled.node_ids[kept_ids], np.fromiter(protect, dtype=np.int64))
+    keep, edges = _compress_chains(offsets, targets, weights, removable)
+
+    # 3. Dense ids over the survivors; chain edges are sorted like compile_graph's and parallel
+    #    duplicates collapse to the cheapest (keeping that one's shape nodes)
+    dense = np.full(len(keep), -1, dtype=np.int64)
+    dense[keep] = np.arange(int(keep.sum()))
+    original = kept_ids[keep]
+    edges.sort(key=lambda e: (dense[e[0]], dense[e[1]], e[2]))
+
+    src, dst, wts, via_offsets, via_nodes = [], [], [], [0], []
+    osm_ids = compiled.node_ids[kept_ids]
+    shape_to: Dict[int, int] = {}
+    for u, v, weight, shape in edges:
+        tail, head = int(dense[u]), int(dense[v])
+
+        # Shape nodes of loops and of parallel chains dropped for a cheaper one still snap to their start
+        shape_ids = osm_ids[shape].tolist()
+        for node in shape_ids:
+            shape_to.setdefault(node, tail)
+        if tail == head or (src and src[-1] == tail and dst[-1] == head):
+            continue
+        src.append(tail)
+        dst.append(head)
+        wts.append(weight)
+        via_nodes.extend(shape_ids)
+        via_offsets.append(len(via_nodes))
+
+    num_nodes = len(original)
+    index_type = np.int32 if max(num_nodes, len(dst)) < 2 ** 31 else np.int64
+    reduced_offsets = np.zeros(num_nodes + 1, dtype=index_type)
+    np.cumsum(np.bincount(np.asarray(src, dtype=np.int64), minlength=num_nodes), out=reduced_offsets[1:])
+    reduced = CompiledGraph(np.arange(num_nodes, dtype=index_type), reduced_offsets,
+                            np.asarray(dst, dtype=index_type), np.asarray(wts, dtype=np.float64),
+                            compiled.lat[original], compiled.lon[original], weight=compiled.weight)
+
+    report.update(reduced_nodes=reduced.num_nodes, reduced_edges=reduced.num_edges, shape_nodes=len(shape_to),
+                  seconds=time.perf_counter() - reduction_start_time)
+    return ReducedGraph(reduced, compiled.node_ids[original], np.asarray(via_offsets, dtype=np.int64),
+                        np.asarray(via_nodes, dtype=np.int64), shape_to, report)
+
+
+# Loads a GraphML file's compiled arrays through the snapshot cache and reduces them
+def load_reduced(path: str, protect: Iterable[int] = ()) -> ReducedGraph:
+    from graphCache import load_compiled
+
+    return reduce_graph(load_compiled(path), protect=protect)
+
+
+# R E P O R T ------------------------------------------------------
+
+# Reduction counts plus the query speedup on random core pairs, checked against the original graph
+# Also times what unreachable pairs cost an unreduced Dijkstra against the up-front check
+def reduction_report(compiled: CompiledGraph, queries: int = REPORT_QUERIES, seed: int = 0) -> Tuple[dict, int]:
+    reduced = reduce_graph(compiled)
+    report = dict(reduced.report)
+    rng = random.Random(seed)
+
+    # Query speedup between kept nodes (exact: chain edges carry the full chain weight)
+    kept = reduced.osm_ids.tolist()
+    pairs = [(rng.choice(kept), rng.choice(kept)) for _ in range(queries)]
+    original_seconds = reduced_seconds = 0.0
+    mismatches = 0
+    for start_node, end_node in pairs:
+        query_start_time = time.perf_counter()
+        expected = dijkstra(compiled, start_node, end_node)[0][end_node]
+        original_seconds += time.perf_counter() - query_start_time
+
+        start, end = reduced.dense[start_node], reduced.dense[end_node]
+        query_start_time = time.perf_counter()
+        distances, previous, _ = dijkstra(reduced.compiled, start, end)
+        reduced_seconds += time.perf_counter() - query_start_time
+        if abs(distances[end] - expected) > 1e-6 * max(1.0, expected):
+            mismatches += 1
+
+    # Unreachable pairs among arbitrary nodes, and what a plain search spends finding that out
+    reachability = Reachability(compiled)
+    nodes = compiled.node_list()
+    unreachable = 0
+    unreachable_search_seconds = check_seconds = 0.0
+    for _ in range(queries):
+        start_node, end_node = rng.choice(nodes), rng.choice(nodes)
+        check_start_time = time.perf_counter()
+        reachable = reachability.reachable(start_node, end_node)
+        check_seconds += time.perf_counter() - check_start_time
+        if not reachable:
+            unreachable += 1
+            query_start_time = time.perf_counter()
+            dijkstra(compiled, start_node, end_node)
+            unreachable_search_seconds += time.perf_counter() - query_start_time
+
+    report.update(
+        original_ms=original_seconds / len(pairs) * 1000,
+        reduced_ms=reduced_seconds / len(pairs) * 1000,
+        speedup=original_seconds / reduced_seconds if reduced_seconds else float('inf'),
+        unreachable_pairs=unreachable,
+        unreachable_search_ms=unreachable_search_seconds / unreachable * 1000 if unreachable else 0.0,
+        reachability_check_ms=check_seconds / queries * 1000,
+    )
+    return report, mismatches
+
+
+# M A I N ----------------------------------------------------------
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Reduce city graphs (SCC core, chain compression, dense ids) "
+                                                 "and report the query speedup")
+    parser.add_argument("graph_files", nargs="*", help="GraphML files (default: every city the registry finds)")
+    parser.add_argument("--queries", type=int, default=REPORT_QUERIES, help="Random pairs per city")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", default=None, help="Write the per-city reports to this JSON file")
+    args = parser.parse_args(argv)
+
+    from graphCache import load_compiled
+
+    graph_files = args.graph_files
+    if not graph_files:
+        from graphRegistry import default_registry
+        registry = default_registry()
+        graph_files = [registry.path(name) for name in sorted(registry.entries)]
+
+    reports = {}
+    failed = 0
+    print(f"{'city':<28} {'nodes':>15} {'edges':>15} {'shape':>7} {'orig ms':>8} {'red ms':>7} {'speedup':>7} "
+          f"{'unreach':>8}")
+    for graph_file in graph_files:
+        compiled = load_compiled(graph_file)
+        report, mismatches = reduction_report(compiled, queries=args.queries, seed=args.seed)
+        report['mismatches'] = mismatches
+        failed += mismatches
+        reports[graph_file] = report
+
+        name = graph_file.rsplit('/', 1)[-1].rsplit('.', 1)[0]
+        print(f"{name:<28} {report['nodes']:>7}->{report['reduced_nodes']:<7} "
+              f"{report['edges']:>7}->{report['reduced_edges']:<7} {report['shape_nodes']:>7} "
+              f"{report['original_ms']:>8.2f} {report['reduced_ms']:>7.2f} {report['speedup']:>6.2f}x "
+              f"{report['unreachable_pairs']:>8}")
+        if report['unreachable_pairs']:
+            print(f"{'':<28} unreachable pairs cost {report['unreachable_search_ms']:.1f} ms per search, "
+                  f"{report['reachability_check_ms']:.3f} ms to flag up front")
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(reports, f, indent=2)
+
+    # Differential check: reduction must not change any distance between kept nodes
+    if failed:
+        print(f"{failed} distance mismatches between the reduced and original graphs", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
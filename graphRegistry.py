@@ -0,0 +1,229 @@
+# I M P O R T S   &   D E P E N D E N C I E S ----------------------
+import gc
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, List, NamedTuple, Optional
+
+# C O N S T A N T S ------------------------------------------------
+GRAPH_DIRS = ("graphml_files", "data")
+
+# File stem suffix of statewide backbone graphs (major roads joining the city graphs)
+BACKBONE_SUFFIX = "_backbone"
+
+# Default memory budget for loaded cities (override with OCTO_GRAPH_BUDGET_MB)
+DEFAULT_BUDGET_MB = 2048
+
+# Rough in-memory cost of an osmnx graph pair (graph + projection) when RSS cannot be measured
+_BYTES_PER_NODE = 2 * 1200
+_BYTES_PER_EDGE = 2 * 1600
+
+
+# L O A D E D   C I T Y --------------------------------------------
+
+# Everything the UI needs for one city
+# Entries are shared by every caller of GraphRegistry.get and must be treated as read-only; the
+# compiled graph refuses set_weights, so callers that change weights take with_private_weights()
+class LoadedCity(NamedTuple):
+    graph: object
+    graph_proj: object
+    compiled: object
+
+
+# Registry bookkeeping per city (files are discovered, never parsed, until first use)
+class CityEntry:
+    def __init__(self, name: str, path: str):
+        self.name = name
+        self.path = path
+        self.file_bytes = os.path.getsize(path)
+        self.city: Optional[LoadedCity] = None
+        self.load_seconds: Optional[float] = None
+        self.resident_bytes: Optional[int] = None
+        self.loads = 0
+        self.hits = 0
+
+    @property
+    def loaded(self) -> bool:
+        return self.city is not None
+
+
+# Resident set size of this process in bytes, or None where /proc is unavailable
+def _resident_bytes() -> Optional[int]:
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError, AttributeError):
+        return None
+
+
+# Estimated in-memory size of a loaded city from its graph sizes
+def _estimate_bytes(city: LoadedCity) -> int:
+    compiled = city.compiled
+    arrays = sum(getattr(compiled, name).nbytes for name in ('node_ids', 'offsets', 'targets', 'weights', 'lat', 'lon'))
+    return arrays + compiled.num_nodes * _BYTES_PER_NODE + compiled.num_edges * _BYTES_PER_EDGE
+
+
+# Default loader: the snapshot-cached (graph, graph_proj, compiled) triple
+def _load_city(path: str) -> LoadedCity:
+    from graphCache import load_graph
+    return LoadedCity(*load_graph(path))
+
+
+# G R A P H   R E G I S T R Y --------------------------------------
+
+# Every city in the graph folders, loaded lazily on first use and kept under a memory budget
+# Least recently used cities are evicted when the loaded total exceeds budget_mb
+# (the city being requested is never evicted, so a single oversized city still loads)
+class GraphRegistry:
+    def __init__(self, directories=GRAPH_DIRS, budget_mb: Optional[float] = None,
+                 loader: Callable[[str], LoadedCity] = _load_city):
+        if budget_mb is None:
+            budget_mb = float(os.environ.get("OCTO_GRAPH_BUDGET_MB", DEFAULT_BUDGET_MB))
+        self.directories = directories
+        self.budget_bytes = int(budget_mb * 1024 * 1024)
+        self.loader = loader
+
+        self.entries: Dict[str, CityEntry] = {}
+        self._lru: 'OrderedDict[str, None]' = OrderedDict()
+        self._lock = threading.RLock()
+        self.evictions = 0
+
+        # Background warm-up (see warm)
+        self._warm_lock = threading.Lock()
+        self._warm_next: Optional[str] = None
+        self._warm_thread: Optional[threading.Thread] = None
+        self.discover()
+
+    # Scans the graph folders for GraphML files (first folder wins on duplicate names)
+    def discover(self) -> List[str]:
+        with self._lock:
+            for directory in self.directories:
+                if not os.path.isdir(directory):
+                    continue
+                for file in sorted(os.listdir(directory)):
+                    if file.endswith(".graphml"):
+                        name = file[:-len(".graphml")]
+                        if name not in self.entries:
+                            self.entries[name] = CityEntry(name, os.path.join(directory, file))
+            return self.names()
+
+    def names(self) -> List[str]:
+        return sorted(self.entries)
+
+    def path(self, name: str) -> str:
+        return self._entry(name).path
+
+    def _entry(self, name: str) -> CityEntry:
+        try:
+            return self.entries[name]
+        except KeyError:
+            raise KeyError(f"Unknown city {name!r}") from None
+
+    # Loaded bytes across all resident cities
+    @property
+    def resident_bytes(self) -> int:
+        return sum(entry.resident_bytes or 0 for entry in self.entries.values() if entry.loaded)
+
+    # Returns the shared, read-only loaded city, loading (and evicting others) if needed
+    def get(self, name: str) -> LoadedCity:
+        with self._lock:
+            entry = self._entry(name)
+            if entry.loaded:
+                entry.hits += 1
+                self._lru.move_to_end(name)
+                return entry.city
+
+            # Make room up front when this city's size is known from an earlier load
+            if entry.resident_bytes:
+                self._evict(self.budget_bytes - entry.resident_bytes, keep=name)
+
+            rss_before = _resident_bytes()
+            load_start_time = time.perf_counter()
+            city = self.loader(entry.path)
+            city.compiled.read_only = True
+            entry.load_seconds = time.perf_counter() - load_start_time
+            rss_after = _resident_bytes()
+
+            # RSS growth undercounts when the load reuses memory freed by an eviction, so the
+            # size estimate acts as a floor
+            measured = rss_after - rss_before if rss_before is not None and rss_after is not None else 0
+            entry.resident_bytes = max(measured, _estimate_bytes(city))
+            entry.city = city
+            entry.loads += 1
+            self._lru[name] = None
+            self._lru.move_to_end(name)
+
+            self._evict(self.budget_bytes, keep=name)
+            return city
+
+    # Loads a city on a background thread, e.g. while a menu is still on screen
+    # A later get() for the same city waits for this load instead of starting another; when warm
+    # is called again before the thread gets to it, only the latest city is loaded
+    def warm(self, name: str) -> None:
+        self._entry(name)
+        with self._warm_lock:
+            self._warm_next = name
+            if self._warm_thread is None:
+                self._warm_thread = threading.Thread(target=self._warm_loop, name="graph-warm", daemon=True)
+                self._warm_thread.start()
+
+    def _warm_loop(self) -> None:
+        while True:
+            with self._warm_lock:
+                name, self._warm_next = self._warm_next, None
+                if name is None:
+                    self._warm_thread = None
+                    return
+            try:
+                self.get(name)
+            except Exception as e:
+                print(f"Could not warm {name}: {e}")
+
+    # Evicts least recently used cities until the resident total fits in limit
+    def _evict(self, limit: int, keep: str) -> None:
+        evicted = False
+        while self.resident_bytes > limit:
+            victim = next((name for name in self._lru if name != keep), None)
+            if victim is None:
+                break
+            self.unload(victim)
+            evicted = True
+        if evicted:
+            gc.collect()
+
+    # Drops a loaded city (it reloads on next use)
+    def unload(self, name: str) -> None:
+        with self._lock:
+            entry = self._entry(name)
+            if entry.loaded:
+                entry.city = None
+                self._lru.pop(name, None)
+                self.evictions += 1
+
+    # Per-city load time, resident size and usage
+    def stats(self) -> Dict[str, dict]:
+        with self._lock:
+            return {
+                name: {
+                    'path': entry.path,
+                    'file_mb': entry.file_bytes / 1024 / 1024,
+                    'loaded': entry.loaded,
+                    'load_seconds': entry.load_seconds,
+                    'resident_mb': entry.resident_bytes / 1024 / 1024 if entry.resident_bytes else None,
+                    'loads': entry.loads,
+                    'hits': entry.hits,
+                }
+                for name, entry in sorted(self.entries.items())
+            }
+
+
+# Process-wide registry shared by the menu, the map window and the service
+_default_registry: Optional[GraphRegistry] = None
+
+
+def default_registry() -> GraphRegistry:
+    global _default_registry
+    if _default_registry is None:
+        _default_registry = GraphRegistry()
+    return _default_registry
@@ -0,0 +1,130 @@
+# I M P O R T S   &   D E P E N D E N C I E S ----------------------
+import math
+import warnings
+from typing import Callable
+
+import numpy as np
+
+from compiledGraph import CompiledGraph
+
+
+# C O N S T A N T S ------------------------------------------------
+EARTH_RADIUS = 6371000  # Earth's radius in meters
+
+# Edges whose weight / straight-line ratio is below this fraction of the median ratio are reported
+# as anomalous (e.g. a zero length between distinct coordinates)
+SLACK_OUTLIER_FRACTION = 0.1
+
+
+# H A V E R S I N E   H E U R I S T I C ----------------------------
+
+# Great-circle distance heuristic built once per compiled graph
+# Radian lat/lon and cos(lat) are precomputed so each call is a handful of math ops
+# Called as heuristic(osm_id1, osm_id2) it is a drop-in for a_star's heuristic argument
+class HaversineHeuristic:
+    def __init__(self, compiled: CompiledGraph):
+        self.compiled = compiled
+
+        # Precomputed radian coordinate arrays
+        self.lat_rad = np.radians(compiled.lat)
+        self.lon_rad = np.radians(compiled.lon)
+        self.cos_lat = np.cos(self.lat_rad)
+
+        # List mirrors for the scalar path
+        self._lat = self.lat_rad.tolist()
+        self._lon = self.lon_rad.tolist()
+        self._cos = self.cos_lat.tolist()
+
+        # Scale so that h(u) <= weight(u, v) + h(v) holds on every edge (consistent => admissible)
+        # Stays 1.0 for metre lengths; shrinks to a speed bound for other weights
+        self.scale = 1.0
+        self.scale = min(1.0, self.edge_slack())
+
+        # A single bad edge drags the scale, and with it every estimate, towards zero; keep the
+        # heuristic admissible but say so, naming the edges
+        outliers = self.slack_outliers()
+        if len(outliers):
+            shown = ', '.join(str(edge) for edge in outliers[:10].tolist())
+            warnings.warn(f"{len(outliers)} edges are far cheaper than the straight line between their ends "
+                          f"(edge indices {shown}{', ...' if len(outliers) > 10 else ''}); "
+                          f"the A* heuristic is scaled by {self.scale:.3g} to stay admissible", stacklevel=2)
+
+    # Unscaled great-circle distance in metres between two node indices (for reporting, not searching)
+    def metres(self, node1: int, node2: int) -> float:
+        lat1, lat2 = self._lat[node1], self._lat[node2]
+        a = (math.sin((lat2 - lat1) / 2) ** 2
+             + self._cos[node1] * self._cos[node2] * math.sin((self._lon[node2] - self._lon[node1]) / 2) ** 2)
+        return 2 * EARTH_RADIUS * math.asin(math.sqrt(min(1.0, a)))
+
+    # Scalar heuristic between two node indices
+    def scalar(self, node1: int, node2: int) -> float:
+        return self.scale * self.metres(node1, node2)
+
+    # Vectorized great-circle distance from many node indices to one target index
+    def batch(self, nodes: np.ndarray, target: int) -> np.ndarray:
+        dlat = self.lat_rad[target] - self.lat_rad[nodes]
+        dlon = self.lon_rad[target] - self.lon_rad[nodes]
+        a = np.sin(dlat / 2) ** 2 + self.cos_lat[nodes] * self.cos_lat[target] * np.sin(dlon / 2) ** 2
+        return self.scale * 2 * EARTH_RADIUS * np.arcsin(np.sqrt(np.minimum(1.0, a)))
+
+    # Scores all out-neighbours of a node against the target in one call
+    def neighbours(self, node: int, target: int) -> np.ndarray:
+        start, end = self.compiled.offsets[node], self.compiled.offsets[node + 1]
+        return self.batch(self.compiled.targets[start:end], target)
+
+    # Returns an index-based h(node) with the target's terms hoisted out
+    def for_target(self, target: int) -> Callable[[int], float]:
+        lat_list, lon_list, cos_list = self._lat, self._lon, self._cos
+        lat2, lon2, cos2 = lat_list[target], lon_list[target], cos_list[target]
+        factor = self.scale * 2 * EARTH_RADIUS
+        sin, asin, sqrt = math.sin, math.asin, math.sqrt
+
+        def h(node: int) -> float:
+            a = sin((lat2 - lat_list[node]) / 2) ** 2 + cos_list[node] * cos2 * sin((lon2 - lon_list[node]) / 2) ** 2
+            return factor * asin(sqrt(a if a < 1.0 else 1.0))
+
+        return h
+
+    # Great-circle distance is symmetric, so the bound from a source is the bound to it
+    def for_source(self, source: int) -> Callable[[int], float]:
+        return self.for_target(source)
+
+    # OSM id interface matching the heuristic(n1, n2) callable a_star has always taken
+    def __call__(self, node1: int, node2: int) -> float:
+        return self.scalar(self.compiled.node_index(node1), self.compiled.node_index(node2))
+
+    # Weight / straight-line ratio per edge; NaN for zero-length hops (self loops, duplicated
+    # coordinates), which cannot undercut h
+    def edge_ratios(self) -> np.ndarray:
+        compiled = self.compiled
+        sources = np.repeat(np.arange(compiled.num_nodes), np.diff(compiled.offsets))
+        dlat = self.lat_rad[compiled.targets] - self.lat_rad[sources]
+        dlon = self.lon_rad[compiled.targets] - self.lon_rad[sources]
+        a = (np.sin(dlat / 2) ** 2
+             + self.cos_lat[sources] * self.cos_lat[compiled.targets] * np.sin(dlon / 2) ** 2)
+        straight = 2 * EARTH_RADIUS * np.arcsin(np.sqrt(np.minimum(1.0, a)))
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return np.where(straight > 0, np.asarray(compiled.weights, dtype=np.float64) / straight, np.nan)
+
+    # Smallest weight / straight-line ratio over all edges (>= 1 means edges never undercut h)
+    def edge_slack(self) -> float:
+        ratios = self.edge_ratios()
+        if np.isnan(ratios).all():
+            return 1.0
+        return float(np.nanmin(ratios))
+
+    # Edges whose ratio is far below the median one, i.e. the few that set a collapsed scale
+    def slack_outliers(self, fraction: float = SLACK_OUTLIER_FRACTION) -> np.ndarray:
+        ratios = self.edge_ratios()
+        if np.isnan(ratios).all():
+            return np.empty(0, dtype=np.int64)
+        with np.errstate(invalid='ignore'):
+            return np.flatnonzero(ratios < fraction * np.nanmedian(ratios))
+
+    # Edges where h(u) > weight(u, v) + h(v) for the given target, i.e. consistency violations
+    def violations(self, target: int, tolerance: float = 1e-9) -> np.ndarray:
+        compiled = self.compiled
+        sources = np.repeat(np.arange(compiled.num_nodes), np.diff(compiled.offsets))
+        h = self.batch(np.arange(compiled.num_nodes), target)
+        bad = h[sources] > compiled.weights + h[compiled.targets] + tolerance
+        return np.flatnonzero(bad)
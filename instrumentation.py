@@ -0,0 +1,213 @@
+# I M P O R T S   &   D E P E N D E N C I E S ----------------------
+import argparse
+import cProfile
+import io
+import json
+import pstats
+import random
+import sys
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from priorityQueues import queue_counters
+
+
+# S E A R C H   S T A T S ------------------------------------------
+
+# Per-query counters and phase timings for dijkstra() / a_star()
+# Pass one as stats=... to a search; without it the loops run uninstrumented
+#   counters are derived after the search (pops is the only live count), so they cost nothing extra
+#   timing=True additionally wraps heap operations and heuristic calls to split time by phase
+class SearchStats:
+    def __init__(self, timing: bool = False):
+        self.timing = timing
+        self.algorithm = ''
+        self.counters: Dict[str, int] = {}
+        self.phases: Dict[str, float] = {'heap': 0.0, 'heuristic': 0.0}
+        self.total_time = 0.0
+        self._start_time = 0.0
+        self._heuristic = False
+
+    # Wraps a function so its wall time accumulates into a phase
+    def _timed(self, fn: Callable, phase: str) -> Callable:
+        phases = self.phases
+        perf_counter = time.perf_counter
+
+        def wrapper(*args):
+            start = perf_counter()
+            result = fn(*args)
+            phases[phase] += perf_counter() - start
+            return result
+
+        return wrapper
+
+    # Called by a search before its loop; returns the (push, pop, heuristic) it should use
+    def begin(self, algorithm: str, push: Callable, pop: Callable,
+              heuristic: Optional[Callable] = None) -> Tuple[Callable, Callable, Optional[Callable]]:
+        self.algorithm = algorithm
+        self._heuristic = heuristic is not None
+        self._start_time = time.perf_counter()
+        if not self.timing:
+            return push, pop, heuristic
+
+        push, pop = self._timed(push, 'heap'), self._timed(pop, 'heap')
+        if heuristic is not None:
+            heuristic = self._timed(heuristic, 'heuristic')
+        return push, pop, heuristic
+
+    # Called by a search after its loop with its raw totals
+    # queue (the search's priority queue) adds backend counters such as decrease-keys
+    def end(self, compiled, state, pops: int, queue_left: int, found: bool, queue=None) -> None:
+        self.total_time = time.perf_counter() - self._start_time
+
+        extra = queue_counters(queue)
+        settled = len(state.settled)
+        pushes = pops + queue_left + extra.get('decrease_keys', 0)
+        offsets = compiled.adjacency()[0]
+        edges_scanned = sum(offsets[node + 1] - offsets[node] for node in state.settled)
+
+        self.counters = {
+            'heap_pushes': pushes,
+            'heap_pops': pops,
+            'stale_pops': pops - settled - int(found),
+            'relaxations': pushes - 1,
+            'settled': settled,
+            'touched': len(state.touched),
+            'edges_scanned': edges_scanned,
+            **extra,
+        }
+        # One heuristic evaluation per push (including the source)
+        if self._heuristic:
+            self.counters['heuristic_calls'] = pushes
+
+        # Whatever is not heap or heuristic time is edge scanning and bookkeeping
+        if self.timing:
+            self.phases['edges'] = max(0.0, self.total_time - self.phases['heap'] - self.phases['heuristic'])
+
+    def as_dict(self) -> dict:
+        result = {'algorithm': self.algorithm, 'total_ms': self.total_time * 1000, **self.counters}
+        if self.timing:
+            result['phases_ms'] = {phase: seconds * 1000 for phase, seconds in self.phases.items()}
+        return result
+
+    # One line summary for the stats window
+    def summary(self) -> str:
+        c = self.counters
+        text = (f"Pushes {c.get('heap_pushes', 0)} · Stale pops {c.get('stale_pops', 0)} · "
+                f"Edges {c.get('edges_scanned', 0)}")
+        if self.timing:
+            text += (f"\nHeap {self.phases['heap'] * 1000:.2f} ms · Heuristic {self.phases['heuristic'] * 1000:.2f} ms · "
+                     f"Edges {self.phases.get('edges', 0.0) * 1000:.2f} ms")
+        return text
+
+
+# B A T C H   C O L L E C T I O N ----------------------------------
+
+# Collects SearchStats over a batch of queries and exports them as JSON
+class StatsCollector:
+    def __init__(self, timing: bool = False):
+        self.timing = timing
+        self.queries: List[dict] = []
+
+    # Returns a fresh SearchStats that is recorded by this collector
+    def new(self, **labels) -> SearchStats:
+        stats = SearchStats(timing=self.timing)
+        self.queries.append({'labels': labels, 'stats': stats})
+        return stats
+
+    # Totals per algorithm across all recorded queries
+    def totals(self) -> Dict[str, Dict[str, float]]:
+        totals: Dict[str, Dict[str, float]] = {}
+        for query in self.queries:
+            data = query['stats'].as_dict()
+            bucket = totals.setdefault(data['algorithm'], {'queries': 0})
+            bucket['queries'] += 1
+            for key, value in data.items():
+                if isinstance(value, (int, float)):
+                    bucket[key] = bucket.get(key, 0) + value
+        return totals
+
+    def to_dict(self) -> dict:
+        return {
+            'queries': [{**query['labels'], **query['stats'].as_dict()} for query in self.queries],
+            'totals': self.totals(),
+        }
+
+    def export_json(self, path: str) -> None:
+        with open(path, 'w') as f:
+            json.dump(self.to_dict(), f, indent=2)
+
+
+# P R O F I L I N G ------------------------------------------------
+
+# Profiles a block of queries
+#   default: cProfile, stats text printed (top entries by cumulative time) and optionally dumped to a .prof file
+#   profiler: any object with start()/stop() (e.g. a sampling profiler) or enable()/disable()
+@contextmanager
+def profiled(profiler=None, output: Optional[str] = None, top: int = 25):
+    profiler = profiler or cProfile.Profile()
+    start = getattr(profiler, 'start', None) or profiler.enable
+    stop = getattr(profiler, 'stop', None) or profiler.disable
+
+    start()
+    try:
+        yield profiler
+    finally:
+        stop()
+
+        if isinstance(profiler, cProfile.Profile):
+            if output:
+                profiler.dump_stats(output)
+            text = io.StringIO()
+            pstats.Stats(profiler, stream=text).sort_stats('cumulative').print_stats(top)
+            print(text.getvalue())
+
+
+# Runs search(start, end, stats) over many pairs under a profiler, collecting per-query stats
+def profile_queries(search: Callable, pairs: Iterable[Tuple[int, int]], profiler=None,
+                    output: Optional[str] = None, timing: bool = False) -> StatsCollector:
+    collector = StatsCollector(timing=timing)
+    with profiled(profiler, output):
+        for start_node, end_node in pairs:
+            search(start_node, end_node, collector.new(start_node=start_node, end_node=end_node))
+    return collector
+
+
+# M A I N ----------------------------------------------------------
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Profile a batch of random queries with per-query search counters")
+    parser.add_argument("graph_file", help="GraphML file to route on")
+    parser.add_argument("--algorithm", choices=('dijkstra', 'astar'), default='dijkstra')
+    parser.add_argument("--queries", type=int, default=100)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--timing", action='store_true', help="Split time into heap / heuristic / edge phases")
+    parser.add_argument("--profile", default=None, help="Write cProfile stats to this .prof file")
+    parser.add_argument("--json", default=None, help="Write per-query counters to this JSON file")
+    args = parser.parse_args(argv)
+
+    from a_star import a_star
+    from dijkstras import dijkstra
+    from graphCache import load_compiled
+    from heuristics import HaversineHeuristic
+
+    compiled = load_compiled(args.graph_file)
+    nodes = compiled.node_list()
+    rng = random.Random(args.seed)
+    pairs = [(rng.choice(nodes), rng.choice(nodes)) for _ in range(args.queries)]
+
+    if args.algorithm == 'astar':
+        heuristic = HaversineHeuristic(compiled)
+        search = lambda start, end, stats: a_star(compiled, start, end, heuristic, {}, stats=stats)
+    else:
+        search = lambda start, end, stats: dijkstra(compiled, start, end, stats=stats)
+
+    collector = profile_queries(search, pairs, output=args.profile, timing=args.timing)
+
+    if args.json:
+        collector.export_json(args.json)
+    print(json.dumps(collector.totals(), indent=2), file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
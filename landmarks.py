@@ -0,0 +1,273 @@
+# I M P O R T S   &   D E P E N D E N C I E S ----------------------
+import argparse
+import os
+import random
+import time
+from typing import Callable, List, Optional
+
+import numpy as np
+
+from compiledGraph import CompiledGraph, as_compiled
+from dijkstras import dijkstra_tree
+
+# C O N S T A N T S ------------------------------------------------
+
+# Stand-in for "unreachable" so bounds never hit inf - inf (keeps h admissible and consistent)
+UNREACHABLE = 1e15
+
+# Bump when the artifact layout changes so old artifacts are rebuilt
+LANDMARK_VERSION = 1
+
+SELECTION_METHODS = ('farthest', 'avoid')
+
+
+# A L T   H E U R I S T I C ----------------------------------------
+
+# A*, Landmarks, Triangle inequality lower bounds
+#   from_landmark[k, v] = d(landmark_k, v)    to_landmark[k, v] = d(v, landmark_k)
+# d(v, t) >= max_k max(d(L, t) - d(L, v), d(v, L) - d(t, L))
+# Called as heuristic(osm_id1, osm_id2) it is a drop-in for a_star's heuristic argument
+class ALTHeuristic:
+    def __init__(self, compiled: CompiledGraph, landmarks: np.ndarray,
+                 from_landmark: np.ndarray, to_landmark: np.ndarray, source_hash: str = ''):
+        self.compiled = compiled
+        self.landmarks = landmarks
+        self.from_landmark = from_landmark
+        self.to_landmark = to_landmark
+        self.source_hash = source_hash
+
+        # Node-major copies so one node's k distances are contiguous
+        self._from_rows = np.ascontiguousarray(from_landmark.T)
+        self._to_rows = np.ascontiguousarray(to_landmark.T)
+
+    @property
+    def num_landmarks(self) -> int:
+        return len(self.landmarks)
+
+    # Index-based lower bound on d(node, target)
+    def for_target(self, target: int) -> Callable[[int], float]:
+        from_target = self._from_rows[target]
+        to_target = self._to_rows[target]
+        from_rows, to_rows = self._from_rows, self._to_rows
+
+        def h(node: int) -> float:
+            bound = max((from_target - from_rows[node]).max(), (to_rows[node] - to_target).max())
+            return float(bound) if bound > 0 else 0.0
+
+        return h
+
+    # Index-based lower bound on d(source, node), used by bidirectional A*
+    def for_source(self, source: int) -> Callable[[int], float]:
+        from_source = self._from_rows[source]
+        to_source = self._to_rows[source]
+        from_rows, to_rows = self._from_rows, self._to_rows
+
+        def h(node: int) -> float:
+            bound = max((from_rows[node] - from_source).max(), (to_source - to_rows[node]).max())
+            return float(bound) if bound > 0 else 0.0
+
+        return h
+
+    # Vectorized lower bounds from many node indices to one target index
+    def batch(self, nodes: np.ndarray, target: int) -> np.ndarray:
+        forward = self.from_landmark[:, target][:, None] - self.from_landmark[:, nodes]
+        backward = self.to_landmark[:, nodes] - self.to_landmark[:, target][:, None]
+        return np.maximum(np.maximum(forward, backward).max(axis=0), 0.0)
+
+    # OSM id interface matching the heuristic(n1, n2) callable a_star has always taken
+    def __call__(self, node1: int, node2: int) -> float:
+        return self.for_target(self.compiled.node_index(node2))(self.compiled.node_index(node1))
+
+    # Saves landmark ids and distance arrays as a compressed .npz artifact
+    def save(self, path: str) -> None:
+        tmp = path + ".part.npz"
+        np.savez_compressed(tmp, version=LANDMARK_VERSION, source_hash=self.source_hash,
+                            node_ids=self.compiled.node_ids, landmarks=self.landmarks,
+                            from_landmark=self.from_landmark, to_landmark=self.to_landmark)
+        os.replace(tmp, path)
+
+    # Loads an artifact written by save(); returns None if it is from another version or source
+    @classmethod
+    def load(cls, path: str, compiled: CompiledGraph, source_hash: Optional[str] = None) -> Optional['ALTHeuristic']:
+        with np.load(path) as data:
+            if int(data['version']) != LANDMARK_VERSION:
+                return None
+            if source_hash is not None and str(data['source_hash']) != source_hash:
+                return None
+            if not np.array_equal(data['node_ids'], compiled.node_ids):
+                return None
+            return cls(compiled, data['landmarks'], data['from_landmark'], data['to_landmark'],
+                       source_hash=str(data['source_hash']))
+
+
+# L A N D M A R K   S E L E C T I O N ------------------------------
+
+# Forward and backward distance rows for one landmark (unreachable -> UNREACHABLE)
+def _landmark_rows(compiled: CompiledGraph, landmark: int):
+    node = compiled.node_list()[landmark]
+    forward, _ = dijkstra_tree(compiled, node)
+    backward, _ = dijkstra_tree(compiled, node, reverse=True)
+    forward[~np.isfinite(forward)] = UNREACHABLE
+    backward[~np.isfinite(backward)] = UNREACHABLE
+    return forward, backward
+
+
+# Farthest-point selection: each new landmark is the node farthest from all chosen ones
+def _pick_farthest(compiled: CompiledGraph, from_rows: List[np.ndarray], to_rows: List[np.ndarray],
+                   rng: random.Random) -> int:
+    if not from_rows:
+        start = rng.randrange(compiled.num_nodes)
+        dist, _ = dijkstra_tree(compiled, compiled.node_list()[start])
+        dist[~np.isfinite(dist)] = -1
+        return int(np.argmax(dist))
+
+    # Round-trip distance to the nearest chosen landmark, ignoring nodes it cannot reach
+    closeness = np.min(np.stack(from_rows) + np.stack(to_rows), axis=0)
+    closeness[closeness >= UNREACHABLE] = -1
+    return int(np.argmax(closeness))
+
+
+# Avoid selection: grow a shortest path tree from a random root, weight each node by how badly the
+# current landmarks bound it, and descend into the heaviest landmark-free subtree to a leaf
+def _pick_avoid(compiled: CompiledGraph, from_rows: List[np.ndarray], to_rows: List[np.ndarray],
+                chosen: List[int], rng: random.Random) -> int:
+    root = rng.randrange(compiled.num_nodes)
+    dist, prev = dijkstra_tree(compiled, compiled.node_list()[root])
+    reached = np.flatnonzero(np.isfinite(dist))
+
+    # Gap between true distance from the root and the current lower bound
+    if from_rows:
+        forward = np.stack(from_rows)
+        backward = np.stack(to_rows)
+        bound = np.maximum((forward[:, reached] - forward[:, root][:, None]).max(axis=0),
+                           (backward[:, root][:, None] - backward[:, reached]).max(axis=0))
+        weight = dist[reached] - np.maximum(bound, 0)
+    else:
+        weight = dist[reached].copy()
+
+    # Subtree sizes, children before parents (decreasing distance)
+    size = np.zeros(compiled.num_nodes)
+    size[reached] = weight
+    blocked = np.zeros(compiled.num_nodes, dtype=bool)
+    blocked[chosen] = True
+    for v in reached[np.argsort(-dist[reached])]:
+        p = prev[v]
+        if blocked[v]:
+            size[v] = 0
+        if p >= 0:
+            if blocked[v]:
+                blocked[p] = True
+            size[p] += size[v]
+
+    # Children lists for the descent
+    children = {}
+    for v in reached:
+        if prev[v] >= 0:
+            children.setdefault(int(prev[v]), []).append(int(v))
+
+    node = root
+    while children.get(node):
+        best = max(children[node], key=lambda c: size[c])
+        if size[best] <= 0:
+            break
+        node = best
+    return node
+
+
+# Picks k landmarks and precomputes their forward and backward distance arrays
+def build_landmarks(graph, k: int = 8, method: str = 'farthest', seed: int = 0,
+                    source_hash: str = '') -> ALTHeuristic:
+    if method not in SELECTION_METHODS:
+        raise ValueError(f"Unknown landmark selection {method!r}, expected one of {SELECTION_METHODS}")
+
+    compiled = as_compiled(graph)
+    rng = random.Random(seed)
+    chosen: List[int] = []
+    from_rows: List[np.ndarray] = []
+    to_rows: List[np.ndarray] = []
+
+    for _ in range(min(k, compiled.num_nodes)):
+        if method == 'farthest':
+            landmark = _pick_farthest(compiled, from_rows, to_rows, rng)
+        else:
+            landmark = _pick_avoid(compiled, from_rows, to_rows, chosen, rng)
+        if landmark in chosen:
+            break
+
+        forward, backward = _landmark_rows(compiled, landmark)
+        chosen.append(landmark)
+        from_rows.append(forward)
+        to_rows.append(backward)
+
+    return ALTHeuristic(compiled, np.asarray(chosen, dtype=np.int32),
+                        np.stack(from_rows), np.stack(to_rows), source_hash=source_hash)
+
+
+# P E R S I S T E N C E --------------------------------------------
+
+# Landmark artifact path stored alongside the GraphML file
+def landmarks_path(graph_file: str) -> str:
+    return os.path.splitext(graph_file)[0] + ".landmarks.npz"
+
+
+# Loads the landmark artifact for a GraphML file if present and current, otherwise None
+def load_landmarks(graph_file: str, compiled: CompiledGraph) -> Optional[ALTHeuristic]:
+    from graphCache import file_hash
+
+    path = landmarks_path(graph_file)
+    if not os.path.exists(path):
+        return None
+    return ALTHeuristic.load(path, compiled, file_hash(graph_file))
+
+
+# Loads the landmark artifact, building and saving it if missing or stale
+def load_or_build(graph_file: str, compiled: CompiledGraph, k: int = 8, method: str = 'farthest') -> ALTHeuristic:
+    from graphCache import file_hash
+
+    alt = load_landmarks(graph_file, compiled)
+    if alt is None:
+        alt = build_landmarks(compiled, k=k, method=method, source_hash=file_hash(graph_file))
+        alt.save(landmarks_path(graph_file))
+    return alt
+
+
+# M A I N ----------------------------------------------------------
+
+# Builds landmarks for a GraphML file and compares A* node visits against haversine
+def main() -> None:
+    from a_star import a_star
+    from graphCache import file_hash, load_compiled
+    from heuristics import HaversineHeuristic
+
+    parser = argparse.ArgumentParser(description="ALT landmark preprocessing")
+    parser.add_argument("graph_file", nargs='?', default="data/gainesville.graphml")
+    parser.add_argument("-k", type=int, default=8, help="Number of landmarks")
+    parser.add_argument("--method", choices=SELECTION_METHODS, default='farthest')
+    parser.add_argument("--pairs", type=int, default=100, help="Random queries to compare")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    compiled = load_compiled(args.graph_file)
+
+    build_start_time = time.perf_counter()
+    alt = build_landmarks(compiled, k=args.k, method=args.method, seed=args.seed,
+                          source_hash=file_hash(args.graph_file))
+    alt.save(landmarks_path(args.graph_file))
+    print(f"Built {alt.num_landmarks} landmarks in {time.perf_counter() - build_start_time:.2f} seconds "
+          f"({landmarks_path(args.graph_file)})")
+
+    haversine = HaversineHeuristic(compiled)
+    rng = random.Random(args.seed)
+    nodes = compiled.node_list()
+    visited_haversine = visited_alt = 0
+    for _ in range(args.pairs):
+        start_node, end_node = rng.sample(nodes, 2)
+        visited_haversine += len(a_star(compiled, start_node, end_node, haversine, {})[2])
+        visited_alt += len(a_star(compiled, start_node, end_node, alt, {})[2])
+
+    reduction = (visited_haversine - visited_alt) / max(visited_haversine, 1) * 100
+    print(f"Nodes visited: haversine {visited_haversine}, ALT {visited_alt} ({reduction:.1f}% fewer)")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,52 +1,92 @@
 # I M P O R T S   &   D E P E N D E N C I E S ----------------------
-import matplotlib.pyplot as plt
-from matplotlib.backend_bases import MouseButton
-
-import numpy as np
-import osmnx as ox
+# matplotlib, osmnx and Tk are imported inside main(), so importing this module stays cheap
 import os
 import time
 
-from dijkstras import dijkstra, reconstruct_path
+from dijkstras import dijkstra
+from dynamicRoute import ActiveRoutes
 from a_star import a_star
-from statWindow import create_stat_window
-
-# H E L P E R   F U N C T I O N S ----------------------------------
-
-# Heuristic for A* algorithm using Haversine Formula
-def haversine_distance(pos1, pos2, positions):
-    """More accurate distance calculation using Haversine formula - Accounts for Earth's curvature"""
-    R = 6371000  # Earth's radius in meters
-    lat1, lon1 = positions[pos1]
-    lat2, lon2 = positions[pos2]
-
-    # Convert to radians
-    lat1, lon1, lat2, lon2 = map(np.radians, [lat1, lon1, lat2, lon2])
-
-    # Haversine formula
-    dlat = lat2 - lat1
-    dlon = lon2 - lon1
-    a = np.sin(dlat/2)**2 + np.cos(lat1) * np.cos(lat2) * np.sin(dlon/2)**2
-    c = 2 * np.arcsin(np.sqrt(a))
-
-    return R * c
+from alternatives import alternative_routes
+from bidirectional import bidirectional_dijkstra, bidirectional_a_star
+from graphCache import load_spatial_index
+from graphRegistry import default_registry
+from heuristics import HaversineHeuristic
+from instrumentation import SearchStats
+from isochrones import isochrones
+from landmarks import load_landmarks
+from mapView import BlitLayer, FrontierAnimation, RouteWorker, geometry_patch, node_coordinates, path_coordinates
+from routeCache import open_route_cache
+from spatialIndex import routing_node
+from trafficWeights import TrafficLayer, compile_travel_time, feed_path, load_feed
+
+# C O N S T A N T S ------------------------------------------------
+
+# Split search time into heap / heuristic / edge phases in the stats window (adds timing overhead)
+PHASE_TIMING = os.environ.get("ROUTE_PHASE_TIMING") == "1"
+
+# Replay Dijkstra's frontier in settle order after each route
+ANIMATE_FRONTIER = os.environ.get("ROUTE_ANIMATE_FRONTIER") == "1"
+
+# Alternative routes drawn after each search (shortest included), one colour per alternative
+ALTERNATIVE_ROUTES = 3
+ALTERNATIVE_COLORS = ('#B4FF39', '#FF5E5E')
+
+# Isochrone overlay (I key): free-flow driving minutes from the first selected point, outermost colour first
+ISOCHRONE_MINUTES = (5, 10, 15)
+ISOCHRONE_COLORS = ('#7B2CBF', '#C77DFF', '#E0AAFF')
 
 # M A I N ----------------------------------------------------------
 
 def main(algorithm='Dijkstra\'s & A*', city_map='Gainesville'):
     global fig, ax, graph_proj
 
+    # GUI and plotting dependencies (app.py warms these while its menu is on screen)
+    import matplotlib.pyplot as plt
+    import osmnx as ox
+    from matplotlib.backend_bases import MouseButton
+    from statWindow import create_stat_window
+
     # M A P   S E T U P ------------------------------------------------
-    graph_file = f"graphml_files/{city_map}.graphml"
+    registry = default_registry()
 
-    if not os.path.exists(graph_file):
-        print(f"Graph file not found: {graph_file}")
+    if city_map not in registry.entries:
+        print(f"Graph file not found for {city_map} in {', '.join(registry.directories)}")
         return
-
-    graph = ox.load_graphml(graph_file)
-
-    # Projects the graph
-    graph_proj = ox.project_graph(graph)
+    graph_file = registry.path(city_map)
+
+    # Load the graph, its projection and the compiled search arrays through the city registry
+    # (parsed and projected once, memory-mapped from cache/graphs on later launches,
+    # and kept in memory across city switches within the memory budget)
+    load_start_time = time.time()
+    graph, graph_proj, compiled = registry.get(city_map)
+    print(f"Graph loaded in {time.time() - load_start_time:.2f} seconds")
+    city_stats = registry.stats()[city_map]
+    print(f"{city_map}: loaded in {city_stats['load_seconds']:.2f} seconds, ~{city_stats['resident_mb']:.0f} MB resident "
+          f"({registry.resident_bytes / 1024 / 1024:.0f} of {registry.budget_bytes / 1024 / 1024:.0f} MB budget)")
+
+    # Live congestion on top of the edge lengths; routes under traffic are repaired, not re-searched
+    # The layer owns a copy of the weights, so the registry's cached city stays at free flow and
+    # this session searches on traffic.compiled from here on
+    traffic = TrafficLayer(compiled)
+    compiled = traffic.compiled
+    active_routes = ActiveRoutes(traffic)
+    traffic_file = feed_path(graph_file)
+
+    # A* heuristic with precomputed radian coordinates, built once per graph
+    heuristic = HaversineHeuristic(compiled)
+
+    # ALT landmark heuristic, if precomputed with `python landmarks.py <graphml>`
+    alt_heuristic = load_landmarks(graph_file, compiled)
+
+    # KD-tree over projected nodes and edge segments for click snapping (cached with the snapshot)
+    spatial_index = load_spatial_index(graph_file)
+
+    # Projected coordinates per compiled index, so drawing a route is one array lookup
+    node_xy = node_coordinates(compiled, spatial_index)
+
+    # Node positions as (lon, lat), kept for the a_star positions argument
+    positions = {node: (data['x'], data['y'])
+                for node, data in graph.nodes(data=True)}
 
     # Print graph info to terminal for testing and verification
     num_nodes = len(graph_proj.nodes())
@@ -54,148 +94,254 @@ def main(algorithm='Dijkstra\'s & A*', city_map='Gainesville'):
     print(f"Number of nodes: {num_nodes}")
     print(f"Number of edges: {num_edges}")
 
-    # Global variables for click handling
-    global selected_nodes, route_line, markers, a_route_line
+    # Clicked points (at most two) and their snapped map positions
     selected_nodes = []
-    route_line = None  # Keep track of the route line
-    markers = []  # Keep track of markers
-
-    a_route_line = None
-
-    def clear_map():
-
-        global selected_nodes, route_line, markers, a_route_line
-        # Clear routes
-        if route_line:
-            if isinstance(route_line, list):
-                for line in route_line:
-                    line.remove()
+    marker_points = []
+
+    # Bumped by clear_map, so results of searches started before a clear are dropped
+    generation = [0]
+
+    # Isochrone patches on the map, and the travel-time graph they are computed on (built on first use)
+    isochrone_patches = []
+    travel_time_graph = {}
+
+    # W O R K E R   J O B S  (run on the route worker thread) -------
+
+    # Runs every algorithm for the selected pair through the route cache
+    def compare_routes(start_node, end_node):
+
+        # Runs one algorithm through the route cache and times it (cache hits skip the search)
+        def timed_route(algorithm_key, search, reuse_tree=True):
+            search_start_time = time.time()
+            result, cached = route_cache.route(start_node, end_node, algorithm_key, search, reuse_tree=reuse_tree)
+            return result, time.time() - search_start_time, cached
+
+        # Search internals for the stats window (only filled when the search actually runs)
+        dijkstra_stats = SearchStats(timing=PHASE_TIMING)
+        astar_stats = SearchStats(timing=PHASE_TIMING)
+
+        # Dijkstra's settle order, copied before the next search reuses the state (frontier replay)
+        frontier = []
+
+        def dijkstra_search():
+            result = dijkstra(compiled, start_node, end_node, stats=dijkstra_stats)
+            frontier.extend(compiled.search_state().settled)
+            return result
+
+        # Run Dijkstra's Algorithm
+        # Calculate time taken to completely run Dijkstra's algorithm from start node to end node
+        dijkstra_result, dijkstra_elapsed_time, dijkstra_cached = timed_route('dijkstra', dijkstra_search)
+
+        # Run A* Algorithm
+        # Calculate time taken to completely run A* algorithm from start node to end node
+        astar_result, astar_elapsed_time, astar_cached = timed_route(
+            'a_star', lambda: a_star(compiled, start_node, end_node, heuristic, positions, stats=astar_stats))
+
+        search_stats = {}
+        if not dijkstra_cached:
+            search_stats["Dijkstra"] = dijkstra_stats
+        if not astar_cached:
+            search_stats["A*"] = astar_stats
+
+        # Run the bidirectional variants for the comparison rows
+        extra_rows = []
+        for name, key, color, search in (
+                ("Bidirectional Dijkstra", 'bidirectional_dijkstra', '#FFD700',
+                 lambda: bidirectional_dijkstra(compiled, start_node, end_node)),
+                ("Bidirectional A*", 'bidirectional_a_star', '#00E5A0',
+                 lambda: bidirectional_a_star(compiled, start_node, end_node, heuristic, positions))):
+            search_result, search_elapsed_time, _ = timed_route(key, search, reuse_tree=False)
+            extra_rows.append((name, color, search_elapsed_time, search_result.nodes_visited, search_result.distance))
+
+        # A* with ALT landmarks, reported against haversine A*
+        if alt_heuristic is not None:
+            alt_result, alt_elapsed_time, _ = timed_route(
+                'a_star_alt', lambda: a_star(compiled, start_node, end_node, alt_heuristic, positions))
+            if astar_result.nodes_visited and alt_result.nodes_visited is not None:
+                reduction = (astar_result.nodes_visited - alt_result.nodes_visited) / astar_result.nodes_visited * 100
+                note = f"{reduction:.1f}% fewer nodes than haversine A*"
             else:
-                route_line.remove()
-            route_line = None
+                note = "cached, no node comparison"
+            extra_rows.append(("A* (ALT Landmarks)", '#FF4FD8', alt_elapsed_time, alt_result.nodes_visited,
+                               alt_result.distance, note))
+
+        # Alternatives from two shared trees (and spur searches if needed), capped in latency
+        alternatives = alternative_routes(compiled, start_node, end_node, k=ALTERNATIVE_ROUTES)
+        for number, (route, color) in enumerate(zip(alternatives.routes[1:], ALTERNATIVE_COLORS), start=2):
+            extra_rows.append((f"Alternative {number}", color, alternatives.elapsed, alternatives.nodes_visited,
+                               route.distance, f"+{(route.stretch - 1) * 100:.1f}% length, "
+                                               f"{route.overlap * 100:.0f}% shared ({route.method})"))
+
+        # Route cache counters
+        cache_stats = route_cache.stats()
+        print(f"Route cache: {cache_stats['hits']} hits, {cache_stats['tree_hits']} tree hits, "
+              f"{cache_stats['disk_hits']} disk hits, {cache_stats['misses']} misses")
+
+        return {
+            'dijkstra': (dijkstra_result, dijkstra_elapsed_time),
+            'a_star': (astar_result, astar_elapsed_time),
+            'extra_rows': extra_rows,
+            'search_stats': search_stats,
+            'frontier': frontier,
+            'alternatives': alternatives.routes[1:],
+        }
+
+    # Applies the traffic feed and repairs the live route between the selected points
+    def repair_traffic(start_node, end_node):
+        traffic_route = active_routes.add(start_node, end_node)
+        traffic.apply_pending()
+        repair_start_time = time.time()
+        change = load_feed(traffic, traffic_file)
+        return traffic_route, change, time.time() - repair_start_time
+
+    # Driving-time isochrones from one node (one bounded search for all bands)
+    def compute_isochrones(start_node):
+        if not travel_time_graph:
+            travel_time_compiled = compile_travel_time(graph)
+            travel_time_graph['compiled'] = travel_time_compiled
+            travel_time_graph['xy'] = node_coordinates(travel_time_compiled, spatial_index)
+        isochrone_start_time = time.time()
+        bands = isochrones(travel_time_graph['compiled'], travel_time_graph['xy'], start_node,
+                           [minutes * 60 for minutes in ISOCHRONE_MINUTES])
+        return bands, time.time() - isochrone_start_time
+
+    # G U I   C A L L B A C K S  (run on the matplotlib event loop) --
+
+    # Shows input-to-route latency and blit frame times in the map corner
+    def report_latency(label, pressed_at):
+        latency_ms = (time.perf_counter() - pressed_at) * 1000
+        mean_frame_ms, p95_frame_ms = blit.frame_stats()
+        metrics_text.set_text(f"{label}: input to route {latency_ms:.0f} ms\n"
+                              f"Frame {mean_frame_ms:.1f} ms (p95 {p95_frame_ms:.1f} ms)")
+        blit.render()
+        print(f"{label} shown {latency_ms:.1f} ms after the key press (frame {mean_frame_ms:.2f} ms mean, "
+              f"{p95_frame_ms:.2f} ms p95)")
+
+    def show_routes(comparison, pressed_at):
+        dijkstra_result, dijkstra_elapsed_time = comparison['dijkstra']
+        astar_result, astar_elapsed_time = comparison['a_star']
+
+        if dijkstra_result.distance != float('inf'):
+            # Bright orange Dijkstra route, bright blue A* route
+            dijkstra_line.set_data(*path_coordinates(compiled, node_xy, dijkstra_result.path))
+            astar_line.set_data(*path_coordinates(compiled, node_xy, astar_result.path))
+
+            # Dashed alternatives, fewer than ALTERNATIVE_ROUTES - 1 if no others pass the filters
+            for i, line in enumerate(alternative_lines):
+                routes = comparison['alternatives']
+                line.set_data(*path_coordinates(compiled, node_xy, routes[i].path if i < len(routes) else []))
+
+            # Print values to terminal for testing
+            print(f"Total Dijkstra's distance: {dijkstra_result.distance:.2f} meters")
+            print(f"Total A* distance: {astar_result.distance:.2f} meters")
+        else:
+            print("No valid path found between selected points!")
+
+        if ANIMATE_FRONTIER and comparison['frontier']:
+            frontier_animation.start(comparison['frontier'])
+        report_latency("Route", pressed_at)
+
+        create_stat_window(
+            elapsed_time_dijkstra=dijkstra_elapsed_time,
+            elapsed_time_aStar=astar_elapsed_time,
+            num_nodes_visited_dijkstra=dijkstra_result.nodes_visited,
+            num_nodes_visited_aStar=astar_result.nodes_visited,
+            distance_dijkstra=dijkstra_result.distance,
+            distance_aStar=astar_result.distance,
+            extra_rows=comparison['extra_rows'],
+            search_stats=comparison['search_stats'])
+
+    def show_traffic_route(repair, pressed_at):
+        traffic_route, change, repair_elapsed_time = repair
+        print(f"Traffic update: {len(change.edges)} edges changed, route repaired in "
+              f"{repair_elapsed_time:.4f} seconds ({traffic_route.nodes_visited} nodes re-settled)")
+
+        path = traffic_route.path()
+        if path:
+            dijkstra_line.set_data(*path_coordinates(compiled, node_xy, path))
+            print(f"Route cost under traffic: {traffic_route.distance:.2f}")
+            report_latency("Traffic route", pressed_at)
+        else:
+            print("No valid path found between selected points!")
+
+    def clear_isochrones():
+        for patch in isochrone_patches:
+            blit.remove(patch)
+        isochrone_patches.clear()
+
+    # Draws the bands largest first, under the routes and markers
+    def show_isochrones(result, pressed_at):
+        bands, isochrone_elapsed_time = result
+        clear_isochrones()
+        for band, color in zip(reversed(bands), ISOCHRONE_COLORS):
+            patch = ax.add_patch(geometry_patch(band.geometry, facecolor=color, edgecolor='none', alpha=0.35))
+            isochrone_patches.append(blit.add(patch, index=len(isochrone_patches)))
+        for band in bands:
+            print(f"{band.budget / 60:.0f} min isochrone: {len(band.nodes)} nodes, "
+                  f"{band.geometry.area / 1e6:.2f} km2")
+        print(f"Isochrones computed in {isochrone_elapsed_time:.4f} seconds")
+        report_latency("Isochrones", pressed_at)
 
-        if a_route_line:
-            if isinstance(a_route_line, list):
-                for line in a_route_line:
-                    line.remove()
-            else:
-                a_route_line.remove()
-            a_route_line = None
-
-        # Clear markers
-        for marker in markers:
-            marker.remove()
-        markers.clear()
-
-        # Clear selected nodes
+    def clear_map():
+        # Clear routes, markers, frontier, isochrones and selected nodes
+        for line in (dijkstra_line, astar_line, markers_line, *alternative_lines):
+            line.set_data([], [])
+        frontier_animation.stop()
+        clear_isochrones()
+        marker_points.clear()
         selected_nodes.clear()
-
-        # Clear legend
-        ax.legend_.remove() if ax.get_legend() else None
-
-        plt.draw()
+        generation[0] += 1
+        blit.render()
 
     def on_key(event):
-        global selected_nodes, route_line, a_route_line
-
         # Space key to trace route
         if event.key == ' ' and len(selected_nodes) == 2:
-            start_node, end_node = selected_nodes
-
-            # Get node positions for A* heuristic
-            positions = {node: (data['x'], data['y'])
-                        for node, data in graph.nodes(data=True)}
-
-            heuristic = lambda n1, n2: haversine_distance(n1, n2, positions)
-
-            # Run Dijkstra's Algorithm
-            # Calculate time taken to completely run Dijkstra's algorithm from start node to end node
-            dijkstra_start_time = time.time()
-            dijkstra_distances, dijkstra_previous, djikstra_visited = dijkstra(graph, start_node, end_node)
-            dijkstra_end_time = time.time()
-            dijkstra_nodes_visited = len(djikstra_visited)
-            dijkstra_elapsed_time = dijkstra_end_time - dijkstra_start_time
-
-            # Run A* Algorithm
-            # Calculate time taken to completely run A* algorithm from start node to end node
-            astar_start_time = time.time()
-            astar_distances, astar_previous, astar_visited = a_star(graph, start_node, end_node, heuristic, positions)
-            astar_end_time = time.time()
-            astar_nodes_visited = len(astar_visited)
-            astar_elapsed_time = astar_end_time - astar_start_time
-
-            # Get the shortest paths
-            dijkstra_path = reconstruct_path(dijkstra_previous, start_node, end_node)
-            astar_path = reconstruct_path(astar_previous, start_node, end_node)
-
-            stat_window = create_stat_window(
-                elapsed_time_dijkstra=dijkstra_elapsed_time,
-                elapsed_time_aStar=astar_elapsed_time,
-                num_nodes_visited_dijkstra=dijkstra_nodes_visited,
-                num_nodes_visited_aStar=astar_nodes_visited,
-                distance_dijkstra=dijkstra_distances[end_node],
-                distance_aStar=astar_distances[end_node])
-
-            if dijkstra_distances[end_node] != float('inf'):
-                # Clear previous route if it exists
-                if route_line:
-                    route_line.remove()
-
-                # Plot the Dijkstra's route
-                route_coords = []
-                for node in dijkstra_path:
-                    node_data = graph_proj.nodes[node]
-                    route_coords.append((node_data['x'], node_data['y']))
-
-                x_coords, y_coords = zip(*route_coords)
-
-                # Bright orange route
-                route_line = ax.plot(x_coords, y_coords,
-                                   color='#FF8C00',  # Bright orange
-                                   linewidth=1,
-                                   alpha=0.8)[0]
-
-                # Plot the A* route
-                a_route_coords = []
-                for node in astar_path:
-                    a_node_data = graph_proj.nodes[node]
-                    a_route_coords.append((a_node_data['x'], a_node_data['y']))
-
-                a_x_coords, a_y_coords = zip(*a_route_coords)
-
-                # Bright blue route
-                a_route_line = ax.plot(a_x_coords, a_y_coords,
-                                   color='#0096FF',  # Bright blue
-                                   linewidth=1,
-                                   alpha=0.8)[0]
-
-                # Print values to terminal for testing
-                print(f"Total Dijkstra's distance: {dijkstra_distances[end_node]:.2f} meters")
-                print(f"Total A* distance: {astar_distances[end_node]:.2f} meters")
-            else:
-                print("No valid path found between selected points!")
-
-            plt.draw()
+            if worker.busy:
+                print("Still searching the previous route")
+                return
+            pressed_at, submitted = time.perf_counter(), generation[0]
+            worker.submit(compare_routes, *selected_nodes,
+                          on_done=lambda comparison: generation[0] == submitted and show_routes(comparison, pressed_at))
+
+        # T key to apply the traffic feed (<city>.traffic.csv) and repair the selected route
+        elif event.key == 't' and len(selected_nodes) == 2:
+            if not os.path.exists(traffic_file):
+                print(f"Traffic feed not found: {traffic_file}")
+                return
+            if worker.busy:
+                print("Still searching the previous route")
+                return
+            pressed_at, submitted = time.perf_counter(), generation[0]
+            worker.submit(repair_traffic, *selected_nodes,
+                          on_done=lambda repair: generation[0] == submitted and show_traffic_route(repair, pressed_at))
+
+        # I key to draw driving-time isochrones around the first selected point
+        elif event.key == 'i' and selected_nodes:
+            if worker.busy:
+                print("Still searching the previous route")
+                return
+            pressed_at, submitted = time.perf_counter(), generation[0]
+            worker.submit(compute_isochrones, selected_nodes[0],
+                          on_done=lambda result: generation[0] == submitted and show_isochrones(result, pressed_at))
 
         # X key to clear map
         elif event.key == 'x':
             clear_map()
 
     def on_click(event):
-        global selected_nodes, graph_proj, route_line, markers
         if event.button is MouseButton.LEFT and event.inaxes == ax:
             # Get the clicked coordinates
             x, y = event.xdata, event.ydata
 
-            # Find the nearest node to the clicked point
-            nearest_node = ox.nearest_nodes(graph_proj, x, y)
+            # Snap the click onto the nearest street, then route from the closer end of that edge
+            u, v, (snap_x, snap_y), fraction, _ = spatial_index.snap(x, y)
+            nearest_node = routing_node(u, v, fraction)
 
             if len(selected_nodes) < 2:
                 selected_nodes.append(nearest_node)
-                # Bright orange markers
-                marker = plt.plot(x, y, 'o', color='#FF8C00', markersize=5, alpha=0.9)[0]
-                markers.append(marker)  # Store marker reference
-                plt.draw()
+                marker_points.append((snap_x, snap_y))
+                markers_line.set_data([p[0] for p in marker_points], [p[1] for p in marker_points])
+                blit.render()
 
     # Close any existing figures
     plt.close('all')
@@ -235,13 +381,41 @@ def main(algorithm='Dijkstra\'s & A*', city_map='Gainesville'):
     # Remove all margins and spacing
     plt.subplots_adjust(left=0, right=1, top=0.98, bottom=0)
 
-    # Connect the events
-    fig.canvas.mpl_connect('button_press_event', on_click)
-    fig.canvas.mpl_connect('key_press_event', on_key)
-
     # Ensure the plot fills the axes
     ax.set_aspect('auto')
 
+    # Streets are the cached background; everything that changes is blitted over them
+    blit = BlitLayer(fig)
+    frontier_line = blit.add(ax.plot([], [], ',', color='#FFD700', alpha=0.5)[0])
+    alternative_lines = [blit.add(ax.plot([], [], '--', color=color, linewidth=1, alpha=0.7)[0])
+                         for color in ALTERNATIVE_COLORS]
+    dijkstra_line = blit.add(ax.plot([], [], color='#FF8C00', linewidth=1, alpha=0.8)[0])
+    astar_line = blit.add(ax.plot([], [], color='#0096FF', linewidth=1, alpha=0.8)[0])
+    markers_line = blit.add(ax.plot([], [], 'o', color='#FF8C00', markersize=5, alpha=0.9)[0])
+    metrics_text = blit.add(ax.text(0.01, 0.99, '', transform=ax.transAxes, ha='left', va='top',
+                                    color='white', fontsize=8))
+
+    # Searches run on the worker thread; results come back through a canvas timer
+    worker = RouteWorker(fig.canvas)
+    frontier_animation = FrontierAnimation(worker, blit, frontier_line, node_xy)
+
+    # Route cache (memory LRU + cache/routes.sqlite), invalidated when the GraphML changes
+    # Opened on the worker thread because the searches that use its sqlite connection run there
+    route_cache = worker.call(open_route_cache, graph_file)
+
+    # Routes cached under traffic get their own fingerprint (dropped from disk on the next launch)
+    free_flow_fingerprint = route_cache.fingerprint
+
+    def on_traffic(change):
+        route_cache.fingerprint = f"{free_flow_fingerprint}+traffic{traffic.version}"
+
+    traffic.listeners.append(on_traffic)
+
+    # Connect the events (closing the map stops the worker so app.py can return to the menu)
+    fig.canvas.mpl_connect('button_press_event', on_click)
+    fig.canvas.mpl_connect('key_press_event', on_key)
+    fig.canvas.mpl_connect('close_event', lambda event: worker.close())
+
     plt.show()
 
 # M A I N ----------------------------------------------------------
@@ -0,0 +1,203 @@
+# I M P O R T S   &   D E P E N D E N C I E S ----------------------
+import queue
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List, Optional, Sequence
+
+import numpy as np
+
+from compiledGraph import CompiledGraph
+from spatialIndex import SpatialIndex
+
+# C O N S T A N T S ------------------------------------------------
+
+# How often the GUI thread collects finished searches and advances animations (milliseconds)
+POLL_INTERVAL_MS = 15
+
+# Frames a frontier replay is spread over
+FRONTIER_FRAMES = 60
+
+
+# C O O R D I N A T E S --------------------------------------------
+
+# Projected (x, y) of every node, indexed like the compiled graph, so a route becomes one fancy index
+def node_coordinates(compiled: CompiledGraph, spatial_index: SpatialIndex) -> np.ndarray:
+    xy = np.full((compiled.num_nodes, 2), np.nan)
+    index = compiled.index
+    rows = np.fromiter((index.get(node, -1) for node in spatial_index.node_ids.tolist()), dtype=np.int64,
+                       count=len(spatial_index.node_ids))
+    known = rows >= 0
+    xy[rows[known]] = spatial_index.node_xy[known]
+    return xy
+
+
+# Projected coordinates of a path of OSM ids as (xs, ys)
+def path_coordinates(compiled: CompiledGraph, xy: np.ndarray, path: Sequence[int]):
+    index = compiled.index
+    points = xy[[index[node] for node in path]] if path else np.empty((0, 2))
+    return points[:, 0], points[:, 1]
+
+
+# PathPatch for a shapely (Multi)Polygon in projected coordinates, holes included
+def geometry_patch(geometry, **style):
+    import shapely
+    from matplotlib.patches import PathPatch
+    from matplotlib.path import Path
+
+    vertices, codes = [], []
+    for polygon in shapely.get_parts(geometry):
+        for ring in (polygon.exterior, *polygon.interiors):
+            points = np.asarray(ring.coords)
+            vertices.append(points)
+            codes.append([Path.MOVETO] + [Path.LINETO] * (len(points) - 2) + [Path.CLOSEPOLY])
+    if not vertices:
+        return PathPatch(Path(np.empty((0, 2))), **style)
+    return PathPatch(Path(np.concatenate(vertices), np.concatenate(codes)), **style)
+
+
+# R O U T E   W O R K E R ------------------------------------------
+
+# Runs jobs on one background thread and hands results back to the GUI thread
+# Searches share the graph's SearchState and the route cache's sqlite connection, so a single
+# worker thread keeps them serialised; the GUI never waits on it. A canvas timer polls the
+# result queue, so callbacks run inside the matplotlib event loop.
+class RouteWorker:
+    def __init__(self, canvas):
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="route-worker")
+        self.results: 'queue.Queue[tuple]' = queue.Queue()
+        self.pending = 0
+
+        # Called on the GUI thread every poll (animations hook in here)
+        self.tickers: List[Callable[[], None]] = []
+
+        self.timer = canvas.new_timer(interval=POLL_INTERVAL_MS)
+        self.timer.add_callback(self.poll)
+        self.timer.start()
+
+    # Runs fn(*args) on the worker and blocks for the result (setup that must live on that thread)
+    def call(self, fn: Callable, *args):
+        return self.executor.submit(fn, *args).result()
+
+    # Queues fn(*args); on_done(result) later runs on the GUI thread (on_error(exception) on failure)
+    def submit(self, fn: Callable, *args, on_done: Callable, on_error: Optional[Callable] = None) -> None:
+        self.pending += 1
+        future = self.executor.submit(fn, *args)
+        future.add_done_callback(lambda done: self.results.put((done, on_done, on_error)))
+
+    @property
+    def busy(self) -> bool:
+        return self.pending > 0
+
+    # GUI thread: deliver finished jobs, then advance animations
+    def poll(self) -> None:
+        while True:
+            try:
+                future, on_done, on_error = self.results.get_nowait()
+            except queue.Empty:
+                break
+            self.pending -= 1
+            error = future.exception()
+            if error is None:
+                on_done(future.result())
+            elif on_error is not None:
+                on_error(error)
+            else:
+                print(f"Route job failed: {error!r}")
+
+        for ticker in list(self.tickers):
+            ticker()
+
+    def close(self) -> None:
+        self.timer.stop()
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+
+# B L I T   L A Y E R ----------------------------------------------
+
+# Draws dynamic artists (routes, markers, frontier, overlay text) over a cached street layer
+# A full draw (first show, resize) re-caches the background; every other update restores it and
+# blits only the animated artists, so redraw cost no longer grows with the city's street count
+class BlitLayer:
+    def __init__(self, fig):
+        self.fig = fig
+        self.canvas = fig.canvas
+        self.artists: list = []
+        self.background = None
+
+        # Seconds per blitted frame (restore + draw artists + blit)
+        self.frame_times: 'deque[float]' = deque(maxlen=240)
+
+        self.canvas.mpl_connect('draw_event', self._on_draw)
+
+    # Registers an artist drawn only by the blit layer
+    # index places it in the draw order (e.g. overlays below the routes); default is on top
+    def add(self, artist, index: Optional[int] = None):
+        artist.set_animated(True)
+        self.artists.insert(len(self.artists) if index is None else index, artist)
+        return artist
+
+    # Unregisters an artist and detaches it from its axes
+    def remove(self, artist) -> None:
+        if artist in self.artists:
+            self.artists.remove(artist)
+            artist.remove()
+
+    def _on_draw(self, event) -> None:
+        self.background = self.canvas.copy_from_bbox(self.fig.bbox)
+        self._draw_artists()
+
+    def _draw_artists(self) -> None:
+        for artist in self.artists:
+            self.fig.draw_artist(artist)
+
+    # Repaints the dynamic artists; falls back to a full draw before the background exists
+    def render(self) -> None:
+        if self.background is None:
+            self.canvas.draw_idle()
+            return
+        frame_start_time = time.perf_counter()
+        self.canvas.restore_region(self.background)
+        self._draw_artists()
+        self.canvas.blit(self.fig.bbox)
+        self.canvas.flush_events()
+        self.frame_times.append(time.perf_counter() - frame_start_time)
+
+    # (mean, p95) frame time in milliseconds over recent frames
+    def frame_stats(self):
+        if not self.frame_times:
+            return 0.0, 0.0
+        times = sorted(self.frame_times)
+        return (sum(times) / len(times) * 1000, times[min(len(times) - 1, int(len(times) * 0.95))] * 1000)
+
+
+# F R O N T I E R   A N I M A T I O N ------------------------------
+
+# Replays a search's settled nodes in settle order on a points artist, one chunk per poll
+class FrontierAnimation:
+    def __init__(self, worker: RouteWorker, layer: BlitLayer, artist, xy: np.ndarray):
+        self.worker, self.layer, self.artist, self.xy = worker, layer, artist, xy
+        self.order = np.empty(0, dtype=np.int64)
+        self.shown = 0
+        self.step = 1
+
+    # Starts replaying settled (compiled indices in settle order)
+    def start(self, settled: Sequence[int]) -> None:
+        self.order = np.asarray(settled, dtype=np.int64)
+        self.shown = 0
+        self.step = max(1, len(self.order) // FRONTIER_FRAMES)
+        if self.tick not in self.worker.tickers:
+            self.worker.tickers.append(self.tick)
+
+    def stop(self) -> None:
+        if self.tick in self.worker.tickers:
+            self.worker.tickers.remove(self.tick)
+        self.artist.set_data([], [])
+
+    def tick(self) -> None:
+        self.shown = min(len(self.order), self.shown + self.step)
+        points = self.xy[self.order[:self.shown]]
+        self.artist.set_data(points[:, 0], points[:, 1])
+        self.layer.render()
+        if self.shown >= len(self.order):
+            self.worker.tickers.remove(self.tick)
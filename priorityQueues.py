@@ -0,0 +1,249 @@
+# I M P O R T S   &   D E P E N D E N C I E S ----------------------
+import argparse
+import heapq
+import json
+import random
+import sys
+import time
+from typing import Callable, Dict, List, Tuple
+
+# C O N S T A N T S ------------------------------------------------
+
+# Backends selectable with the queue= argument of dijkstra() and a_star()
+QUEUE_BACKENDS = ('heapq', 'indexed', 'radix')
+
+# Radix keys are floor(key * RADIX_SCALE): whole metres for length weights, whole seconds for travel time
+RADIX_SCALE = 1.0
+
+
+# Q U E U E   B A C K E N D S --------------------------------------
+# Every backend is driven like heapq: push(queue, (key, node)), pop(queue) -> (key, node) and
+# truthiness for "not empty", so the search loops keep their shape and heapq stays a plain list.
+# Entries for a node can be outdated only in the lazy backends; the loops skip them via `closed`.
+
+# Binary heap with a position map, so pushing a node already queued lowers its key in place
+# (real decrease-key: no stale entries, at the cost of sifting in Python instead of C)
+class IndexedHeap:
+    __slots__ = ('keys', 'nodes', 'position', 'decreases')
+
+    def __init__(self):
+        self.keys: List[float] = []
+        self.nodes: List[int] = []
+        self.position: Dict[int, int] = {}
+        self.decreases = 0
+
+    def __len__(self) -> int:
+        return len(self.nodes)
+
+    # Inserts node, or lowers its key if it is already queued with a larger one
+    def push(self, item: Tuple[float, int]) -> None:
+        key, node = item
+        keys, nodes, position = self.keys, self.nodes, self.position
+
+        i = position.get(node)
+        if i is None:
+            i = len(nodes)
+            keys.append(key)
+            nodes.append(node)
+        elif key < keys[i]:
+            self.decreases += 1
+        else:
+            return
+
+        # Sift up
+        while i:
+            parent = (i - 1) >> 1
+            if keys[parent] <= key:
+                break
+            keys[i], nodes[i] = keys[parent], nodes[parent]
+            position[nodes[i]] = i
+            i = parent
+        keys[i], nodes[i] = key, node
+        position[node] = i
+
+    def pop(self) -> Tuple[float, int]:
+        keys, nodes, position = self.keys, self.nodes, self.position
+        top_key, top_node = keys[0], nodes[0]
+        del position[top_node]
+
+        key, node = keys.pop(), nodes.pop()
+        size = len(nodes)
+        if size:
+            # Sift the last entry down from the root
+            i = 0
+            while True:
+                child = 2 * i + 1
+                if child >= size:
+                    break
+                if child + 1 < size and keys[child + 1] < keys[child]:
+                    child += 1
+                if key <= keys[child]:
+                    break
+                keys[i], nodes[i] = keys[child], nodes[child]
+                position[nodes[i]] = i
+                i = child
+            keys[i], nodes[i] = key, node
+            position[node] = i
+
+        return top_key, top_node
+
+
+# Monotone radix heap over integer-rounded keys (floor(key * scale), e.g. whole metres)
+#   bucket b > 0 -> entries whose rounded key first differs from the last popped one at bit b - 1
+#   bucket 0     -> entries sharing the last popped rounded key, kept as a small heapq by exact key
+# Rounding only decides the bucket, so pops still come out in exact key order and distances stay
+# exact. Keys must not fall below the last popped key (true for Dijkstra and consistent A*); a key
+# that rounds lower anyway (floating point noise in a heuristic) goes to bucket 0, which stays exact.
+class RadixHeap:
+    __slots__ = ('scale', 'last', 'buckets', 'size', 'redistributed')
+
+    def __init__(self, scale: float = RADIX_SCALE):
+        self.scale = scale
+        self.last = 0
+        self.buckets: List[list] = [[] for _ in range(65)]
+        self.size = 0
+        self.redistributed = 0
+
+    def __len__(self) -> int:
+        return self.size
+
+    def push(self, item: Tuple[float, int]) -> None:
+        self.size += 1
+        rounded = int(item[0] * self.scale)
+        if rounded <= self.last:
+            heapq.heappush(self.buckets[0], item)
+        else:
+            self.buckets[(rounded ^ self.last).bit_length()].append((rounded, item))
+
+    def pop(self) -> Tuple[float, int]:
+        buckets = self.buckets
+        if not buckets[0]:
+            # Refill bucket 0 from the first non-empty bucket; its minimum becomes the new base
+            b = 1
+            while not buckets[b]:
+                b += 1
+            entries, buckets[b] = buckets[b], []
+            last = self.last = min(rounded for rounded, _ in entries)
+            self.redistributed += len(entries)
+
+            lowest = buckets[0]
+            for rounded, item in entries:
+                if rounded == last:
+                    lowest.append(item)
+                else:
+                    buckets[(rounded ^ last).bit_length()].append((rounded, item))
+            heapq.heapify(lowest)
+
+        self.size -= 1
+        return heapq.heappop(buckets[0])
+
+
+# Returns (queue, push, pop) for a backend; push/pop are called as push(queue, item) / pop(queue)
+def make_queue(backend: str = 'heapq') -> Tuple[object, Callable, Callable]:
+    if backend == 'heapq':
+        return [], heapq.heappush, heapq.heappop
+    if backend == 'indexed':
+        return IndexedHeap(), IndexedHeap.push, IndexedHeap.pop
+    if backend == 'radix':
+        return RadixHeap(), RadixHeap.push, RadixHeap.pop
+    raise ValueError(f"Unknown queue backend {backend!r} (expected one of {', '.join(QUEUE_BACKENDS)})")
+
+
+# Per-backend extra counters (decrease-keys, radix redistributions)
+def queue_counters(queue) -> Dict[str, int]:
+    counters = {}
+    if isinstance(queue, IndexedHeap):
+        counters['decrease_keys'] = queue.decreases
+    elif isinstance(queue, RadixHeap):
+        counters['radix_redistributed'] = queue.redistributed
+    return counters
+
+
+# B E N C H M A R K ------------------------------------------------
+
+# Runs Dijkstra and A* with every backend on random pairs
+# Every backend is checked against lazy-heapq Dijkstra; returns (report, mismatches)
+def compare_backends(compiled, pairs: List[Tuple[int, int]], backends=QUEUE_BACKENDS) -> Tuple[dict, List[dict]]:
+    from a_star import a_star
+    from dijkstras import dijkstra
+    from heuristics import HaversineHeuristic
+    from instrumentation import SearchStats
+
+    heuristic = HaversineHeuristic(compiled)
+    reference = [dijkstra(compiled, start, end)[0][end] for start, end in pairs]
+    searches = {
+        'dijkstra': lambda start, end, backend, stats: dijkstra(compiled, start, end, stats=stats, queue=backend),
+        'a_star': lambda start, end, backend, stats: a_star(compiled, start, end, heuristic, {}, stats=stats,
+                                                            queue=backend),
+    }
+
+    report: Dict[str, dict] = {}
+    mismatches: List[dict] = []
+    for algorithm, search in searches.items():
+        for backend in backends:
+            totals: Dict[str, float] = {}
+            latencies = []
+            for (start, end), expected in zip(pairs, reference):
+                stats = SearchStats()
+                query_start_time = time.perf_counter()
+                distance = search(start, end, backend, stats)[0][end]
+                latencies.append(time.perf_counter() - query_start_time)
+
+                for name, value in stats.counters.items():
+                    totals[name] = totals.get(name, 0) + value
+                if distance != expected and abs(distance - expected) > 1e-6:
+                    mismatches.append({'algorithm': algorithm, 'queue': backend, 'start_node': start,
+                                       'end_node': end, 'distance': distance, 'dijkstra': expected})
+
+            latencies.sort()
+            report[f"{algorithm}/{backend}"] = {
+                'mean_ms': sum(latencies) / len(latencies) * 1000,
+                'p50_ms': latencies[len(latencies) // 2] * 1000,
+                **{name: value / len(pairs) for name, value in totals.items()},
+            }
+    return report, mismatches
+
+
+# M A I N ----------------------------------------------------------
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Compare priority queue backends and check them against Dijkstra")
+    parser.add_argument("graph_file", help="GraphML file (e.g. data/gainesville.graphml)")
+    parser.add_argument("--queries", type=int, default=200, help="Random OD pairs")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--backends", default=','.join(QUEUE_BACKENDS), help="Comma separated backends")
+    parser.add_argument("--json", default=None, help="Write the report to this JSON file")
+    args = parser.parse_args(argv)
+
+    from graphCache import load_compiled
+
+    compiled = load_compiled(args.graph_file)
+    rng = random.Random(args.seed)
+    nodes = compiled.node_list()
+    pairs = [(rng.choice(nodes), rng.choice(nodes)) for _ in range(args.queries)]
+    backends = [name.strip() for name in args.backends.split(',') if name.strip()]
+    for backend in backends:
+        make_queue(backend)
+
+    report, mismatches = compare_backends(compiled, pairs, backends)
+
+    print(f"{'search/queue':<20} {'mean ms':>9} {'p50 ms':>9} {'pushes':>9} {'pops':>9} {'stale':>9} {'extra':>12}")
+    for name, row in report.items():
+        extra = row.get('decrease_keys', row.get('radix_redistributed'))
+        print(f"{name:<20} {row['mean_ms']:>9.2f} {row['p50_ms']:>9.2f} {row['heap_pushes']:>9.0f} "
+              f"{row['heap_pops']:>9.0f} {row['stale_pops']:>9.0f} {'' if extra is None else f'{extra:.0f}':>12}")
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({'graph': args.graph_file, 'queries': len(pairs), 'report': report,
+                       'mismatches': mismatches}, f, indent=2)
+
+    # Differential check: every backend must reproduce Dijkstra's distances
+    if mismatches:
+        print(f"{len(mismatches)} distance mismatches against lazy-heapq Dijkstra", file=sys.stderr)
+        return 1
+    print(f"All backends match Dijkstra on {len(pairs)} queries")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,201 @@
+# I M P O R T S   &   D E P E N D E N C I E S ----------------------
+import json
+import os
+import sqlite3
+from collections import OrderedDict
+from typing import Callable, Dict, List, NamedTuple, Optional, Set, Tuple
+
+from dijkstras import reconstruct_path
+
+# C O N S T A N T S ------------------------------------------------
+ROUTE_DB = os.path.join("cache", "routes.sqlite")
+
+
+# R O U T E   R E S U L T ------------------------------------------
+
+# What the cache keeps per route: enough for drawing and the stats window
+# nodes_visited is None when the route was read off another search's shortest path tree (no search ran)
+class RouteResult(NamedTuple):
+    distance: float
+    path: List[int]
+    nodes_visited: Optional[int]
+
+
+# Shortest path tree kept from an earlier search: every settled node's distance and path are final
+class _Tree(NamedTuple):
+    distances: Dict[int, float]
+    previous: Dict[int, Optional[int]]
+    settled: Set[int]
+
+
+# R O U T E   C A C H E --------------------------------------------
+
+# Route cache keyed by (graph fingerprint, start_node, end_node, algorithm, weight)
+#   tier 1: bounded in-memory LRU of RouteResults
+#   tier 2: optional sqlite table under cache/, shared across launches
+#   trees : LRU of shortest path trees per (source, algorithm), answering later queries of the same
+#           algorithm to any settled node
+# Entries carry the graph fingerprint, so a changed GraphML never serves stale routes
+class RouteCache:
+    def __init__(self, fingerprint: str, graph_name: str = '', capacity: int = 1024,
+                 tree_capacity: int = 16, disk_path: Optional[str] = None):
+        self.fingerprint = fingerprint
+        self.graph_name = graph_name
+        self.capacity = capacity
+        self.tree_capacity = tree_capacity
+
+        self._routes: 'OrderedDict[tuple, RouteResult]' = OrderedDict()
+        self._trees: 'OrderedDict[tuple, _Tree]' = OrderedDict()
+
+        # Hit/miss counters
+        self.hits = 0
+        self.disk_hits = 0
+        self.tree_hits = 0
+        self.misses = 0
+
+        self._db: Optional[sqlite3.Connection] = None
+        if disk_path is not None:
+            self._open_disk(disk_path)
+
+    # Opens the sqlite tier and drops rows written for an older version of this graph
+    def _open_disk(self, disk_path: str) -> None:
+        os.makedirs(os.path.dirname(disk_path) or '.', exist_ok=True)
+        self._db = sqlite3.connect(disk_path)
+        self._db.execute("""CREATE TABLE IF NOT EXISTS routes (
+                                graph TEXT, fingerprint TEXT, start INTEGER, end INTEGER,
+                                algorithm TEXT, weight TEXT, distance REAL, path TEXT, visited INTEGER,
+                                PRIMARY KEY (fingerprint, start, end, algorithm, weight))""")
+        self._db.execute("DELETE FROM routes WHERE graph = ? AND fingerprint != ?",
+                         (self.graph_name, self.fingerprint))
+        self._db.commit()
+
+    def _key(self, start_node: int, end_node: int, algorithm: str, weight: str) -> tuple:
+        return (self.fingerprint, start_node, end_node, algorithm, weight)
+
+    # Returns a cached route or None (memory, then shared trees, then disk)
+    # reuse_tree=False skips the tree tier, for searches whose own visit counts are wanted
+    def lookup(self, start_node: int, end_node: int, algorithm: str, weight: str = 'length',
+               reuse_tree: bool = True) -> Optional[RouteResult]:
+        key = self._key(start_node, end_node, algorithm, weight)
+
+        result = self._routes.get(key)
+        if result is not None:
+            self._routes.move_to_end(key)
+            self.hits += 1
+            return result
+
+        # Any earlier search of this algorithm from this source that settled end_node already knows the answer
+        tree_key = (self.fingerprint, start_node, algorithm, weight)
+        tree = self._trees.get(tree_key) if reuse_tree else None
+        if tree is not None and end_node in tree.settled:
+            self._trees.move_to_end(tree_key)
+            result = RouteResult(tree.distances[end_node], reconstruct_path(tree.previous, start_node, end_node), None)
+            self._remember(key, result)
+            self.tree_hits += 1
+            return result
+
+        if self._db is not None:
+            row = self._db.execute("SELECT distance, path, visited FROM routes WHERE fingerprint = ? AND start = ? "
+                                   "AND end = ? AND algorithm = ? AND weight = ?", key).fetchone()
+            if row is not None:
+                result = RouteResult(row[0], json.loads(row[1]), row[2])
+                self._remember(key, result)
+                self.disk_hits += 1
+                return result
+
+        self.misses += 1
+        return None
+
+    # Stores a route; pass the search's (distances, previous, visited) to make its tree reusable
+    def store(self, start_node: int, end_node: int, algorithm: str, result: RouteResult, weight: str = 'length',
+              search: Optional[Tuple[Dict[int, float], Dict[int, Optional[int]], Set[int]]] = None) -> None:
+        key = self._key(start_node, end_node, algorithm, weight)
+        self._remember(key, result)
+
+        if search is not None:
+            distances, previous, visited = search
+            settled = set(visited)
+            if result.distance != float('inf'):
+                settled.add(end_node)
+            tree_key = (self.fingerprint, start_node, algorithm, weight)
+            self._trees[tree_key] = _Tree(distances, previous, settled)
+            self._trees.move_to_end(tree_key)
+            while len(self._trees) > self.tree_capacity:
+                self._trees.popitem(last=False)
+
+        if self._db is not None:
+            self._db.execute("INSERT OR REPLACE INTO routes VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                             (self.graph_name, *key, result.distance, json.dumps(result.path), result.nodes_visited))
+            self._db.commit()
+
+    # Adds to the in-memory LRU, evicting the least recently used entry when full
+    def _remember(self, key: tuple, result: RouteResult) -> None:
+        self._routes[key] = result
+        self._routes.move_to_end(key)
+        while len(self._routes) > self.capacity:
+            self._routes.popitem(last=False)
+
+    # Cached route, or runs search() (returning (distances, previous, visited)) and caches it
+    # reuse_tree must be False for searches whose visited set is not a forward tree (e.g. bidirectional);
+    # it also keeps such searches from being answered by a tree
+    # Returns (result, cached)
+    def route(self, start_node: int, end_node: int, algorithm: str,
+              search: Callable[[], Tuple[Dict[int, float], Dict[int, Optional[int]], Set[int]]],
+              weight: str = 'length', reuse_tree: bool = True) -> Tuple[RouteResult, bool]:
+        result = self.lookup(start_node, end_node, algorithm, weight, reuse_tree=reuse_tree)
+        if result is not None:
+            return result, True
+
+        distances, previous, visited = search()
+        distance = distances[end_node]
+        path = reconstruct_path(previous, start_node, end_node) if distance != float('inf') else []
+        result = RouteResult(distance, path, len(visited))
+        self.store(start_node, end_node, algorithm, result, weight,
+                   search=(distances, previous, visited) if reuse_tree else None)
+        return result, False
+
+    # Drops everything cached for the current graph and switches to a new fingerprint
+    def invalidate(self, fingerprint: Optional[str] = None) -> None:
+        self._routes.clear()
+        self._trees.clear()
+        if self._db is not None:
+            self._db.execute("DELETE FROM routes WHERE graph = ?", (self.graph_name,))
+            self._db.commit()
+        if fingerprint is not None:
+            self.fingerprint = fingerprint
+
+    # Hit/miss counters and sizes
+    def stats(self) -> Dict[str, int]:
+        return {
+            'hits': self.hits,
+            'tree_hits': self.tree_hits,
+            'disk_hits': self.disk_hits,
+            'misses': self.misses,
+            'entries': len(self._routes),
+            'trees': len(self._trees),
+        }
+
+    def close(self) -> None:
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+
+
+# Opens the route cache for a GraphML file, fingerprinted by its content hash and mtime
+def open_route_cache(graph_file: str, capacity: int = 1024, disk: bool = True) -> RouteCache:
+    from graphCache import snapshot_key
+
+    graph_name = os.path.splitext(os.path.basename(graph_file))[0]
+    return RouteCache(snapshot_key(graph_file), graph_name=graph_name, capacity=capacity,
+                      disk_path=ROUTE_DB if disk else None)
+
+
+# Re-checks the GraphML on disk and invalidates the cache if it changed
+def refresh(cache: RouteCache, graph_file: str) -> bool:
+    from graphCache import snapshot_key
+
+    fingerprint = snapshot_key(graph_file)
+    if fingerprint == cache.fingerprint:
+        return False
+    cache.invalidate(fingerprint)
+    return True
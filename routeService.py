@@ -0,0 +1,386 @@
+# I M P O R T S   &   D E P E N D E N C I E S ----------------------
+import argparse
+import asyncio
+import json
+import multiprocessing
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Optional, Tuple
+from urllib.parse import parse_qsl, urlsplit
+
+import numpy as np
+
+# C O N S T A N T S ------------------------------------------------
+ALGORITHMS = ('dijkstra', 'astar')
+
+# Latencies kept for the metrics percentiles
+LATENCY_WINDOW = 2048
+
+_REASONS = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed',
+            500: 'Internal Server Error', 503: 'Service Unavailable'}
+
+# Per-process graphs, loaded on first request for a city (preloaded ones are inherited when forked)
+_graphs: Dict[str, tuple] = {}
+_spatial: Dict[str, object] = {}
+
+
+# W O R K E R ------------------------------------------------------
+
+# Loads (compiled, heuristic) for a GraphML file once per process
+def _graph(graph_file: str) -> tuple:
+    if graph_file not in _graphs:
+        from graphCache import load_compiled
+        from heuristics import HaversineHeuristic
+
+        compiled = load_compiled(graph_file)
+        _graphs[graph_file] = (compiled, HaversineHeuristic(compiled))
+    return _graphs[graph_file]
+
+
+# Snaps GPS points to nodes with the cached spatial index (loaded on first lat/lon request)
+def _snap(graph_file: str, lats, lons) -> list:
+    if graph_file not in _spatial:
+        from graphCache import load_spatial_index
+        _spatial[graph_file] = load_spatial_index(graph_file)
+    return _spatial[graph_file].nearest_nodes_latlon(np.asarray(lats), np.asarray(lons)).tolist()
+
+
+# Runs one query inside a pool process; returns a JSON-ready dict
+def route_job(graph_file: str, start, end, algorithm: str) -> dict:
+    from a_star import a_star
+    from dijkstras import dijkstra, reconstruct_path
+
+    compiled, heuristic = _graph(graph_file)
+
+    # (lat, lon) pairs are snapped to their nearest nodes
+    if isinstance(start, (list, tuple)):
+        start, end = _snap(graph_file, [start[0], end[0]], [start[1], end[1]])
+
+    query_start_time = time.perf_counter()
+    if algorithm == 'astar':
+        distances, previous, visited = a_star(compiled, start, end, heuristic, {})
+    else:
+        distances, previous, visited = dijkstra(compiled, start, end)
+    compute_ms = (time.perf_counter() - query_start_time) * 1000
+
+    distance = distances[end]
+    reachable = distance != float('inf')
+    return {
+        'start_node': start,
+        'end_node': end,
+        'distance': distance if reachable else None,
+        'path': reconstruct_path(previous, start, end) if reachable else [],
+        'nodes_visited': len(visited),
+        'compute_ms': compute_ms,
+    }
+
+
+# H E L P E R   F U N C T I O N S ----------------------------------
+
+# City name -> GraphML path for every city the registry discovers (nothing is parsed)
+def discover_cities() -> Dict[str, str]:
+    from graphRegistry import GraphRegistry
+
+    registry = GraphRegistry()
+    return {name: registry.path(name) for name in registry.names()}
+
+
+class HTTPError(Exception):
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+# Parses a route request (query string or JSON body) into (city, start, end, algorithm)
+# start/end are node ids, or (lat, lon) tuples when start_lat/start_lon/end_lat/end_lon are given
+def parse_route_request(params: dict) -> Tuple[str, object, object, str]:
+    try:
+        city = str(params['city'])
+        algorithm = str(params.get('algorithm', 'dijkstra'))
+        if 'start_lat' in params:
+            start = (float(params['start_lat']), float(params['start_lon']))
+            end = (float(params['end_lat']), float(params['end_lon']))
+        else:
+            start, end = int(params['start']), int(params['end'])
+    except KeyError as e:
+        raise HTTPError(400, f"Missing parameter {e.args[0]!r}") from None
+    except (TypeError, ValueError) as e:
+        raise HTTPError(400, f"Bad parameter: {e}") from None
+
+    if algorithm not in ALGORITHMS:
+        raise HTTPError(400, f"Unknown algorithm {algorithm!r}, expected one of {ALGORITHMS}")
+    return city, start, end, algorithm
+
+
+# R O U T E   S E R V I C E ----------------------------------------
+
+# asyncio HTTP/JSON front end over a process pool
+#   GET/POST /route  -> shortest route (identical in-flight requests share one search)
+#   GET /cities      -> routable cities
+#   GET /metrics     -> request counters, queue depth and latency percentiles
+#   GET /health      -> liveness
+# Searches never run on the event loop; past max_pending queued searches new ones get 503
+class RouteService:
+    def __init__(self, cities: Dict[str, str], workers: Optional[int] = None, max_pending: int = 256,
+                 preload=()):
+        self.cities = cities
+        self.workers = workers or multiprocessing.cpu_count()
+        self.max_pending = max_pending
+
+        # Load requested cities before forking so every worker inherits them copy-on-write
+        for city in preload:
+            _graph(self.cities[city])
+
+        from graphCache import fork_context
+        self.pool = ProcessPoolExecutor(max_workers=self.workers, mp_context=fork_context())
+
+        # Request key -> future shared by every identical request while it runs
+        self._in_flight: Dict[tuple, asyncio.Future] = {}
+
+        self.started = time.time()
+        self.counters = {'requests': 0, 'routes': 0, 'searches': 0, 'coalesced': 0, 'rejected': 0, 'errors': 0}
+        self.per_city: Dict[str, int] = {}
+        self._latencies: deque = deque(maxlen=LATENCY_WINDOW)
+
+    # Runs (or joins) the search for one request
+    async def route(self, city: str, start, end, algorithm: str) -> dict:
+        if city not in self.cities:
+            raise HTTPError(404, f"Unknown city {city!r}")
+        self.counters['routes'] += 1
+        self.per_city[city] = self.per_city.get(city, 0) + 1
+
+        key = (city, start, end, algorithm)
+        future = self._in_flight.get(key)
+        if future is not None:
+            self.counters['coalesced'] += 1
+            try:
+                return await asyncio.shield(future)
+            except ValueError as e:
+                raise HTTPError(400, str(e)) from None
+
+        if len(self._in_flight) >= self.max_pending:
+            self.counters['rejected'] += 1
+            raise HTTPError(503, "Too many queued searches, retry later")
+
+        loop = asyncio.get_running_loop()
+        future = loop.run_in_executor(self.pool, route_job, self.cities[city], start, end, algorithm)
+        self._in_flight[key] = future
+        self.counters['searches'] += 1
+        try:
+            return await asyncio.shield(future)
+        except ValueError as e:
+            raise HTTPError(400, str(e)) from None
+        finally:
+            self._in_flight.pop(key, None)
+
+    def metrics(self) -> dict:
+        latencies = np.asarray(self._latencies) if self._latencies else np.zeros(1)
+        return {
+            **self.counters,
+            'in_flight': len(self._in_flight),
+            'max_pending': self.max_pending,
+            'workers': self.workers,
+            'uptime_s': time.time() - self.started,
+            'per_city': self.per_city,
+            'latency_ms': {
+                'p50': float(np.percentile(latencies, 50)),
+                'p95': float(np.percentile(latencies, 95)),
+                'p99': float(np.percentile(latencies, 99)),
+                'window': len(self._latencies),
+            },
+        }
+
+    # Dispatches one parsed HTTP request; returns (status, payload)
+    async def handle(self, method: str, target: str, body: bytes) -> Tuple[int, dict]:
+        url = urlsplit(target)
+        if url.path == '/health':
+            return 200, {'status': 'ok'}
+        if url.path == '/metrics':
+            return 200, self.metrics()
+        if url.path == '/cities':
+            return 200, {'cities': sorted(self.cities)}
+        if url.path != '/route':
+            raise HTTPError(404, f"No endpoint {url.path}")
+
+        if method == 'GET':
+            params = dict(parse_qsl(url.query))
+        elif method == 'POST':
+            try:
+                params = json.loads(body or b'{}')
+            except ValueError:
+                raise HTTPError(400, "Body is not valid JSON") from None
+        else:
+            raise HTTPError(405, f"Method {method} not allowed")
+
+        request_start_time = time.perf_counter()
+        result = await self.route(*parse_route_request(params))
+        self._latencies.append((time.perf_counter() - request_start_time) * 1000)
+        return 200, result
+
+    # One keep-alive HTTP/1.1 connection
+    async def serve_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line.strip():
+                    break
+                method, target, version = request_line.decode('latin-1').split(' ', 2)
+
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b'\r\n', b'\n', b''):
+                        break
+                    name, _, value = line.decode('latin-1').partition(':')
+                    headers[name.strip().lower()] = value.strip()
+                body = await reader.readexactly(int(headers.get('content-length', 0) or 0))
+
+                self.counters['requests'] += 1
+                try:
+                    status, payload = await self.handle(method.upper(), target, body)
+                except HTTPError as e:
+                    status, payload = e.status, {'error': str(e)}
+                except Exception as e:
+                    self.counters['errors'] += 1
+                    status, payload = 500, {'error': f"{type(e).__name__}: {e}"}
+
+                keep_alive = headers.get('connection', '').lower() != 'close' and version.strip() == 'HTTP/1.1'
+                data = json.dumps(payload).encode()
+                head = [f"HTTP/1.1 {status} {_REASONS.get(status, '')}",
+                        "Content-Type: application/json",
+                        f"Content-Length: {len(data)}",
+                        f"Connection: {'keep-alive' if keep_alive else 'close'}"]
+                if status == 503:
+                    head.append("Retry-After: 1")
+                writer.write(("\r\n".join(head) + "\r\n\r\n").encode() + data)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self, host: str = '127.0.0.1', port: int = 8080) -> None:
+        server = await asyncio.start_server(self.serve_connection, host, port)
+        address = server.sockets[0].getsockname()
+        print(f"Routing {len(self.cities)} cities on http://{address[0]}:{address[1]} "
+              f"with {self.workers} workers", file=sys.stderr)
+        async with server:
+            await server.serve_forever()
+
+    def close(self) -> None:
+        self.pool.shutdown(cancel_futures=True)
+
+
+# L O A D   T E S T ------------------------------------------------
+
+# Minimal keep-alive client: sends GET requests over one connection, appending (status, latency) to results
+async def _client(host: str, port: int, paths: list, results: list) -> None:
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        for path in paths:
+            request_start_time = time.perf_counter()
+            writer.write(f"GET {path} HTTP/1.1\r\nHost: {host}\r\n\r\n".encode())
+            await writer.drain()
+            status = int((await reader.readline()).split()[1])
+            length = 0
+            while True:
+                line = await reader.readline()
+                if line in (b'\r\n', b''):
+                    break
+                if line.lower().startswith(b'content-length:'):
+                    length = int(line.split(b':')[1])
+            await reader.readexactly(length)
+            results.append((status, time.perf_counter() - request_start_time))
+    finally:
+        writer.close()
+
+
+# Fires random route requests at a running service from concurrent connections
+async def load_test(host: str, port: int, city: str, graph_file: str, requests: int = 1000,
+                    concurrency: int = 32, seed: int = 0, repeat: float = 0.2) -> dict:
+    import random
+    from graphCache import load_compiled
+
+    rng = random.Random(seed)
+    nodes = load_compiled(graph_file).node_list()
+
+    # A share of requests repeats earlier ones so coalescing gets exercised
+    paths = []
+    for _ in range(requests):
+        if paths and rng.random() < repeat:
+            paths.append(rng.choice(paths))
+        else:
+            start, end = rng.sample(nodes, 2)
+            paths.append(f"/route?city={city}&start={start}&end={end}")
+
+    results: list = []
+    load_start_time = time.perf_counter()
+    await asyncio.gather(*(_client(host, port, paths[i::concurrency], results) for i in range(concurrency)))
+    elapsed = time.perf_counter() - load_start_time
+
+    latencies = np.asarray([latency for _, latency in results]) * 1000
+    statuses: Dict[int, int] = {}
+    for status, _ in results:
+        statuses[status] = statuses.get(status, 0) + 1
+    return {
+        'requests': len(results),
+        'seconds': elapsed,
+        'throughput_rps': len(results) / elapsed,
+        'statuses': statuses,
+        'p50_ms': float(np.percentile(latencies, 50)),
+        'p95_ms': float(np.percentile(latencies, 95)),
+        'p99_ms': float(np.percentile(latencies, 99)),
+    }
+
+
+# M A I N ----------------------------------------------------------
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Async HTTP/JSON routing service")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    serve = commands.add_parser('serve', help="Run the service")
+    serve.add_argument("--host", default='127.0.0.1')
+    serve.add_argument("--port", type=int, default=8080)
+    serve.add_argument("--workers", type=int, default=None)
+    serve.add_argument("--max-pending", type=int, default=256, help="Queued searches before answering 503")
+    serve.add_argument("--preload", default='', help="Comma separated cities to load before forking workers")
+
+    load = commands.add_parser('loadtest', help="Load test a running service")
+    load.add_argument("city")
+    load.add_argument("--host", default='127.0.0.1')
+    load.add_argument("--port", type=int, default=8080)
+    load.add_argument("--requests", type=int, default=1000)
+    load.add_argument("--concurrency", type=int, default=32)
+    load.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    cities = discover_cities()
+
+    if args.command == 'loadtest':
+        if args.city not in cities:
+            parser.error(f"Unknown city {args.city!r}")
+        report = asyncio.run(load_test(args.host, args.port, args.city, cities[args.city],
+                                       args.requests, args.concurrency, args.seed))
+        print(json.dumps(report, indent=2))
+        return
+
+    preload = [city for city in args.preload.split(',') if city]
+    unknown = [city for city in preload if city not in cities]
+    if unknown:
+        parser.error(f"Unknown cities: {', '.join(unknown)}")
+
+    service = RouteService(cities, workers=args.workers, max_pending=args.max_pending, preload=preload)
+    try:
+        asyncio.run(service.serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        service.close()
+
+
+if __name__ == "__main__":
+    main()
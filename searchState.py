@@ -0,0 +1,40 @@
+# I M P O R T S   &   D E P E N D E N C I E S ----------------------
+from typing import List
+
+
+# S E A R C H   S T A T E ------------------------------------------
+
+# Per-graph scratch arrays reused across queries
+# A node's dist/prev entries only count when its stamp equals the current epoch,
+# so starting a query is O(1) and results cost O(nodes touched), not O(graph size)
+class SearchState:
+    def __init__(self, num_nodes: int):
+        self.num_nodes = num_nodes
+
+        # Tentative distance and predecessor index per node
+        self.dist: List[float] = [float('infinity')] * num_nodes
+        self.prev: List[int] = [-1] * num_nodes
+
+        # Epoch stamps: reached this query / settled this query
+        self.stamp: List[int] = [0] * num_nodes
+        self.closed: List[int] = [0] * num_nodes
+        self.epoch = 0
+
+        # Indices reached and settled by the current query
+        self.touched: List[int] = []
+        self.settled: List[int] = []
+
+    # Starts a new query and seeds it with the source node
+    def begin(self, source: int) -> int:
+        self.epoch += 1
+        self.touched = [source]
+        self.settled = []
+
+        self.stamp[source] = self.epoch
+        self.dist[source] = 0
+        self.prev[source] = -1
+        return self.epoch
+
+    # Distance of a node in the current query
+    def distance(self, node: int) -> float:
+        return self.dist[node] if self.stamp[node] == self.epoch else float('infinity')
@@ -0,0 +1,205 @@
+# I M P O R T S   &   D E P E N D E N C I E S ----------------------
+import os
+from typing import Tuple
+
+import numpy as np
+
+# C O N S T A N T S ------------------------------------------------
+
+# Edge segments longer than this (projected metres) are split so midpoint lookups stay tight
+MAX_SEGMENT_LENGTH = 50.0
+
+# Points snapped per chunk in the batch APIs (bounds temporary memory)
+BATCH_CHUNK = 100000
+
+_SPATIAL_ARRAYS = ('node_ids', 'node_xy', 'seg_a', 'seg_b', 'seg_u', 'seg_v', 'seg_offset', 'edge_length')
+
+
+# S P A T I A L   I N D E X ----------------------------------------
+
+# KD-trees over projected node coordinates and edge segments of a projected osmnx graph
+#   node_xy[i]            -> projected (x, y) of node_ids[i]
+#   seg_a[j], seg_b[j]    -> segment j endpoints, part of edge seg_u[j] -> seg_v[j]
+#   seg_offset[j]         -> distance along that edge where segment j starts
+#   edge_length[j]        -> total geometric length of that edge
+class SpatialIndex:
+    def __init__(self, node_ids: np.ndarray, node_xy: np.ndarray, seg_a: np.ndarray, seg_b: np.ndarray,
+                 seg_u: np.ndarray, seg_v: np.ndarray, seg_offset: np.ndarray, edge_length: np.ndarray,
+                 crs=None):
+
+        self.node_ids = node_ids
+        self.node_xy = node_xy
+        self.seg_a, self.seg_b = seg_a, seg_b
+        self.seg_u, self.seg_v = seg_u, seg_v
+        self.seg_offset = seg_offset
+        self.edge_length = edge_length
+        self.crs = crs
+
+        # Trees are cheap to rebuild from the arrays, so only the arrays are persisted
+        # (scipy is imported here so modules that never build an index do not load it)
+        from scipy.spatial import cKDTree
+
+        self.node_tree = cKDTree(node_xy)
+        self.seg_tree = cKDTree((seg_a + seg_b) / 2) if len(seg_a) else None
+        self.max_half_length = float(np.max(np.hypot(*(seg_b - seg_a).T)) / 2) if len(seg_a) else 0.0
+
+        self._transformer = None
+
+    # Builds the index from a projected osmnx graph
+    @classmethod
+    def from_graph(cls, graph_proj, max_segment_length: float = MAX_SEGMENT_LENGTH) -> 'SpatialIndex':
+        node_ids = np.fromiter(graph_proj.nodes(), dtype=np.int64, count=graph_proj.number_of_nodes())
+        node_xy = np.array([(data['x'], data['y']) for _, data in graph_proj.nodes(data=True)], dtype=np.float64)
+        position = {node: i for i, node in enumerate(node_ids.tolist())}
+
+        # Polyline vertices of every edge (geometry if present, otherwise a straight line)
+        starts, ends, edge_u, edge_v, offsets, lengths = [], [], [], [], [], []
+        for u, v, data in graph_proj.edges(data=True):
+            geometry = data.get('geometry')
+            if geometry is not None:
+                coords = np.asarray(geometry.coords, dtype=np.float64)[:, :2]
+            else:
+                coords = node_xy[[position[u], position[v]]]
+
+            seg_lengths = np.hypot(*(coords[1:] - coords[:-1]).T)
+            starts.append(coords[:-1])
+            ends.append(coords[1:])
+            edge_u.append(np.full(len(seg_lengths), u, dtype=np.int64))
+            edge_v.append(np.full(len(seg_lengths), v, dtype=np.int64))
+            offsets.append(np.concatenate(([0.0], np.cumsum(seg_lengths)[:-1])))
+            lengths.append(np.full(len(seg_lengths), seg_lengths.sum()))
+
+        if starts:
+            seg_a, seg_b = np.concatenate(starts), np.concatenate(ends)
+            seg_u, seg_v = np.concatenate(edge_u), np.concatenate(edge_v)
+            seg_offset, edge_length = np.concatenate(offsets), np.concatenate(lengths)
+        else:
+            seg_a = seg_b = np.zeros((0, 2))
+            seg_u = seg_v = np.zeros(0, dtype=np.int64)
+            seg_offset = edge_length = np.zeros(0)
+
+        # Split long segments into equal pieces no longer than max_segment_length
+        seg_len = np.hypot(*(seg_b - seg_a).T)
+        pieces = np.maximum(1, np.ceil(seg_len / max_segment_length).astype(np.int64))
+        owner = np.repeat(np.arange(len(seg_a)), pieces)
+        step = np.arange(len(owner)) - np.repeat(np.cumsum(pieces) - pieces, pieces)
+        t0 = (step / pieces[owner])[:, None]
+        t1 = ((step + 1) / pieces[owner])[:, None]
+        direction = seg_b[owner] - seg_a[owner]
+
+        return cls(node_ids, node_xy,
+                   seg_a[owner] + t0 * direction, seg_a[owner] + t1 * direction,
+                   seg_u[owner], seg_v[owner],
+                   seg_offset[owner] + t0[:, 0] * seg_len[owner], edge_length[owner],
+                   crs=graph_proj.graph.get('crs'))
+
+    # Persists the arrays (and CRS) to a directory
+    def save(self, directory: str) -> None:
+        os.makedirs(directory, exist_ok=True)
+        for name in _SPATIAL_ARRAYS:
+            np.save(os.path.join(directory, f"{name}.npy"), getattr(self, name))
+        with open(os.path.join(directory, "crs.txt"), 'w') as f:
+            f.write(str(self.crs) if self.crs is not None else '')
+
+    # Loads arrays written by save() and rebuilds the trees
+    @classmethod
+    def load(cls, directory: str) -> 'SpatialIndex':
+        arrays = {name: np.load(os.path.join(directory, f"{name}.npy")) for name in _SPATIAL_ARRAYS}
+        with open(os.path.join(directory, "crs.txt")) as f:
+            crs = f.read() or None
+        return cls(crs=crs, **arrays)
+
+    # N O D E   Q U E R I E S ------------------------------------------
+
+    # k nearest nodes to a projected point: (node ids, distances)
+    def nearest(self, x: float, y: float, k: int = 1) -> Tuple[np.ndarray, np.ndarray]:
+        distances, idx = self.node_tree.query((x, y), k=k)
+        return self.node_ids[np.atleast_1d(idx)], np.atleast_1d(distances)
+
+    # Nearest node id to a projected point (drop-in for ox.nearest_nodes(graph_proj, x, y))
+    def nearest_node(self, x: float, y: float) -> int:
+        return int(self.nearest(x, y)[0][0])
+
+    # Node ids within radius metres of a projected point
+    def within(self, x: float, y: float, radius: float) -> np.ndarray:
+        return self.node_ids[np.asarray(self.node_tree.query_ball_point((x, y), radius), dtype=np.int64)]
+
+    # Nearest node ids for many projected points at once
+    def nearest_nodes(self, xs: np.ndarray, ys: np.ndarray) -> np.ndarray:
+        points = np.column_stack((xs, ys))
+        result = np.empty(len(points), dtype=np.int64)
+        for start in range(0, len(points), BATCH_CHUNK):
+            _, idx = self.node_tree.query(points[start:start + BATCH_CHUNK])
+            result[start:start + BATCH_CHUNK] = self.node_ids[idx]
+        return result
+
+    # E D G E   S N A P P I N G ----------------------------------------
+
+    # Snaps many projected points to the nearest point on any edge
+    # Returns (u, v, snapped_xy, fraction along u -> v, distance)
+    def snap_points(self, xs: np.ndarray, ys: np.ndarray):
+        if self.seg_tree is None:
+            raise ValueError("Graph has no edges to snap to")
+
+        points = np.column_stack((xs, ys)).astype(np.float64)
+        best_seg = np.empty(len(points), dtype=np.int64)
+        best_t = np.empty(len(points))
+        best_dist = np.empty(len(points))
+
+        for start in range(0, len(points), BATCH_CHUNK):
+            chunk = points[start:start + BATCH_CHUNK]
+
+            # Any segment closer than the nearest midpoint has its midpoint within d0 + max_half_length
+            d0, _ = self.seg_tree.query(chunk)
+            candidates = self.seg_tree.query_ball_point(chunk, d0 + self.max_half_length + 1e-9)
+            counts = np.fromiter((len(c) for c in candidates), dtype=np.int64, count=len(chunk))
+            seg = np.fromiter((s for c in candidates for s in c), dtype=np.int64, count=int(counts.sum()))
+            owner = np.repeat(np.arange(len(chunk)), counts)
+
+            # Exact point-to-segment distances for every candidate
+            a, b = self.seg_a[seg], self.seg_b[seg]
+            ab = b - a
+            denom = np.einsum('ij,ij->i', ab, ab)
+            t = np.clip(np.einsum('ij,ij->i', chunk[owner] - a, ab) / np.where(denom > 0, denom, 1), 0, 1)
+            dist = np.hypot(*(a + t[:, None] * ab - chunk[owner]).T)
+
+            # Per point minimum: sort by (owner, dist) and take each owner's first row
+            order = np.lexsort((dist, owner))
+            first = order[np.concatenate(([0], np.cumsum(counts)[:-1]))]
+            best_seg[start:start + len(chunk)] = seg[first]
+            best_t[start:start + len(chunk)] = t[first]
+            best_dist[start:start + len(chunk)] = dist[first]
+
+        a, b = self.seg_a[best_seg], self.seg_b[best_seg]
+        snapped = a + best_t[:, None] * (b - a)
+        along = self.seg_offset[best_seg] + best_t * np.hypot(*(b - a).T)
+        fraction = np.where(self.edge_length[best_seg] > 0, along / np.maximum(self.edge_length[best_seg], 1e-12), 0.0)
+        return self.seg_u[best_seg], self.seg_v[best_seg], snapped, fraction, best_dist
+
+    # Snaps one projected point to the nearest point on an edge: (u, v, (x, y), fraction, distance)
+    def snap(self, x: float, y: float):
+        u, v, snapped, fraction, distance = self.snap_points(np.array([x]), np.array([y]))
+        return int(u[0]), int(v[0]), (float(snapped[0, 0]), float(snapped[0, 1])), float(fraction[0]), float(distance[0])
+
+    # G P S   P O I N T S ----------------------------------------------
+
+    # Projects lat/lon degrees into the graph's CRS
+    def project(self, lats: np.ndarray, lons: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        if self._transformer is None:
+            from pyproj import Transformer
+            self._transformer = Transformer.from_crs("EPSG:4326", self.crs, always_xy=True)
+        return self._transformer.transform(np.asarray(lons, dtype=np.float64), np.asarray(lats, dtype=np.float64))
+
+    # Nearest node ids for many GPS points
+    def nearest_nodes_latlon(self, lats: np.ndarray, lons: np.ndarray) -> np.ndarray:
+        return self.nearest_nodes(*self.project(lats, lons))
+
+    # Snaps many GPS points onto edges (same return shape as snap_points, snapped_xy projected)
+    def snap_latlon(self, lats: np.ndarray, lons: np.ndarray):
+        return self.snap_points(*self.project(lats, lons))
+
+
+# Returns the edge endpoint a snapped point should route from (the nearer one along the edge)
+def routing_node(u: int, v: int, fraction: float) -> int:
+    return u if fraction <= 0.5 else v
+
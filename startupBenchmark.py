@@ -0,0 +1,172 @@
+# I M P O R T S   &   D E P E N D E N C I E S ----------------------
+# Only the standard library at module level: the child runs below time the project's own imports
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, List, Optional, Sequence
+
+# C O N S T A N T S ------------------------------------------------
+REPO_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Modules whose import cost is tracked (routing core first, GUI entry points last)
+DEFAULT_MODULES = ("dijkstras", "a_star", "graphRegistry", "graphCache", "main", "app")
+
+# Third-party packages that make startup slow when pulled in eagerly
+HEAVY_PACKAGES = ("numpy", "scipy", "networkx", "pandas", "geopandas", "shapely", "pyproj",
+                  "osmnx", "matplotlib", "tkinter")
+
+
+# I M P O R T   T I M E S ------------------------------------------
+
+# Runs python with the given arguments in a fresh interpreter (from the repo directory by default)
+def _run_python(args: Sequence[str], cwd: Optional[str] = None) -> subprocess.CompletedProcess:
+    env = dict(os.environ)
+    env["PYTHONPATH"] = REPO_DIR + os.pathsep + env.get("PYTHONPATH", "")
+    return subprocess.run([sys.executable, *args], cwd=cwd or REPO_DIR, env=env,
+                          capture_output=True, text=True, check=True)
+
+
+# Parses `python -X importtime` output into (depth, name, self_us, cumulative_us) rows
+def parse_importtime(stderr: str) -> List[tuple]:
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        depth = (len(name) - len(name.lstrip())) // 2
+        rows.append((depth, name.strip(), int(self_us), int(cumulative_us)))
+    return rows
+
+
+# Import cost of one module in a fresh interpreter
+#   total_ms -> cumulative import time of the module
+#   heaviest -> its costliest direct imports
+#   heavy    -> which HEAVY_PACKAGES ended up in sys.modules
+def import_profile(module: str, top: int = 5) -> dict:
+    probe = (f"import {module}, sys, json; "
+             f"print(json.dumps(sorted(p for p in {HEAVY_PACKAGES!r} if p in sys.modules)))")
+    result = _run_python(["-X", "importtime", "-c", probe])
+    rows = parse_importtime(result.stderr)
+
+    # importtime prints children before their parent, so the module's direct imports are the
+    # depth-1 rows between the previous top-level row and the module's own row
+    children = []
+    total_us = 0
+    for depth, name, _, cumulative_us in rows:
+        if depth == 0:
+            if name == module:
+                total_us = cumulative_us
+                break
+            children = []
+        elif depth == 1:
+            children.append((name, cumulative_us))
+
+    children.sort(key=lambda child: -child[1])
+    return {
+        'module': module,
+        'total_ms': total_us / 1000,
+        'heaviest': [{'module': name, 'ms': us / 1000} for name, us in children[:top]],
+        'heavy': json.loads(result.stdout.strip().splitlines()[-1]),
+    }
+
+
+# T I M E   T O   F I R S T   R O U T E ----------------------------
+
+# Child side: imports, loads one city through the registry and routes once, printing phase times
+def _first_route(graph_file: str) -> None:
+    phase_start_time = time.perf_counter()
+    from dijkstras import dijkstra
+    from graphRegistry import GraphRegistry
+    import_seconds = time.perf_counter() - phase_start_time
+
+    phase_start_time = time.perf_counter()
+    name = os.path.splitext(os.path.basename(graph_file))[0]
+    registry = GraphRegistry(directories=(os.path.dirname(os.path.abspath(graph_file)),))
+    compiled = registry.get(name).compiled
+    load_seconds = time.perf_counter() - phase_start_time
+
+    # Fixed, spread-out pair so every run does the same search
+    phase_start_time = time.perf_counter()
+    node_list = compiled.node_list()
+    distances, _, _ = dijkstra(compiled, node_list[0], node_list[len(node_list) // 2])
+    route_seconds = time.perf_counter() - phase_start_time
+
+    print(json.dumps({'import_seconds': import_seconds, 'load_seconds': load_seconds,
+                      'route_seconds': route_seconds}))
+
+
+# Wall-clock time from interpreter launch to the first computed route
+# cold=True runs in an empty directory, so the snapshot cache is rebuilt from the GraphML
+def time_to_first_route(graph_file: str, cold: bool = False) -> dict:
+    graph_file = os.path.abspath(graph_file)
+    with tempfile.TemporaryDirectory() as scratch:
+        launch_time = time.perf_counter()
+        result = _run_python([os.path.join(REPO_DIR, "startupBenchmark.py"), "--child", graph_file],
+                             cwd=scratch if cold else None)
+        wall_seconds = time.perf_counter() - launch_time
+
+    phases = json.loads(result.stdout.strip().splitlines()[-1])
+    phases['interpreter_seconds'] = wall_seconds - sum(phases.values())
+    phases['total_seconds'] = wall_seconds
+    phases['cold'] = cold
+    return phases
+
+
+# Median of each numeric field over repeated runs
+def _median_runs(runs: List[dict]) -> dict:
+    merged = dict(runs[0])
+    for key, value in runs[0].items():
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            merged[key] = statistics.median(run[key] for run in runs)
+    return merged
+
+
+# M A I N ----------------------------------------------------------
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Import-time and time-to-first-route startup benchmark")
+    parser.add_argument("graph_file", nargs="?", help="GraphML file for the time-to-first-route runs")
+    parser.add_argument("--modules", default=",".join(DEFAULT_MODULES), help="Comma-separated modules to profile")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per measurement (median reported)")
+    parser.add_argument("--cold", action="store_true", help="Also time a first route with an empty snapshot cache")
+    parser.add_argument("--json", default=None, help="Write the results to this JSON file")
+    parser.add_argument("--child", default=None, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        _first_route(args.child)
+        return
+
+    results: Dict[str, object] = {'python': sys.version.split()[0], 'imports': [], 'first_route': []}
+
+    print(f"{'module':<16} {'import ms':>10}  heavy packages / costliest imports")
+    for module in [m.strip() for m in args.modules.split(",") if m.strip()]:
+        profile = _median_runs([import_profile(module) for _ in range(args.repeat)])
+        results['imports'].append(profile)
+        heaviest = ", ".join(f"{child['module']} {child['ms']:.0f}" for child in profile['heaviest'][:3])
+        print(f"{module:<16} {profile['total_ms']:>10.1f}  [{', '.join(profile['heavy']) or '-'}] {heaviest}")
+
+    if args.graph_file:
+        for cold in ((False, True) if args.cold else (False,)):
+            # One unmeasured run first so the warm case really has a snapshot to load
+            if not cold:
+                time_to_first_route(args.graph_file)
+            run = _median_runs([time_to_first_route(args.graph_file, cold) for _ in range(args.repeat)])
+            results['first_route'].append(run)
+            print(f"First route ({'cold' if cold else 'warm'} cache): {run['total_seconds']:.2f}s total = "
+                  f"interpreter {run['interpreter_seconds']:.2f}s + imports {run['import_seconds']:.2f}s + "
+                  f"load {run['load_seconds']:.2f}s + route {run['route_seconds']:.3f}s")
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"Results written to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
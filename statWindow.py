@@ -1,13 +1,27 @@
 # I M P O R T S   &   D E P E N D E N C I E S ----------------------
+import json
 import tkinter as tk
-from tkinter import ttk
+from tkinter import filedialog, ttk
+
+# H E L P E R   F U N C T I O N S ----------------------------------
+
+# Nodes visited as shown in the window; None means the route came from another search's cached tree
+def visited_text(nodes_visited):
+    return "cached (shared tree)" if nodes_visited is None else f"{nodes_visited}"
+
 
 # S T A T   W I N D O W   S E T   U P ------------------------------
 class StatWindow:
     def __init__(self, root, elapsed_time_dijkstra, elapsed_time_aStar,
                  num_nodes_visited_dijkstra, num_nodes_visited_aStar,
-                 distance_dijkstra, distance_aStar):
-        
+                 distance_dijkstra, distance_aStar, extra_rows=None, search_stats=None):
+
+        # Additional algorithms: list of (name, color, elapsed_time, nodes_visited, distance[, note])
+        extra_rows = extra_rows or []
+
+        # Search internals: {name: instrumentation.SearchStats} for searches that actually ran
+        self.search_stats = search_stats or {}
+
         self.root = root
         self.root.title("Algorithm Stats")
         self.root.configure(bg='black')
@@ -21,7 +35,9 @@ class StatWindow:
 
         # Window setup
         window_width = 400
-        window_height = 400
+        window_height = 400 + 110 * len(extra_rows)
+        if self.search_stats:
+            window_height += 80 + 50 * len(self.search_stats)
         screen_width = root.winfo_screenwidth()
         screen_height = root.winfo_screenheight()
         center_x = int(screen_width/2 - window_width/2)
@@ -45,7 +61,7 @@ class StatWindow:
                 fg='white', bg='black', font=('Arial', 10)).pack()
 
         tk.Label(self.main_frame,
-                text=f"Nodes Visited: {num_nodes_visited_dijkstra}",
+                text=f"Nodes Visited: {visited_text(num_nodes_visited_dijkstra)}",
                 fg='white', bg='black', font=('Arial', 10)).pack()
 
         tk.Label(self.main_frame,
@@ -64,41 +80,90 @@ class StatWindow:
                 fg='white', bg='black', font=('Arial', 10)).pack()
 
         tk.Label(self.main_frame,
-                text=f"Nodes Visited: {num_nodes_visited_aStar}",
+                text=f"Nodes Visited: {visited_text(num_nodes_visited_aStar)}",
                 fg='white', bg='black', font=('Arial', 10)).pack()
 
         tk.Label(self.main_frame,
                 text=f"Total Distance: {distance_aStar:.2f} meters",
                 fg='white', bg='black', font=('Arial', 10)).pack()
 
-        # Performance Comparison
-        ttk.Separator(self.main_frame, orient='horizontal').pack(fill='x', pady=10)
+        # Labels for any additional algorithms
+        for name, color, elapsed_time, nodes_visited, distance, *note in extra_rows:
+            ttk.Separator(self.main_frame, orient='horizontal').pack(fill='x', pady=10)
+
+            tk.Label(self.main_frame, text=name,
+                    fg=color, bg='black', font=('Arial', 12, 'bold')).pack(pady=5)
+
+            tk.Label(self.main_frame,
+                    text=f"Execution Time: {elapsed_time:.6f} seconds",
+                    fg='white', bg='black', font=('Arial', 10)).pack()
+
+            tk.Label(self.main_frame,
+                    text=f"Nodes Visited: {visited_text(nodes_visited)}",
+                    fg='white', bg='black', font=('Arial', 10)).pack()
 
-        # Calculate performance differences
-        time_diff = (elapsed_time_dijkstra - elapsed_time_aStar) / elapsed_time_dijkstra * 100
-        node_diff = (num_nodes_visited_dijkstra - num_nodes_visited_aStar) / num_nodes_visited_dijkstra * 100
+            tk.Label(self.main_frame,
+                    text=f"Total Distance: {distance:.2f} meters",
+                    fg='white', bg='black', font=('Arial', 10)).pack()
 
-        # Show which algorithm performed better
-        time_better = "A*" if elapsed_time_aStar < elapsed_time_dijkstra else "Dijkstra's"
-        nodes_better = "A*" if num_nodes_visited_aStar < num_nodes_visited_dijkstra else "Dijkstra's"
+            if note:
+                tk.Label(self.main_frame, text=note[0],
+                        fg='white', bg='black', font=('Arial', 10, 'italic')).pack()
+
+        # Performance Comparison
+        ttk.Separator(self.main_frame, orient='horizontal').pack(fill='x', pady=10)
 
         tk.Label(self.main_frame, text="Performance Analysis",
                 fg='white', bg='black', font=('Arial', 12, 'bold')).pack(pady=5)
 
-        tk.Label(self.main_frame,
-                text=f"{time_better} was {abs(time_diff):.1f}% faster",
+        # Calculate performance differences (only meaningful when both searches actually ran)
+        if elapsed_time_dijkstra > 0:
+            time_diff = (elapsed_time_dijkstra - elapsed_time_aStar) / elapsed_time_dijkstra * 100
+            time_better = "A*" if elapsed_time_aStar < elapsed_time_dijkstra else "Dijkstra's"
+            time_text = f"{time_better} was {abs(time_diff):.1f}% faster"
+        else:
+            time_text = "Execution times too small to compare"
+
+        if num_nodes_visited_dijkstra and num_nodes_visited_aStar is not None:
+            node_diff = (num_nodes_visited_dijkstra - num_nodes_visited_aStar) / num_nodes_visited_dijkstra * 100
+            nodes_better = "A*" if num_nodes_visited_aStar < num_nodes_visited_dijkstra else "Dijkstra's"
+            nodes_text = f"{nodes_better} visited {abs(node_diff):.1f}% fewer nodes"
+        else:
+            nodes_text = "Node counts not comparable (cached route)"
+
+        tk.Label(self.main_frame, text=time_text,
                 fg='white', bg='black', font=('Arial', 10)).pack()
 
-        tk.Label(self.main_frame,
-                text=f"{nodes_better} visited {abs(node_diff):.1f}% fewer nodes",
+        tk.Label(self.main_frame, text=nodes_text,
                 fg='white', bg='black', font=('Arial', 10)).pack()
 
+        # Search internals (heap and edge counters, phase timings) with JSON export
+        if self.search_stats:
+            ttk.Separator(self.main_frame, orient='horizontal').pack(fill='x', pady=10)
+
+            tk.Label(self.main_frame, text="Search Internals",
+                    fg='white', bg='black', font=('Arial', 12, 'bold')).pack(pady=5)
+
+            for name, stats in self.search_stats.items():
+                tk.Label(self.main_frame, text=f"{name}: {stats.summary()}",
+                        fg='white', bg='black', font=('Arial', 9), wraplength=360).pack()
+
+            tk.Button(self.main_frame, text="Export JSON", command=self.export_stats).pack(pady=5)
+
+    # Saves the search internals to a JSON file chosen by the user
+    def export_stats(self):
+        path = filedialog.asksaveasfilename(parent=self.root, defaultextension=".json",
+                                            filetypes=[("JSON", "*.json")])
+        if path:
+            with open(path, 'w') as f:
+                json.dump({name: stats.as_dict() for name, stats in self.search_stats.items()}, f, indent=2)
+
 # Creates stat window
 def create_stat_window(elapsed_time_dijkstra, elapsed_time_aStar,
                       num_nodes_visited_dijkstra, num_nodes_visited_aStar,
-                      distance_dijkstra, distance_aStar):
+                      distance_dijkstra, distance_aStar, extra_rows=None, search_stats=None):
     root = tk.Tk()
     StatWindow(root, elapsed_time_dijkstra, elapsed_time_aStar,
                   num_nodes_visited_dijkstra, num_nodes_visited_aStar,
-                  distance_dijkstra, distance_aStar)
+                  distance_dijkstra, distance_aStar, extra_rows=extra_rows, search_stats=search_stats)
     return root
@@ -0,0 +1,443 @@
+# I M P O R T S   &   D E P E N D E N C I E S ----------------------
+import argparse
+import heapq
+import os
+import random
+import time
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+from scipy.sparse import csr_matrix
+from scipy.sparse.csgraph import dijkstra as csgraph_dijkstra
+
+from compiledGraph import CompiledGraph
+from dijkstras import dijkstra, dijkstra_one_to_many, reconstruct_path
+from graphCache import load_compiled, snapshot_key
+from graphRegistry import BACKBONE_SUFFIX, GRAPH_DIRS, GraphRegistry, LoadedCity
+
+# C O N S T A N T S ------------------------------------------------
+OVERLAY_DIR = os.path.join("cache", "statewide")
+
+# Bump when the overlay layout changes so old overlays are rebuilt
+OVERLAY_VERSION = 1
+
+# Overlay vertices searched per scipy call when building a cell clique
+_CLIQUE_CHUNK = 32
+
+
+# C E L L S --------------------------------------------------------
+
+# Cells only need their search arrays, so they load without parsing the GraphML into networkx
+def _load_cell(path: str) -> LoadedCity:
+    return LoadedCity(None, None, load_compiled(path))
+
+
+# Registry of statewide cells (every city graph plus any backbone) under a memory budget
+def cell_registry(directories=GRAPH_DIRS, budget_mb: Optional[float] = None) -> GraphRegistry:
+    return GraphRegistry(directories, budget_mb=budget_mb, loader=_load_cell)
+
+
+# OSM ids of the tail and head of every edge in a cell
+def _edge_endpoints(compiled: CompiledGraph) -> Tuple[np.ndarray, np.ndarray]:
+    node_ids = np.asarray(compiled.node_ids)
+    return node_ids[compiled.edge_sources()], node_ids[np.asarray(compiled.targets)]
+
+
+# S T A T E W I D E   O V E R L A Y --------------------------------
+
+# Boundary-to-boundary distances between partition cells
+#   vertices[i]                              -> OSM id of overlay vertex i (a boundary node)
+#   targets/weights[offsets[i]:offsets[i+1]] -> shortest in-cell distance to other overlay vertices
+#   edge_cell[e]                             -> cell whose graph realises overlay edge e
+#   cell_vertices[cell_offsets[c]:...]       -> overlay vertices inside cell c
+#   lookup_ids / lookup_cells                -> every cell node (sorted) and the cell holding it
+# A node is a boundary node of a city cell if an edge of another cell joins it to a node outside
+# the city. Edges between two nodes of one cell are assumed to be present in that cell's graph
+# (true for osmnx extracts of the same OSM data), so every route leaves and enters cities
+# through boundary nodes and the overlay plus the two end cells give exact distances.
+class StatewideOverlay:
+    def __init__(self, cells: Sequence[str], keys: Sequence[str], connectors: np.ndarray,
+                 vertices: np.ndarray, offsets: np.ndarray, targets: np.ndarray, weights: np.ndarray,
+                 edge_cell: np.ndarray, cell_offsets: np.ndarray, cell_vertices: np.ndarray,
+                 lookup_ids: np.ndarray, lookup_cells: np.ndarray):
+        self.cells = list(cells)
+        self.keys = list(keys)
+        self.connectors = connectors
+        self.vertices = vertices
+        self.offsets = offsets
+        self.targets = targets
+        self.weights = weights
+        self.edge_cell = edge_cell
+        self.cell_offsets = cell_offsets
+        self.cell_vertices = cell_vertices
+        self.lookup_ids = lookup_ids
+        self.lookup_cells = lookup_cells
+
+        # OSM id -> overlay vertex index, and list mirrors for the search loop
+        self.index: Dict[int, int] = {node: i for i, node in enumerate(vertices.tolist())}
+        self._adjacency = (offsets.tolist(), targets.tolist(), weights.tolist(), edge_cell.tolist())
+
+    @property
+    def num_vertices(self) -> int:
+        return len(self.vertices)
+
+    @property
+    def num_edges(self) -> int:
+        return len(self.targets)
+
+    # Overlay vertex ids (OSM) inside one cell
+    def vertices_in(self, cell: int) -> List[int]:
+        local = self.cell_vertices[self.cell_offsets[cell]:self.cell_offsets[cell + 1]]
+        return self.vertices[local].tolist()
+
+    # Cells containing an OSM node, city cells before connectors
+    def cells_of(self, node: int) -> List[int]:
+        lo = np.searchsorted(self.lookup_ids, node, side='left')
+        hi = np.searchsorted(self.lookup_ids, node, side='right')
+        return self.lookup_cells[lo:hi].tolist()
+
+    # True if the overlay was built from exactly these cells in their current state
+    def matches(self, registry: GraphRegistry) -> bool:
+        if sorted(self.cells) != registry.names():
+            return False
+        return all(snapshot_key(registry.path(name)) == key for name, key in zip(self.cells, self.keys))
+
+    def save(self, path: str) -> None:
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp = path + ".part.npz"
+        np.savez_compressed(tmp, version=OVERLAY_VERSION, cells=np.array(self.cells), keys=np.array(self.keys),
+                            connectors=self.connectors, vertices=self.vertices, offsets=self.offsets,
+                            targets=self.targets, weights=self.weights, edge_cell=self.edge_cell,
+                            cell_offsets=self.cell_offsets, cell_vertices=self.cell_vertices,
+                            lookup_ids=self.lookup_ids, lookup_cells=self.lookup_cells)
+        os.replace(tmp, path)
+
+    # Loads an overlay written by save(); returns None if it is from another version
+    @classmethod
+    def load(cls, path: str) -> Optional['StatewideOverlay']:
+        with np.load(path) as data:
+            if int(data['version']) != OVERLAY_VERSION:
+                return None
+            fields = {name: data[name] for name in data.files if name != 'version'}
+        fields['cells'] = fields['cells'].tolist()
+        fields['keys'] = fields['keys'].tolist()
+        return cls(**fields)
+
+
+# B U I L D --------------------------------------------------------
+
+# Boundary nodes of every city cell, found by scanning each cell's edges once
+# (one cell is resident at a time, so the build stays inside the registry budget)
+def _boundary_nodes(registry: GraphRegistry, names: List[str], node_sets: Dict[str, np.ndarray],
+                    connectors: set) -> Dict[str, np.ndarray]:
+    found: Dict[str, List[np.ndarray]] = {name: [] for name in names}
+
+    for other in names:
+        tails, heads = _edge_endpoints(registry.get(other).compiled)
+        for name in names:
+            if name == other or name in connectors:
+                continue
+
+            # Cells without a common node cannot have edges touching each other
+            if not len(np.intersect1d(node_sets[name], node_sets[other], assume_unique=True)):
+                continue
+            in_tail = np.isin(tails, node_sets[name])
+            in_head = np.isin(heads, node_sets[name])
+
+            # Edges of the other cell that leave or enter this city
+            found[name].append(tails[in_tail & ~in_head])
+            found[name].append(heads[in_head & ~in_tail])
+
+    return {name: np.unique(np.concatenate(parts)) if parts else np.empty(0, dtype=np.int64)
+            for name, parts in found.items()}
+
+
+# All-pairs shortest distances between the overlay vertices of one cell, as (tails, heads, weights)
+def _cell_clique(compiled: CompiledGraph, local: np.ndarray, chunk: int = _CLIQUE_CHUNK):
+    # Explicit zeros in a sparse matrix are kept as zero-weight edges by csgraph
+    n = compiled.num_nodes
+    matrix = csr_matrix((np.asarray(compiled.weights), np.asarray(compiled.targets), np.asarray(compiled.offsets)),
+                        shape=(n, n))
+
+    tails, heads, weights = [], [], []
+    for start in range(0, len(local), chunk):
+        rows = np.arange(start, min(start + chunk, len(local)))
+        dist = csgraph_dijkstra(matrix, directed=True, indices=local[rows])[:, local]
+        r, c = np.nonzero(np.isfinite(dist))
+        off_diagonal = rows[r] != c
+        tails.append(rows[r][off_diagonal])
+        heads.append(c[off_diagonal])
+        weights.append(dist[r, c][off_diagonal])
+
+    if not tails:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64), np.empty(0)
+    return np.concatenate(tails), np.concatenate(heads), np.concatenate(weights)
+
+
+# Builds the overlay for every cell in the registry
+# connectors defaults to the backbone cells from downloadMap.py (named *_backbone); they join
+# cities but have no boundary of their own
+def build_overlay(registry: GraphRegistry, connectors: Optional[Sequence[str]] = None,
+                  verbose: bool = False) -> StatewideOverlay:
+    names = registry.names()
+    if connectors is None:
+        connectors = [name for name in names if name.endswith(BACKBONE_SUFFIX)]
+    connectors = set(connectors)
+    keys = [snapshot_key(registry.path(name)) for name in names]
+
+    # Pass 1: node sets (ids only, small enough to keep for every cell)
+    node_sets = {name: np.unique(np.asarray(registry.get(name).compiled.node_ids)) for name in names}
+
+    # Pass 2: boundary nodes become the overlay vertices
+    boundary = _boundary_nodes(registry, names, node_sets, connectors)
+    vertices = np.unique(np.concatenate([boundary[name] for name in names] + [np.empty(0, dtype=np.int64)]))
+    if verbose:
+        for name in names:
+            role = "connector" if name in connectors else f"{len(boundary[name])} boundary nodes"
+            print(f"  {name:<35} {len(node_sets[name]):>9} nodes  {role}")
+
+    # Pass 3: one clique of boundary-to-boundary distances per cell
+    tails, heads, weights, edge_cell = [], [], [], []
+    cell_vertices, cell_offsets = [], [0]
+    for cell, name in enumerate(names):
+        compiled = registry.get(name).compiled
+        inside = np.flatnonzero(np.isin(vertices, node_sets[name]))
+        cell_vertices.append(inside)
+        cell_offsets.append(cell_offsets[-1] + len(inside))
+        if len(inside) < 2:
+            continue
+
+        clique_start = time.perf_counter()
+        local = np.array([compiled.index[node] for node in vertices[inside].tolist()], dtype=np.int64)
+        rows, cols, dist = _cell_clique(compiled, local)
+        tails.append(inside[rows])
+        heads.append(inside[cols])
+        weights.append(dist)
+        edge_cell.append(np.full(len(dist), cell, dtype=np.int32))
+        if verbose:
+            print(f"  {name:<35} clique of {len(inside)} vertices in {time.perf_counter() - clique_start:.2f}s")
+
+    empty = [np.empty(0, dtype=np.int64)]
+    tails = np.concatenate(tails + empty)
+    heads = np.concatenate(heads + empty)
+    weights = np.concatenate(weights + [np.empty(0)])
+    edge_cell = np.concatenate(edge_cell + [np.empty(0, dtype=np.int32)])
+
+    # Keep the cheapest cell for vertex pairs shared by several cells, then lay out as CSR
+    order = np.lexsort((weights, heads, tails))
+    tails, heads, weights, edge_cell = tails[order], heads[order], weights[order], edge_cell[order]
+    if len(tails):
+        keep = np.ones(len(tails), dtype=bool)
+        keep[1:] = (tails[1:] != tails[:-1]) | (heads[1:] != heads[:-1])
+        tails, heads, weights, edge_cell = tails[keep], heads[keep], weights[keep], edge_cell[keep]
+    offsets = np.zeros(len(vertices) + 1, dtype=np.int64)
+    np.cumsum(np.bincount(tails, minlength=len(vertices)), out=offsets[1:])
+
+    # Node -> cell lookup; connectors sort after cities so a city cell is preferred
+    lookup_ids = np.concatenate([node_sets[name] for name in names] + empty)
+    lookup_cells = np.concatenate([np.full(len(node_sets[name]), cell, dtype=np.int32)
+                                   for cell, name in enumerate(names)] + [np.empty(0, dtype=np.int32)])
+    is_connector = np.array([name in connectors for name in names], dtype=bool)
+    order = np.lexsort((lookup_cells, is_connector[lookup_cells], lookup_ids))
+
+    return StatewideOverlay(names, keys, is_connector, vertices, offsets, heads, weights, edge_cell,
+                            np.asarray(cell_offsets, dtype=np.int64), np.concatenate(cell_vertices + empty),
+                            lookup_ids[order], lookup_cells[order])
+
+
+def overlay_path(cache_dir: str = OVERLAY_DIR) -> str:
+    return os.path.join(cache_dir, "overlay.npz")
+
+
+# Loads the saved overlay if it still matches the registry's cells, otherwise builds and saves it
+def load_or_build_overlay(registry: GraphRegistry, path: Optional[str] = None,
+                          verbose: bool = False) -> StatewideOverlay:
+    path = path or overlay_path()
+    if os.path.exists(path):
+        overlay = StatewideOverlay.load(path)
+        if overlay is not None and overlay.matches(registry):
+            return overlay
+    overlay = build_overlay(registry, verbose=verbose)
+    overlay.save(path)
+    return overlay
+
+
+# Q U E R I E S ----------------------------------------------------
+
+# Result of a statewide query; path is OSM ids (empty and distance inf if unreachable)
+class StatewideRoute(NamedTuple):
+    distance: float
+    path: List[int]
+    cells: List[str]
+    stats: Dict[str, float]
+
+
+# Long-haul routing over the partition: a query expands only the source cell, the overlay and
+# the target cell; cells crossed in between are loaded only to unpack the final path
+class StatewideRouter:
+    def __init__(self, overlay: StatewideOverlay, registry: GraphRegistry):
+        self.overlay = overlay
+        self.registry = registry
+
+    def _compiled(self, cell: int) -> CompiledGraph:
+        return self.registry.get(self.overlay.cells[cell]).compiled
+
+    def _cell_of(self, node: int) -> int:
+        cells = self.overlay.cells_of(node)
+        if not cells:
+            raise ValueError(f"Node {node} is not in any cell")
+        return cells[0]
+
+    def route(self, start_node: int, end_node: int) -> StatewideRoute:
+        overlay = self.overlay
+        inf = float('inf')
+        query_start_time = time.perf_counter()
+
+        source_cell, target_cell = self._cell_of(start_node), self._cell_of(end_node)
+        same_cell = source_cell == target_cell
+
+        # Source cell: distances from the start to each of its boundary nodes (and the end if local)
+        exits = overlay.vertices_in(source_cell)
+        forward, forward_prev, forward_visited = dijkstra_one_to_many(
+            self._compiled(source_cell), start_node, exits + ([end_node] if same_cell else []))
+
+        # Target cell: distances from each of its boundary nodes to the end, searched backwards
+        entries = overlay.vertices_in(target_cell)
+        backward, backward_next, backward_visited = dijkstra_one_to_many(
+            self._compiled(target_cell), end_node, entries, reverse=True)
+
+        # Overlay: multi-source Dijkstra seeded with the source distances
+        best = forward[end_node] if same_cell else inf
+        meet = -1
+        index = overlay.index
+        remaining = {index[node]: backward[node] for node in entries if node in backward}
+        dist: Dict[int, float] = {}
+        prev: Dict[int, Tuple[int, int]] = {}
+        pq = []
+        for node in exits:
+            if node in forward:
+                vertex = index[node]
+                dist[vertex], prev[vertex] = forward[node], (-1, source_cell)
+                pq.append((forward[node], vertex))
+        heapq.heapify(pq)
+
+        offsets, targets, weights, edge_cell = overlay._adjacency
+        settled = set()
+        while pq:
+            current_distance, vertex = heapq.heappop(pq)
+            if current_distance >= best:
+                break
+            if vertex in settled:
+                continue
+            settled.add(vertex)
+
+            if vertex in remaining and current_distance + remaining[vertex] < best:
+                best, meet = current_distance + remaining[vertex], vertex
+
+            for edge in range(offsets[vertex], offsets[vertex + 1]):
+                neighbor = targets[edge]
+                distance = current_distance + weights[edge]
+                if neighbor not in settled and distance < dist.get(neighbor, inf):
+                    dist[neighbor], prev[neighbor] = distance, (vertex, edge_cell[edge])
+                    heapq.heappush(pq, (distance, neighbor))
+
+        search_seconds = time.perf_counter() - query_start_time
+        stats = {
+            'source_settled': len(forward_visited),
+            'target_settled': len(backward_visited),
+            'overlay_settled': len(settled),
+            'search_seconds': search_seconds,
+        }
+
+        if best == inf:
+            stats['unpack_seconds'] = 0.0
+            return StatewideRoute(inf, [], [], stats)
+
+        # Unpack: source tree, then one in-cell search per overlay hop, then the target tree
+        unpack_start_time = time.perf_counter()
+        if meet < 0:
+            path = reconstruct_path(forward_prev, start_node, end_node)
+            cells = [source_cell]
+        else:
+            hops = []
+            vertex = meet
+            while prev[vertex][0] >= 0:
+                hops.append((prev[vertex][0], vertex, prev[vertex][1]))
+                vertex = prev[vertex][0]
+            hops.reverse()
+
+            vertices = overlay.vertices.tolist()
+            path = reconstruct_path(forward_prev, start_node, vertices[vertex])
+            cells = [source_cell]
+            for tail, head, cell in hops:
+                _, hop_prev, _ = dijkstra(self._compiled(cell), vertices[tail], vertices[head])
+                path.extend(reconstruct_path(hop_prev, vertices[tail], vertices[head])[1:])
+                cells.append(cell)
+
+            node = vertices[meet]
+            while node != end_node:
+                node = backward_next[node]
+                path.append(node)
+            cells.append(target_cell)
+
+        stats['unpack_seconds'] = time.perf_counter() - unpack_start_time
+        names = []
+        for cell in cells:
+            if not names or names[-1] != overlay.cells[cell]:
+                names.append(overlay.cells[cell])
+        return StatewideRoute(best, path, names, stats)
+
+
+# M A I N ----------------------------------------------------------
+
+# Builds (or loads) the overlay and runs statewide queries with per-query expansion stats
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Partitioned statewide routing across city graphs")
+    parser.add_argument("--graph-dir", action="append", default=None,
+                        help="Folder of cell GraphML files (repeatable, default graphml_files and data)")
+    parser.add_argument("--budget-mb", type=float, default=None, help="Memory budget for resident cells")
+    parser.add_argument("--rebuild", action="store_true", help="Rebuild the overlay even if it is current")
+    parser.add_argument("--route", nargs=2, type=int, metavar=("START", "END"), help="Route between two OSM ids")
+    parser.add_argument("--queries", type=int, default=0, help="Random queries between different cells")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    registry = cell_registry(tuple(args.graph_dir) if args.graph_dir else GRAPH_DIRS, args.budget_mb)
+    print(f"{len(registry.names())} cells: {', '.join(registry.names())}")
+
+    build_start_time = time.perf_counter()
+    if args.rebuild:
+        overlay = build_overlay(registry, verbose=True)
+        overlay.save(overlay_path())
+    else:
+        overlay = load_or_build_overlay(registry, verbose=True)
+    print(f"Overlay: {overlay.num_vertices} boundary vertices, {overlay.num_edges} edges "
+          f"({time.perf_counter() - build_start_time:.2f}s)")
+
+    router = StatewideRouter(overlay, registry)
+    pairs: List[Tuple[int, int]] = []
+    if args.route:
+        pairs.append(tuple(args.route))
+
+    # Random long-haul pairs: start and end drawn from different city cells
+    rng = random.Random(args.seed)
+    cities = [cell for cell in range(len(overlay.cells)) if not overlay.connectors[cell]]
+    for _ in range(args.queries if len(cities) > 1 else 0):
+        a, b = rng.sample(cities, 2)
+        pairs.append((rng.choice(router._compiled(a).node_list()), rng.choice(router._compiled(b).node_list())))
+
+    for start, end in pairs:
+        result = router.route(start, end)
+        stats = result.stats
+        print(f"{start} -> {end}: {result.distance:.1f} m over {len(result.path)} nodes via {' > '.join(result.cells)}")
+        print(f"    settled source {stats['source_settled']}, overlay {stats['overlay_settled']}, "
+              f"target {stats['target_settled']}; search {stats['search_seconds'] * 1000:.1f} ms, "
+              f"unpack {stats['unpack_seconds'] * 1000:.1f} ms")
+
+    resident = registry.resident_bytes / 1024 / 1024
+    print(f"Resident cells: {resident:.0f} MB of {registry.budget_bytes / 1024 / 1024:.0f} MB budget, "
+          f"{registry.evictions} evictions")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+# I M P O R T S   &   D E P E N D E N C I E S ----------------------
+import glob
+import math
+import os
+import random
+import sys
+
+import networkx as nx
+import pytest
+
+# The modules live at the repository root, next to this folder
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+from compiledGraph import CompiledGraph, compile_graph  # noqa: E402
+
+# C O N S T A N T S ------------------------------------------------
+EARTH_RADIUS = 6371000  # Earth's radius in meters
+
+# Bundled street graphs (empty placeholders are skipped)
+BUNDLED_GRAPHS = sorted(path for directory in ("graphml_files", "data")
+                        for path in glob.glob(os.path.join(REPO_ROOT, directory, "*.graphml"))
+                        if os.path.getsize(path) > 0)
+
+
+# H E L P E R   F U N C T I O N S ----------------------------------
+
+# Great-circle distance in metres between two (lat, lon) points, independent of heuristics.py
+def great_circle(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    lat1, lon1, lat2, lon2 = map(math.radians, (lat1, lon1, lat2, lon2))
+    a = math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS * math.asin(math.sqrt(min(1.0, a)))
+
+
+# Cost of an OSM-id path over the graph's cheapest edges
+def path_cost(compiled: CompiledGraph, path) -> float:
+    offsets, targets, weights = compiled.adjacency()
+    cost = 0.0
+    for u, v in zip(path, path[1:]):
+        u, v = compiled.index[u], compiled.index[v]
+        cost += min(weights[edge] for edge in range(offsets[u], offsets[u + 1]) if targets[edge] == v)
+    return cost
+
+
+# Random street-like graph: jittered grid around Gainesville, two-way streets plus some one-way
+# diagonals and parallel edges, lengths at least the straight-line distance (detour factor 1-1.5)
+# round_weights=True rounds lengths up to whole metres (integer keys for the radix heap); a larger
+# drop (share of grid streets left out) gives longer degree-2 chains and several components
+def synthetic_graph(seed: int, rows: int = 12, cols: int = 12, round_weights: bool = False,
+                    drop: float = 0.1) -> CompiledGraph:
+    rng = random.Random(seed)
+    graph = nx.MultiDiGraph()
+    for r in range(rows):
+        for c in range(cols):
+            graph.add_node(1000 + r * cols + c, y=29.60 + r * 0.002 + rng.uniform(-0.0005, 0.0005),
+                           x=-82.40 + c * 0.002 + rng.uniform(-0.0005, 0.0005))
+
+    # Length of an edge as a detour over the straight line
+    def length(u: int, v: int) -> float:
+        straight = great_circle(graph.nodes[u]['y'], graph.nodes[u]['x'], graph.nodes[v]['y'], graph.nodes[v]['x'])
+        detour = straight * rng.uniform(1.0, 1.5)
+        return float(math.ceil(detour)) if round_weights else detour
+
+    for r in range(rows):
+        for c in range(cols):
+            node = 1000 + r * cols + c
+            for dr, dc in ((0, 1), (1, 0)):
+                if r + dr < rows and c + dc < cols and rng.random() >= drop:
+                    other = 1000 + (r + dr) * cols + c + dc
+                    graph.add_edge(node, other, length=length(node, other))
+                    graph.add_edge(other, node, length=length(other, node))
+            if r + 1 < rows and c + 1 < cols and rng.random() < 0.2:
+                other = 1000 + (r + 1) * cols + c + 1
+                graph.add_edge(node, other, length=length(node, other))
+                graph.add_edge(node, other, length=length(node, other))
+    return compile_graph(graph)
+
+
+# F I X T U R E S --------------------------------------------------
+
+@pytest.fixture(params=range(3), ids=lambda seed: f"seed{seed}")
+def random_graph(request) -> CompiledGraph:
+    return synthetic_graph(request.param)
+
+
+@pytest.fixture(params=BUNDLED_GRAPHS or [None], ids=lambda path: os.path.basename(path) if path else "none")
+def bundled_graph(request) -> CompiledGraph:
+    if request.param is None:
+        pytest.skip("no bundled street graph (data/ only holds an empty placeholder)")
+    from graphCache import load_compiled
+    return load_compiled(request.param)
@@ -0,0 +1,47 @@
+# I M P O R T S   &   D E P E N D E N C I E S ----------------------
+import random
+
+import pytest
+
+import alternatives
+from alternatives import alternative_routes
+from conftest import synthetic_graph
+from dijkstras import dijkstra
+
+# C O N S T A N T S ------------------------------------------------
+
+# Random origin-destination pairs per graph
+PAIRS = 20
+
+
+# A L T E R N A T I V E   R O U T E S ------------------------------
+
+# The first route is the shortest; every route is a simple path within the stretch and overlap limits
+@pytest.mark.parametrize("seed", range(3))
+def test_routes_respect_limits(seed):
+    compiled = synthetic_graph(seed)
+    nodes = compiled.node_list()
+    rng = random.Random(seed)
+
+    for _ in range(PAIRS):
+        start, end = rng.choice(nodes), rng.choice(nodes)
+        result = alternative_routes(compiled, start, end, k=3, max_ms=1000.0)
+        shortest = dijkstra(compiled, start, end)[0].get(end, float('inf'))
+        if shortest == float('inf'):
+            assert result.routes == []
+            continue
+
+        assert result.routes[0].distance == pytest.approx(shortest)
+        for route in result.routes:
+            assert route.path[0] == start and route.path[-1] == end
+            assert len(set(route.path)) == len(route.path)
+            assert route.stretch <= alternatives.MAX_STRETCH + 1e-9
+            assert route.overlap <= alternatives.MAX_OVERLAP + 1e-9
+
+
+# M A I N ----------------------------------------------------------
+
+def test_main_without_routable_queries(monkeypatch, capsys):
+    monkeypatch.setattr('graphCache.load_compiled', lambda path: synthetic_graph(0))
+    assert alternatives.main(["city.graphml", "--queries", "0"]) == 0
+    assert "No routable queries" in capsys.readouterr().out
@@ -0,0 +1,44 @@
+# I M P O R T S   &   D E P E N D E N C I E S ----------------------
+import io
+
+import pytest
+
+from batchRoute import read_pairs
+
+
+# Rows read_pairs yields for a CSV text
+def rows(text: str, **kwargs):
+    return list(read_pairs(io.StringIO(text), **kwargs))
+
+
+# R E A D   P A I R S ----------------------------------------------
+
+def test_reads_node_and_latlon_rows():
+    assert rows("1,2\n29.6,-82.3,29.7,-82.4\n") == [['1', '2'], ['29.6', '-82.3', '29.7', '-82.4']]
+
+
+def test_skips_header_and_blank_lines():
+    text = "\n start_node , end_node \n\n1, 2\n,,\n3,4\n"
+    assert rows(text) == [['1', '2'], ['3', '4']]
+
+
+def test_header_only_on_first_row():
+    with pytest.raises(ValueError, match="line 3: expected 2 or 4 fields, got 1"):
+        rows("start,end\n1,2\nstart\n")
+
+
+@pytest.mark.parametrize("text, message", [
+    ("1,2\n1,2,3\n", "line 2: expected 2 or 4 fields, got 3"),
+    ("1,2,\n", "line 1: expected 2 or 4 fields, got 3"),
+    ("29.6,,-82.3,29.7\n", "line 1: field 2 is empty"),
+    ("start,end\n\n1, \n", "line 3: field 2 is empty"),
+])
+def test_rejects_malformed_rows_with_line_number(text, message):
+    with pytest.raises(ValueError, match=message):
+        rows(text)
+
+
+def test_custom_widths():
+    assert rows("node\n42\n29.6,-82.3\n", widths=(1, 2)) == [['42'], ['29.6', '-82.3']]
+    with pytest.raises(ValueError, match="line 2: expected 1 or 2 fields, got 4"):
+        rows("42\n1,2,3,4\n", widths=(1, 2))
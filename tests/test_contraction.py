@@ -0,0 +1,56 @@
+# I M P O R T S   &   D E P E N D E N C I E S ----------------------
+import random
+
+import pytest
+
+from conftest import path_cost, synthetic_graph
+from contraction import ContractionHierarchy, contract_graph
+from dijkstras import dijkstra
+
+# C O N S T A N T S ------------------------------------------------
+
+# Random origin-destination pairs per graph
+PAIRS = 100
+
+
+# C O N T R A C T I O N   H I E R A R C H I E S --------------------
+
+# CH distances and unpacked paths must match Dijkstra on the original graph
+@pytest.mark.parametrize("round_weights", [False, True], ids=["float", "integer"])
+@pytest.mark.parametrize("seed", range(4))
+def test_queries_match_dijkstra(seed, round_weights):
+    compiled = synthetic_graph(seed, round_weights=round_weights)
+    ch = contract_graph(compiled)
+    nodes = compiled.node_list()
+    rng = random.Random(seed)
+
+    for _ in range(PAIRS):
+        start, end = rng.choice(nodes), rng.choice(nodes)
+        expected = dijkstra(compiled, start, end)[0].get(end, float('inf'))
+        distance, path, _ = ch.query(start, end)
+
+        assert distance == pytest.approx(expected, abs=1e-6)
+        if expected == float('inf'):
+            assert path == []
+        else:
+            assert path[0] == start and path[-1] == end
+            assert path_cost(compiled, path) == pytest.approx(expected, abs=1e-6)
+
+
+def test_saved_artifact_round_trips(tmp_path):
+    compiled = synthetic_graph(0)
+    ch = contract_graph(compiled, source_hash="abc")
+    path = str(tmp_path / "city.ch.npz")
+    ch.save(path)
+
+    assert ContractionHierarchy.load(path, source_hash="other") is None
+    loaded = ContractionHierarchy.load(path, source_hash="abc")
+    nodes = compiled.node_list()
+    for start, end in zip(nodes[:20], nodes[-20:]):
+        assert loaded.query(start, end)[0] == ch.query(start, end)[0]
+
+
+def test_unknown_node_is_rejected():
+    ch = contract_graph(synthetic_graph(0))
+    with pytest.raises(ValueError):
+        ch.query(-1, int(synthetic_graph(0).node_ids[0]))
@@ -0,0 +1,97 @@
+# I M P O R T S   &   D E P E N D E N C I E S ----------------------
+import json
+
+import pytest
+
+pytest.importorskip("osmnx")
+
+from downloadMap import find_sources, graph_from_source, is_drivable, read_elements, write_osm_xml  # noqa: E402
+
+# C O N S T A N T S ------------------------------------------------
+CITY = "Testville, Florida, USA"
+
+
+# H E L P E R   F U N C T I O N S ----------------------------------
+
+# Overpass-style response: a drivable street through nodes 1-2-3 plus a footway 3-4, optionally
+# with a second street 3-5 (the part of the city a second Overpass query would return)
+def response(second_street: bool = False) -> dict:
+    coordinates = {1: (29.650, -82.330), 2: (29.651, -82.330), 3: (29.652, -82.330), 4: (29.652, -82.331),
+                   5: (29.653, -82.330)}
+    elements = [{'type': 'node', 'id': node, 'lat': lat, 'lon': lon} for node, (lat, lon) in coordinates.items()]
+    elements.append({'type': 'way', 'id': 10, 'nodes': [1, 2, 3], 'tags': {'highway': 'residential'}})
+    elements.append({'type': 'way', 'id': 11, 'nodes': [3, 4], 'tags': {'highway': 'footway'}})
+    if second_street:
+        elements.append({'type': 'way', 'id': 12, 'nodes': [3, 5], 'tags': {'highway': 'primary'}})
+    return {'version': 0.6, 'elements': elements}
+
+
+def write_json(path, data) -> str:
+    path.write_text(json.dumps(data))
+    return str(path)
+
+
+# D R I V E   F I L T E R ------------------------------------------
+
+@pytest.mark.parametrize("tags, drivable", [
+    ({'highway': 'residential'}, True),
+    ({'highway': 'motorway_link'}, True),
+    ({'highway': 'footway'}, False),
+    ({'highway': 'service'}, False),
+    ({'highway': 'residential', 'access': 'private'}, False),
+    ({'highway': 'tertiary', 'motor_vehicle': 'no'}, False),
+    ({'highway': 'residential', 'area': 'yes'}, False),
+    ({'building': 'yes'}, False),
+])
+def test_is_drivable(tags, drivable):
+    assert is_drivable(tags) == drivable
+
+
+# O F F L I N E   S O U R C E S ------------------------------------
+
+def test_json_source_keeps_only_drivable_ways(tmp_path):
+    graph = graph_from_source(write_json(tmp_path / "city.json", response()))
+    assert set(graph.nodes) == {1, 3}
+    assert all(data['highway'] == 'residential' for _, _, data in graph.edges(data=True))
+
+
+def test_several_responses_are_merged(tmp_path):
+    nominatim = write_json(tmp_path / "a.json", [{'osm_type': 'relation', 'display_name': CITY}])
+    first = write_json(tmp_path / "b.json", response())
+    second = write_json(tmp_path / "c.json", response(second_street=True))
+    graph = graph_from_source([nominatim, first, second])
+
+    # Node 3 only joins the two streets end to end, so simplification folds it into one edge
+    assert set(graph.nodes) == {1, 5}
+
+
+def test_xml_source_matches_json(tmp_path):
+    elements = read_elements(write_json(tmp_path / "city.json", response(second_street=True)))
+    nodes = {e['id']: e for e in elements if e['type'] == 'node'}
+    ways = {e['id']: e for e in elements if e['type'] == 'way'}
+    write_osm_xml(str(tmp_path / "city.osm"), nodes, ways)
+
+    assert read_elements(str(tmp_path / "city.osm")) == [{'tags': {}, **e} for e in elements]
+    from_xml, from_json = graph_from_source(str(tmp_path / "city.osm")), graph_from_source(str(tmp_path / "city.json"))
+    assert set(from_xml.edges) == set(from_json.edges)
+
+
+def test_source_without_drivable_ways_fails(tmp_path):
+    with pytest.raises(ValueError, match="No drivable ways"):
+        graph_from_source(write_json(tmp_path / "a.json", [{'osm_type': 'relation'}]))
+
+
+def test_find_sources(tmp_path):
+    assert find_sources(CITY, str(tmp_path)) is None
+
+    # Hash-named osmnx cache files, assigned to cities by sources.json
+    cache_files = [write_json(tmp_path / f"{name}.json", response()) for name in ("9f4d", "3037", "89bf")]
+    write_json(tmp_path / "sources.json", {"3037.json": CITY, "9f4d.json": CITY, "89bf.json": "Elsewhere, USA"})
+
+    # Plus a per-city folder of responses and a stem-named export
+    (tmp_path / "Testville_Florida_USA").mkdir()
+    folder_file = write_json(tmp_path / "Testville_Florida_USA" / "part1.json", response())
+    export = tmp_path / "Testville_Florida_USA.osm"
+    export.write_text("<osm/>")
+
+    assert find_sources(CITY, str(tmp_path)) == [str(export), folder_file, cache_files[1], cache_files[0]]
@@ -0,0 +1,78 @@
+# I M P O R T S   &   D E P E N D E N C I E S ----------------------
+import random
+
+import numpy as np
+import pytest
+
+from conftest import path_cost, synthetic_graph
+from dijkstras import dijkstra
+from dynamicRoute import ActiveRoutes, DynamicRoute
+from trafficWeights import TrafficLayer
+
+# C O N S T A N T S ------------------------------------------------
+
+# Live routes and traffic updates per graph
+ROUTES = 10
+UPDATES = 30
+
+
+# H E L P E R   F U N C T I O N S ----------------------------------
+
+# Route distance and path must match a fresh Dijkstra on the current weights
+def assert_matches_dijkstra(route: DynamicRoute) -> None:
+    expected = dijkstra(route.compiled, route.start_node, route.end_node)[0].get(route.end_node, float('inf'))
+    assert route.distance == pytest.approx(expected, abs=1e-6)
+    if expected < float('inf'):
+        path = route.path()
+        assert path[0] == route.start_node and path[-1] == route.end_node
+        assert path_cost(route.compiled, path) == pytest.approx(expected, abs=1e-6)
+    else:
+        assert route.path() == []
+
+
+# R O U T E   R E P A I R ------------------------------------------
+
+# Congestion on random edges (often on the routes themselves), lifted again now and then, so
+# repairs see both increases and decreases
+@pytest.mark.parametrize("seed", range(4))
+def test_repaired_routes_match_dijkstra(seed):
+    compiled = synthetic_graph(seed)
+    layer = TrafficLayer(compiled)
+    routes = ActiveRoutes(layer)
+    rng = random.Random(seed)
+    nodes = compiled.node_list()
+    sources = compiled.edge_sources()
+
+    for _ in range(ROUTES):
+        routes.add(rng.choice(nodes), rng.choice(nodes))
+
+    for step in range(UPDATES):
+        if step % 7 == 6:
+            layer.reset()
+        else:
+            # Half the edges come from a live route, so repairs actually have work to do
+            route = rng.choice(list(routes.routes.values()))
+            on_route = compiled.edge_ids(route.path()[:-1], route.path()[1:]) if route.path() else []
+            edges = [int(edge) for edge in on_route if rng.random() < 0.5 and edge >= 0]
+            edges += rng.sample(range(compiled.num_edges), 10)
+            us, vs = compiled.node_ids[sources[edges]], compiled.node_ids[compiled.targets[edges]]
+            layer.update(us, vs, [rng.choice([1.0, 1.5, 3.0, 10.0]) for _ in edges])
+
+        for route in routes.routes.values():
+            assert_matches_dijkstra(route)
+
+
+def test_unrelated_change_is_not_repaired():
+    compiled = synthetic_graph(0)
+    layer = TrafficLayer(compiled)
+    nodes = compiled.node_list()
+    route = DynamicRoute(layer.compiled, nodes[0], nodes[-1])
+
+    # An edge out of a node the search never settled cannot affect the route
+    untouched = np.flatnonzero(~np.isin(compiled.edge_sources(), list(route.settled)))
+    edge = int(untouched[0])
+    change = layer.update([compiled.node_ids[compiled.edge_sources()[edge]]],
+                          [compiled.node_ids[compiled.targets[edge]]], [5.0])
+    assert len(change.edges) == 1
+    assert route.repair(change) is False
+    assert_matches_dijkstra(route)
@@ -0,0 +1,67 @@
+# I M P O R T S   &   D E P E N D E N C I E S ----------------------
+import hashlib
+import json
+import os
+
+import pytest
+
+import graphCache
+from graphCache import file_hash, snapshot_key
+
+
+# Counts SHA-1 passes over file contents made by graphCache
+@pytest.fixture
+def sha1_passes(monkeypatch):
+    monkeypatch.setattr(graphCache, '_hashes', {})
+    passes = []
+    sha1 = hashlib.sha1
+
+    def counting_sha1():
+        passes.append(1)
+        return sha1()
+
+    monkeypatch.setattr(graphCache.hashlib, 'sha1', counting_sha1)
+    return passes
+
+
+# F I L E   H A S H ------------------------------------------------
+
+def test_file_hash_is_memoized_until_the_file_changes(tmp_path, sha1_passes):
+    path = tmp_path / "city.graphml"
+    path.write_text("<graphml/>")
+    expected = hashlib.new('sha1', b"<graphml/>").hexdigest()
+
+    assert file_hash(str(path)) == expected
+    assert file_hash(str(path)) == expected
+    assert len(sha1_passes) == 1
+
+    path.write_text("<graphml>changed</graphml>")
+    os.utime(path, ns=(0, os.stat(path).st_mtime_ns + 1))
+    assert file_hash(str(path)) == hashlib.new('sha1', b"<graphml>changed</graphml>").hexdigest()
+    assert len(sha1_passes) == 2
+
+
+def test_snapshot_key_reuses_hash_from_snapshot_meta(tmp_path, sha1_passes):
+    path = tmp_path / "city.graphml"
+    path.write_text("<graphml/>")
+    stat = os.stat(path)
+    cache_dir = tmp_path / "graphs"
+
+    # A snapshot written by an earlier process for this exact file
+    snapshot = cache_dir / f"city-0123456789abcdef-{stat.st_mtime_ns}"
+    snapshot.mkdir(parents=True)
+    (snapshot / "meta.json").write_text(json.dumps({
+        'source': str(path), 'source_size': stat.st_size, 'source_mtime_ns': stat.st_mtime_ns,
+        'source_sha1': '0123456789abcdef' + '0' * 24,
+    }))
+
+    assert snapshot_key(str(path), str(cache_dir)) == f"0123456789abcdef-{stat.st_mtime_ns}"
+    assert file_hash(str(path)) == '0123456789abcdef' + '0' * 24
+    assert sha1_passes == []
+
+    # Size differs from the snapshot's source: hash the file
+    path.write_text("<graphml>longer</graphml>")
+    os.utime(path, ns=(0, stat.st_mtime_ns))
+    expected = hashlib.new('sha1', b"<graphml>longer</graphml>").hexdigest()
+    assert snapshot_key(str(path), str(cache_dir)) == f"{expected[:16]}-{stat.st_mtime_ns}"
+    assert len(sha1_passes) == 1
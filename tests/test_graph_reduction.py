@@ -0,0 +1,95 @@
+# I M P O R T S   &   D E P E N D E N C I E S ----------------------
+import random
+
+import pytest
+
+from conftest import path_cost, synthetic_graph
+from dijkstras import dijkstra, reconstruct_path
+from graphReduction import Reachability, reduce_graph, reduction_report
+
+# C O N S T A N T S ------------------------------------------------
+
+# Random origin-destination pairs per graph
+PAIRS = 100
+
+# Share of grid streets left out, so graphs have several components and long degree-2 chains
+DROP = 0.4
+
+
+# R E D U C E D   G R A P H ----------------------------------------
+
+# Distances between kept nodes are exact, and expanded paths are real paths of that cost
+@pytest.mark.parametrize("seed", range(4))
+def test_reduced_queries_match_dijkstra(seed):
+    compiled = synthetic_graph(seed, drop=DROP)
+    reduced = reduce_graph(compiled)
+    assert reduced.report['components'] > 1 and reduced.report['shape_nodes'] > 0
+    kept = reduced.osm_ids.tolist()
+    rng = random.Random(seed)
+
+    for _ in range(PAIRS):
+        start_node, end_node = rng.choice(kept), rng.choice(kept)
+        expected = dijkstra(compiled, start_node, end_node)[0][end_node]
+
+        start, end = reduced.to_dense(start_node), reduced.to_dense(end_node)
+        distances, previous, _ = dijkstra(reduced.compiled, start, end)
+        assert distances[end] == pytest.approx(expected, abs=1e-6)
+
+        path = reduced.to_osm(reconstruct_path(previous, start, end))
+        assert path[0] == start_node and path[-1] == end_node
+        assert path_cost(compiled, path) == pytest.approx(expected, abs=1e-6)
+
+
+# Every core node is either kept or a shape node (collapsed into a chain edge, or into a parallel
+# chain dropped for a cheaper one) that snaps to a kept node; protected nodes stay
+@pytest.mark.parametrize("seed", range(4))
+def test_core_nodes_are_kept_or_shape_nodes(seed):
+    compiled = synthetic_graph(seed, drop=DROP)
+    unprotected = reduce_graph(compiled)
+    shape_nodes = sorted(unprotected.shape_to)
+    protect = shape_nodes[::2]
+    reduced = reduce_graph(compiled, protect=protect)
+
+    kept, shapes = set(reduced.osm_ids.tolist()), set(reduced.shape_to)
+    assert set(protect) <= kept
+    assert not kept & shapes
+    assert set(reduced.via_nodes.tolist()) <= shapes
+    assert len(kept) + len(shapes) == reduced.report['core_nodes']
+    for node in shapes:
+        assert 0 <= reduced.to_dense(node) < reduced.compiled.num_nodes
+
+    # Without compression only the core is taken
+    whole = reduce_graph(compiled, compress=False)
+    assert whole.compiled.num_nodes == whole.report['core_nodes'] and len(whole.via_nodes) == 0
+
+
+def test_nodes_outside_core_are_rejected():
+    compiled = synthetic_graph(0, drop=DROP)
+    reduced = reduce_graph(compiled)
+    outside = set(compiled.node_list()) - set(reduced.osm_ids.tolist()) - set(reduced.shape_to)
+    with pytest.raises(ValueError):
+        reduced.to_dense(next(iter(outside)))
+
+
+# R E A C H A B I L I T Y ------------------------------------------
+
+@pytest.mark.parametrize("seed", range(4))
+def test_reachability_matches_dijkstra(seed):
+    compiled = synthetic_graph(seed, drop=DROP)
+    reachability = Reachability(compiled)
+    nodes = compiled.node_list()
+    rng = random.Random(seed)
+
+    answers = set()
+    for _ in range(PAIRS):
+        start_node, end_node = rng.choice(nodes), rng.choice(nodes)
+        expected = dijkstra(compiled, start_node, end_node)[0].get(end_node, float('inf')) < float('inf')
+        assert reachability.reachable(start_node, end_node) == expected
+        answers.add(expected)
+    assert answers == {True, False}
+
+
+def test_report_finds_no_mismatches():
+    report, mismatches = reduction_report(synthetic_graph(1, drop=DROP), queries=50)
+    assert mismatches == 0
+    assert report['reduced_nodes'] < report['core_nodes'] <= report['nodes']
@@ -0,0 +1,104 @@
+# I M P O R T S   &   D E P E N D E N C I E S ----------------------
+import random
+
+import numpy as np
+import pytest
+
+from conftest import synthetic_graph
+from heuristics import HaversineHeuristic
+from compiledGraph import CompiledGraph
+
+
+# Targets checked per graph
+def sample_targets(compiled: CompiledGraph, count: int = 5):
+    return random.Random(0).sample(range(compiled.num_nodes), min(count, compiled.num_nodes))
+
+
+# H A V E R S I N E   H E U R I S T I C ----------------------------
+
+def test_consistent_on_synthetic_graph(random_graph):
+    heuristic = HaversineHeuristic(random_graph)
+    assert heuristic.scale == 1.0
+    for target in sample_targets(random_graph):
+        assert heuristic.violations(target).size == 0
+
+
+def test_consistent_under_non_metre_weights(random_graph):
+    # Seconds at ~20 m/s: the heuristic must shrink to a speed bound instead of overestimating
+    travel_time = CompiledGraph(random_graph.node_ids, random_graph.offsets, random_graph.targets,
+                                random_graph.weights / 20.0, random_graph.lat, random_graph.lon, weight='travel_time')
+    heuristic = HaversineHeuristic(travel_time)
+    assert heuristic.scale < 1.0
+    for target in sample_targets(travel_time):
+        assert heuristic.violations(target).size == 0
+
+
+def test_matches_scalar_and_call(random_graph):
+    heuristic = HaversineHeuristic(random_graph)
+    target = random_graph.num_nodes - 1
+    h = heuristic.for_target(target)
+    nodes = np.arange(random_graph.num_nodes)
+    expected = heuristic.batch(nodes, target)
+    assert np.allclose([h(node) for node in nodes], expected)
+    assert np.allclose([heuristic.scalar(node, target) for node in nodes], expected)
+    assert np.isclose(heuristic(int(random_graph.node_ids[0]), int(random_graph.node_ids[target])), expected[0])
+
+
+def test_consistent_on_bundled_graph(bundled_graph):
+    heuristic = HaversineHeuristic(bundled_graph)
+    for target in sample_targets(bundled_graph):
+        assert heuristic.violations(target).size == 0
+
+
+def test_reports_edge_shorter_than_straight_line(random_graph):
+    # Cut one edge to half its straight-line length; the pinned metre scale must then flag it
+    source = int(np.flatnonzero(np.diff(random_graph.offsets))[0])
+    edge = int(random_graph.offsets[source])
+    target = int(random_graph.targets[edge])
+    weights = random_graph.weights.copy()
+    weights[edge] = HaversineHeuristic(random_graph).scalar(source, target) / 2
+    shortened = CompiledGraph(random_graph.node_ids, random_graph.offsets, random_graph.targets, weights,
+                              random_graph.lat, random_graph.lon)
+
+    heuristic = HaversineHeuristic(shortened)
+    heuristic.scale = 1.0
+    assert edge in heuristic.violations(target)
+
+
+def test_warns_and_names_edges_that_collapse_the_scale(random_graph):
+    # One zero-length edge between distinct coordinates forces scale to 0
+    edge = int(random_graph.offsets[np.flatnonzero(np.diff(random_graph.offsets))[0]])
+    weights = random_graph.weights.copy()
+    weights[edge] = 0.0
+    broken = CompiledGraph(random_graph.node_ids, random_graph.offsets, random_graph.targets, weights,
+                           random_graph.lat, random_graph.lon)
+
+    with pytest.warns(UserWarning, match=f"1 edges are far cheaper .*edge indices {edge}\\)"):
+        heuristic = HaversineHeuristic(broken)
+    assert heuristic.scale == 0.0
+    assert heuristic.slack_outliers().tolist() == [edge]
+
+
+def test_no_outliers_on_regular_graphs(random_graph, recwarn):
+    assert HaversineHeuristic(random_graph).slack_outliers().size == 0
+    assert not recwarn.list
+
+
+def test_metres_ignores_scale(random_graph):
+    travel_time = CompiledGraph(random_graph.node_ids, random_graph.offsets, random_graph.targets,
+                                random_graph.weights / 20.0, random_graph.lat, random_graph.lon, weight='travel_time')
+    scaled, unscaled = HaversineHeuristic(travel_time), HaversineHeuristic(random_graph)
+    assert scaled.metres(0, 5) == pytest.approx(unscaled.metres(0, 5))
+    assert scaled.scalar(0, 5) == pytest.approx(scaled.scale * unscaled.metres(0, 5))
+
+
+def test_benchmark_buckets_survive_collapsed_scale():
+    from benchmark import bucketed_pairs
+
+    compiled = synthetic_graph(0, rows=30, cols=30)
+    weights = compiled.weights.copy()
+    weights[0] = 0.0
+    broken = CompiledGraph(compiled.node_ids, compiled.offsets, compiled.targets, weights, compiled.lat, compiled.lon)
+    with pytest.warns(UserWarning):
+        pairs = bucketed_pairs(broken, pairs_per_bucket=5, seed=0, max_attempts=2000)
+    assert len(pairs["0-1km"]) == 5
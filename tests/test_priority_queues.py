@@ -0,0 +1,89 @@
+# I M P O R T S   &   D E P E N D E N C I E S ----------------------
+import heapq
+import random
+
+import pytest
+
+from a_star import a_star
+from conftest import path_cost, synthetic_graph
+from dijkstras import dijkstra, reconstruct_path
+from heuristics import HaversineHeuristic
+from priorityQueues import QUEUE_BACKENDS, IndexedHeap, RadixHeap, make_queue
+
+# C O N S T A N T S ------------------------------------------------
+
+# Random origin-destination pairs per graph
+PAIRS = 40
+
+
+# D I F F E R E N T I A L   C H E C K S ----------------------------
+
+# Every backend, under Dijkstra and A*, must reproduce lazy-heapq Dijkstra's distances
+# (float lengths and whole-metre lengths, whose ties exercise the radix heap's equal-key bucket)
+@pytest.mark.parametrize("round_weights", [False, True], ids=["float", "integer"])
+@pytest.mark.parametrize("seed", range(4))
+@pytest.mark.parametrize("backend", QUEUE_BACKENDS)
+def test_backends_match_heapq_dijkstra(backend, seed, round_weights):
+    compiled = synthetic_graph(seed, round_weights=round_weights)
+    heuristic = HaversineHeuristic(compiled)
+    nodes = compiled.node_list()
+    rng = random.Random(seed)
+
+    for _ in range(PAIRS):
+        start, end = rng.choice(nodes), rng.choice(nodes)
+        expected = dijkstra(compiled, start, end)[0].get(end, float('inf'))
+
+        for search in (lambda: dijkstra(compiled, start, end, queue=backend),
+                       lambda: a_star(compiled, start, end, heuristic, {}, queue=backend)):
+            distances, previous, _ = search()
+            distance = distances.get(end, float('inf'))
+            assert distance == pytest.approx(expected, abs=1e-6)
+            if distance < float('inf'):
+                assert path_cost(compiled, reconstruct_path(previous, start, end)) == pytest.approx(expected, abs=1e-6)
+
+
+# Q U E U E S ------------------------------------------------------
+
+# Monotone push/pop sequences (as Dijkstra issues them) come out in exact key order
+@pytest.mark.parametrize("backend", QUEUE_BACKENDS)
+def test_queue_pops_in_key_order(backend):
+    rng = random.Random(7)
+    queue, push, pop = make_queue(backend)
+    reference = []
+    last = 0.0
+    for step in range(2000):
+        if reference and rng.random() < 0.4:
+            key, node = pop(queue)
+            expected_key, _ = heapq.heappop(reference)
+            assert key == expected_key
+            assert key >= last
+            last = key
+        else:
+            key = last + rng.choice([0.0, rng.random() * 50, float(rng.randint(0, 50))])
+            push(queue, (key, step))
+            heapq.heappush(reference, (key, step))
+    while reference:
+        assert pop(queue)[0] == heapq.heappop(reference)[0]
+    assert len(queue) == 0
+
+
+def test_indexed_heap_decreases_in_place():
+    heap = IndexedHeap()
+    heap.push((10.0, 1))
+    heap.push((5.0, 2))
+    heap.push((3.0, 1))
+    assert len(heap) == 2
+    assert heap.decreases == 1
+    assert heap.pop() == (3.0, 1)
+    assert heap.pop() == (5.0, 2)
+
+
+def test_radix_heap_keeps_keys_below_last_exact():
+    heap = RadixHeap()
+    for key in (4.0, 9.5, 9.2):
+        heap.push((key, int(key * 10)))
+    assert heap.pop() == (4.0, 40)
+
+    # Floating point noise can push a key just under the last popped one
+    heap.push((3.9999999, 1))
+    assert [heap.pop()[0] for _ in range(3)] == [3.9999999, 9.2, 9.5]
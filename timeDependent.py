@@ -0,0 +1,291 @@
+# I M P O R T S   &   D E P E N D E N C I E S ----------------------
+import argparse
+import heapq
+import os
+import random
+import time
+from typing import Callable, List, Optional, Tuple
+
+import numpy as np
+
+from compiledGraph import CompiledGraph, DistanceMap, PredecessorMap
+from dijkstras import reconstruct_path
+from searchState import SearchState
+
+# C O N S T A N T S ------------------------------------------------
+DAY_SECONDS = 24 * 3600
+
+# Profile resolution: 96 buckets of 15 minutes
+NUM_BUCKETS = 96
+
+# Bump when the artifact layout changes so old artifacts are rebuilt
+PROFILE_VERSION = 1
+
+# Road classes sharing a profile, by osmnx 'highway' tag (anything else is 'local')
+ROAD_CLASSES = ('local', 'arterial', 'highway')
+_HIGHWAY_CLASS = {
+    'motorway': 2, 'motorway_link': 2, 'trunk': 2, 'trunk_link': 2,
+    'primary': 1, 'primary_link': 1, 'secondary': 1, 'secondary_link': 1, 'tertiary': 1, 'tertiary_link': 1,
+}
+
+# Peak slowdown per road class (travel time multiplier at the height of rush hour, minus 1)
+_PEAK_SLOWDOWN = (0.15, 0.6, 1.0)
+
+
+# S P E E D   P R O F I L E S --------------------------------------
+
+# Typical weekday congestion: morning peak around 08:00, longer evening peak around 17:30
+def _rush_hour(hours: np.ndarray) -> np.ndarray:
+    return np.maximum(np.exp(-((hours - 8.0) / 1.0) ** 2), np.exp(-((hours - 17.5) / 1.5) ** 2))
+
+
+# Default (num_classes, NUM_BUCKETS) travel time multipliers, all >= 1
+def default_profiles(num_buckets: int = NUM_BUCKETS) -> np.ndarray:
+    hours = np.arange(num_buckets) * 24.0 / num_buckets
+    return np.stack([1.0 + slowdown * _rush_hour(hours) for slowdown in _PEAK_SLOWDOWN])
+
+
+# T I M E - D E P E N D E N T   G R A P H --------------------------
+
+# Travel-time graph whose edge costs depend on the time they are entered
+#   compiled.weights[e]        -> free-flow travel time of edge e in seconds
+#   edge_profile[e]            -> row of profiles used by edge e
+#   profiles[p, b]             -> travel time multiplier (>= 1) at the start of bucket b
+# Multipliers are linearly interpolated between bucket starts and wrap around midnight.
+# Costs are never below free flow, so static travel-time heuristics stay admissible.
+class TimeDependentGraph:
+    def __init__(self, compiled: CompiledGraph, edge_profile: np.ndarray, profiles: np.ndarray,
+                 source_hash: str = ''):
+        if len(edge_profile) != compiled.num_edges:
+            raise ValueError(f"Expected {compiled.num_edges} edge profiles, got {len(edge_profile)}")
+        if np.any(profiles < 1.0):
+            raise ValueError("Profile multipliers must be >= 1 (free flow is the fastest an edge can be)")
+
+        self.compiled = compiled
+        self.edge_profile = edge_profile
+        self.profiles = profiles
+        self.source_hash = source_hash
+        self.bucket_seconds = DAY_SECONDS / profiles.shape[1]
+
+        # List mirrors for the search loop; profiles get a wrap-around column so bucket + 1 never overflows
+        self._lists: Optional[Tuple[List[float], List[int], List[List[float]]]] = None
+
+    @property
+    def num_buckets(self) -> int:
+        return self.profiles.shape[1]
+
+    def lists(self) -> Tuple[List[float], List[int], List[List[float]]]:
+        if self._lists is None:
+            wrapped = np.concatenate((self.profiles, self.profiles[:, :1]), axis=1)
+            self._lists = (np.asarray(self.compiled.weights, dtype=np.float64).tolist(),
+                           self.edge_profile.tolist(), wrapped.tolist())
+        return self._lists
+
+    # Travel time of edges entered at time t (seconds since midnight), vectorised
+    def travel_time(self, edges: np.ndarray, t: float) -> np.ndarray:
+        position = (t % DAY_SECONDS) / self.bucket_seconds
+        bucket = int(position)
+        frac = position - bucket
+        rows = self.profiles[self.edge_profile[edges]]
+        factor = rows[:, bucket] + (rows[:, (bucket + 1) % self.num_buckets] - rows[:, bucket]) * frac
+        return np.asarray(self.compiled.weights, dtype=np.float64)[edges] * factor
+
+    # Edges that can be overtaken (entering later arrives earlier), breaking FIFO:
+    # arrival t + w * f(t) must not decrease, i.e. w * |slope of f| <= 1 per second
+    def fifo_violations(self) -> np.ndarray:
+        steps = np.abs(np.diff(self.profiles, axis=1, append=self.profiles[:, :1])).max(axis=1)
+        slope = np.asarray(self.compiled.weights, dtype=np.float64) * steps[self.edge_profile] / self.bucket_seconds
+        return np.flatnonzero(slope > 1.0)
+
+    def save(self, path: str) -> None:
+        np.savez(path, version=PROFILE_VERSION, source_hash=self.source_hash,
+                 edge_profile=self.edge_profile, profiles=self.profiles)
+
+    # Loads profiles for a compiled travel-time graph; None if missing, stale or mismatched
+    @classmethod
+    def load(cls, path: str, compiled: CompiledGraph, source_hash: Optional[str] = None) -> Optional['TimeDependentGraph']:
+        if not os.path.exists(path):
+            return None
+        with np.load(path) as data:
+            if int(data['version']) != PROFILE_VERSION:
+                return None
+            if source_hash is not None and str(data['source_hash']) != source_hash:
+                return None
+            if len(data['edge_profile']) != compiled.num_edges:
+                return None
+            return cls(compiled, data['edge_profile'], data['profiles'], str(data['source_hash']))
+
+
+# Road class of every CSR edge, taken from the fastest parallel edge (the one compile_graph kept)
+def edge_classes(graph, compiled: CompiledGraph) -> np.ndarray:
+    fastest = {}
+    for u, v, data in graph.edges(data=True):
+        cost = float(data.get(compiled.weight, 1))
+        if (u, v) not in fastest or cost < fastest[(u, v)][0]:
+            highway = data.get('highway', '')
+            if isinstance(highway, list):
+                highway = highway[0] if highway else ''
+            fastest[(u, v)] = (cost, _HIGHWAY_CLASS.get(highway, 0))
+
+    us, vs = zip(*fastest) if fastest else ((), ())
+    edge_ids = compiled.edge_ids(us, vs)
+    classes = np.zeros(compiled.num_edges, dtype=np.int8)
+    known = edge_ids >= 0
+    classes[edge_ids[known]] = np.fromiter((c for _, c in fastest.values()), dtype=np.int8, count=len(fastest))[known]
+    return classes
+
+
+# Time-dependent graph with the default road-class profiles
+# graph must carry travel_time attributes (see trafficWeights.add_travel_times), compiled its travel-time form
+def build_time_dependent(graph, compiled: CompiledGraph, profiles: Optional[np.ndarray] = None,
+                         source_hash: str = '') -> TimeDependentGraph:
+    profiles = default_profiles() if profiles is None else profiles
+    return TimeDependentGraph(compiled, edge_classes(graph, compiled), profiles, source_hash)
+
+
+# Profile artifact path for a GraphML file: <city>.profiles.npz next to it
+def profiles_path(graph_file: str) -> str:
+    return os.path.splitext(graph_file)[0] + ".profiles.npz"
+
+
+# Seconds since midnight from a number or a datetime/time
+def seconds_of_day(departure) -> float:
+    if hasattr(departure, 'hour'):
+        return departure.hour * 3600 + departure.minute * 60 + departure.second + departure.microsecond / 1e6
+    return float(departure)
+
+
+# S E A R C H ------------------------------------------------------
+
+# Earliest-arrival search from start_node leaving at departure (seconds since midnight or a datetime)
+# Same (distances, previous, visited) contract as dijkstra(); distances are seconds after departure
+# heuristic: optional static travel-time lower bound provider (e.g. HaversineHeuristic on the
+# travel-time graph); profiles never beat free flow, so it stays admissible and the search becomes A*
+def td_search(td: TimeDependentGraph, start_node: int, end_node: int, departure,
+              heuristic=None, state: Optional[SearchState] = None) -> Tuple[DistanceMap, PredecessorMap, set]:
+
+    compiled = td.compiled
+    offsets, targets, _ = compiled.adjacency()
+    base, edge_profile, profiles = td.lists()
+    source = compiled.node_index(start_node)
+    target = compiled.node_index(end_node)
+
+    departure = seconds_of_day(departure) % DAY_SECONDS
+    inv_bucket = 1.0 / td.bucket_seconds
+    num_buckets = td.num_buckets
+
+    state = state or compiled.search_state()
+    epoch = state.begin(source)
+    elapsed, previous, stamp, closed = state.dist, state.prev, state.stamp, state.closed
+    touched, settled = state.touched, state.settled
+
+    h: Callable[[int], float] = heuristic.for_target(target) if heuristic is not None else (lambda node: 0.0)
+    pq = [(h(source), 0.0, source)]
+
+    while pq:
+        _, current_elapsed, current_node = heapq.heappop(pq)
+
+        if current_node == target:
+            break
+        if closed[current_node] == epoch:
+            continue
+        closed[current_node] = epoch
+        settled.append(current_node)
+
+        # Position in the daily profile when leaving current_node
+        position = ((departure + current_elapsed) * inv_bucket) % num_buckets
+        bucket = int(position)
+        frac = position - bucket
+
+        for edge in range(offsets[current_node], offsets[current_node + 1]):
+            neighbor = targets[edge]
+            if closed[neighbor] == epoch:
+                continue
+
+            row = profiles[edge_profile[edge]]
+            factor = row[bucket] + (row[bucket + 1] - row[bucket]) * frac
+            arrival = current_elapsed + base[edge] * factor
+
+            if stamp[neighbor] != epoch:
+                stamp[neighbor] = epoch
+                touched.append(neighbor)
+            elif arrival >= elapsed[neighbor]:
+                continue
+
+            elapsed[neighbor] = arrival
+            previous[neighbor] = current_node
+            heapq.heappush(pq, (arrival + h(neighbor), arrival, neighbor))
+
+    return compiled.export_search(state)
+
+
+# Earliest-arrival route: (path, travel seconds, ETA in seconds since the departure day's midnight)
+# Path is empty and times are inf when end_node is unreachable
+def td_route(td: TimeDependentGraph, start_node: int, end_node: int, departure,
+             heuristic=None) -> Tuple[List[int], float, float]:
+    elapsed, previous, _ = td_search(td, start_node, end_node, departure, heuristic)
+    travel = elapsed[end_node]
+    if travel == float('inf'):
+        return [], travel, travel
+    return reconstruct_path(previous, start_node, end_node), travel, seconds_of_day(departure) + travel
+
+
+# M A I N ----------------------------------------------------------
+
+# Builds profiles for a GraphML file and reports the overhead of time-dependent search over static weights
+def main() -> None:
+    from dijkstras import dijkstra
+    from graphCache import file_hash, load_graph
+    from heuristics import HaversineHeuristic
+    from trafficWeights import compile_travel_time
+
+    parser = argparse.ArgumentParser(description="Time-dependent routing profiles and overhead benchmark")
+    parser.add_argument("graph_file", nargs='?', default="data/gainesville.graphml")
+    parser.add_argument("--pairs", type=int, default=100, help="Random queries per departure time")
+    parser.add_argument("--departures", default="2,8,17.5", help="Comma separated departure hours")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    graph = load_graph(args.graph_file)[0]
+    compiled = compile_travel_time(graph)
+    td = build_time_dependent(graph, compiled, source_hash=file_hash(args.graph_file))
+    td.save(profiles_path(args.graph_file))
+    print(f"Saved profiles for {compiled.num_edges} edges ({profiles_path(args.graph_file)}), "
+          f"{len(td.fifo_violations())} FIFO violations")
+
+    heuristic = HaversineHeuristic(compiled)
+    rng = random.Random(args.seed)
+    nodes = compiled.node_list()
+    pairs = [tuple(rng.sample(nodes, 2)) for _ in range(args.pairs)]
+
+    # Warm the list mirrors so first-touch cost is not billed to either side
+    td.lists()
+    compiled.adjacency()
+
+    static_start_time = time.perf_counter()
+    static = [dijkstra(compiled, s, t)[0][t] for s, t in pairs]
+    static_time = time.perf_counter() - static_start_time
+    print(f"Static dijkstra: {static_time / len(pairs) * 1000:.3f} ms/query")
+
+    for hour in (float(h) for h in args.departures.split(',')):
+        departure = hour * 3600
+
+        td_start_time = time.perf_counter()
+        travel = [td_search(td, s, t, departure)[0][t] for s, t in pairs]
+        td_time = time.perf_counter() - td_start_time
+
+        astar_start_time = time.perf_counter()
+        for s, t in pairs:
+            td_search(td, s, t, departure, heuristic)
+        astar_time = time.perf_counter() - astar_start_time
+
+        reachable = [(a, b) for a, b in zip(travel, static) if a != float('inf')]
+        slowdown = np.mean([a / b for a, b in reachable if b > 0]) if reachable else float('nan')
+        print(f"Depart {int(hour):02d}:{int(hour % 1 * 60):02d}  "
+              f"td dijkstra {td_time / len(pairs) * 1000:.3f} ms/query ({td_time / static_time:.2f}x static), "
+              f"td A* {astar_time / len(pairs) * 1000:.3f} ms/query, "
+              f"trips {slowdown:.2f}x free-flow time")
+
+
+if __name__ == "__main__":
+    main()
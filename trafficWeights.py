@@ -0,0 +1,166 @@
+# I M P O R T S   &   D E P E N D E N C I E S ----------------------
+import csv
+import os
+import queue
+import socketserver
+import threading
+from typing import Callable, Iterable, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+from compiledGraph import CompiledGraph, compile_graph
+
+# C O N S T A N T S ------------------------------------------------
+
+# Edge weight used for traffic-aware routing (seconds)
+TRAVEL_TIME = 'travel_time'
+
+
+# T R A V E L   T I M E --------------------------------------------
+
+# Adds osmnx speed_kph / travel_time attributes to every edge (imputing missing maxspeeds per highway type)
+def add_travel_times(graph, hwy_speeds: Optional[dict] = None, fallback: Optional[float] = None):
+    import osmnx as ox
+
+    graph = ox.add_edge_speeds(graph, hwy_speeds=hwy_speeds, fallback=fallback)
+    return ox.add_edge_travel_times(graph)
+
+
+# Compiles a graph weighted by free-flow travel time in seconds
+def compile_travel_time(graph, hwy_speeds: Optional[dict] = None, fallback: Optional[float] = None) -> CompiledGraph:
+    return compile_graph(add_travel_times(graph, hwy_speeds, fallback), weight=TRAVEL_TIME)
+
+
+# T R A F F I C   L A Y E R ----------------------------------------
+
+# Edges whose weight changed in one update, by CSR edge id with tail/head indices
+class WeightChange(NamedTuple):
+    edges: np.ndarray
+    tails: np.ndarray
+    heads: np.ndarray
+    old: np.ndarray
+    new: np.ndarray
+
+
+# Live congestion on top of a compiled graph's free-flow weights
+#   base[e]        -> free-flow weight of edge e (length or travel time)
+#   congestion[e]  -> multiplier >= 1 (1 = free flow)
+# The layer works on its own copy of the graph (self.compiled, sharing topology with the one passed
+# in), kept equal to base * congestion, so searches on that copy see traffic while the original,
+# e.g. the registry's cached city, stays at free flow for the next session.
+# Multipliers never drop below 1, so haversine and ALT lower bounds stay admissible
+# (contraction hierarchies are built on the base weights and do not see traffic).
+class TrafficLayer:
+    def __init__(self, compiled: CompiledGraph):
+        self.compiled = compiled.with_private_weights()
+        self.base = np.array(compiled.weights, dtype=np.float64)
+        self.congestion = np.ones(compiled.num_edges)
+        self.version = 0
+
+        # Called with each WeightChange (route repair, cache invalidation, redraws)
+        self.listeners: List[Callable[[WeightChange], None]] = []
+
+        # Batches queued by feed threads, applied on the routing thread by apply_pending()
+        self._pending: 'queue.Queue[Tuple[list, list, list]]' = queue.Queue()
+
+    # Sets congestion multipliers for (u, v) OSM id pairs; unknown edges are ignored
+    # Returns the change (possibly empty) after notifying listeners
+    def update(self, us: Iterable[int], vs: Iterable[int], multipliers: Iterable[float]) -> WeightChange:
+        edge_ids = self.compiled.edge_ids(list(us), list(vs))
+        multipliers = np.maximum(np.asarray(list(multipliers), dtype=np.float64), 1.0)
+
+        known = edge_ids >= 0
+        edge_ids, multipliers = edge_ids[known], multipliers[known]
+
+        # Last value wins when a feed repeats an edge
+        edge_ids, last = np.unique(edge_ids[::-1], return_index=True)
+        multipliers = multipliers[::-1][last]
+
+        changed = self.congestion[edge_ids] != multipliers
+        return self._apply(edge_ids[changed], multipliers[changed])
+
+    # Back to free flow everywhere
+    def reset(self) -> WeightChange:
+        edge_ids = np.flatnonzero(self.congestion != 1.0)
+        return self._apply(edge_ids, np.ones(len(edge_ids)))
+
+    def _apply(self, edge_ids: np.ndarray, multipliers: np.ndarray) -> WeightChange:
+        compiled = self.compiled
+        old = np.asarray(compiled.weights[edge_ids], dtype=np.float64)
+
+        self.congestion[edge_ids] = multipliers
+        new = self.base[edge_ids] * multipliers
+
+        tails = np.searchsorted(compiled.offsets, edge_ids, side='right') - 1
+        change = WeightChange(edge_ids, tails, compiled.targets[edge_ids].astype(np.int64), old, new)
+        if len(edge_ids) == 0:
+            return change
+
+        compiled.set_weights(edge_ids, new)
+        self.version += 1
+        for listener in self.listeners:
+            listener(change)
+        return change
+
+    # F E E D S ----------------------------------------------------
+
+    # Queues a batch from another thread (the feed listener); applied by apply_pending()
+    def submit(self, us: list, vs: list, multipliers: list) -> None:
+        self._pending.put((us, vs, multipliers))
+
+    # Applies every queued batch as one update; returns the combined change or None if nothing queued
+    def apply_pending(self) -> Optional[WeightChange]:
+        us, vs, multipliers = [], [], []
+        while True:
+            try:
+                batch = self._pending.get_nowait()
+            except queue.Empty:
+                break
+            us.extend(batch[0])
+            vs.extend(batch[1])
+            multipliers.extend(batch[2])
+        return self.update(us, vs, multipliers) if us else None
+
+
+# Default feed file for a GraphML: <city>.traffic.csv next to it
+def feed_path(graph_file: str) -> str:
+    return os.path.splitext(graph_file)[0] + ".traffic.csv"
+
+
+# Parses feed lines "u,v,multiplier" (OSM ids); blank lines, comments and a header are skipped
+def parse_feed(lines: Iterable[str]) -> Tuple[List[int], List[int], List[float]]:
+    us, vs, multipliers = [], [], []
+    for row in csv.reader(lines):
+        if not row or row[0].lstrip().startswith('#'):
+            continue
+        try:
+            u, v, multiplier = int(row[0]), int(row[1]), float(row[2])
+        except (ValueError, IndexError):
+            continue
+        us.append(u)
+        vs.append(v)
+        multipliers.append(multiplier)
+    return us, vs, multipliers
+
+
+# Applies a feed file to the layer in one bulk update
+def load_feed(layer: TrafficLayer, path: str) -> WeightChange:
+    with open(path, newline='') as f:
+        return layer.update(*parse_feed(f))
+
+
+# Stand-in for a live traffic socket: every TCP connection sends feed lines, queued as one batch
+# Returns the running server (call shutdown() to stop); updates land on the next apply_pending()
+def serve_feed(layer: TrafficLayer, host: str = '127.0.0.1', port: int = 0) -> socketserver.TCPServer:
+
+    class FeedHandler(socketserver.StreamRequestHandler):
+        def handle(self):
+            lines = (line.decode('utf-8', 'replace') for line in self.rfile)
+            batch = parse_feed(lines)
+            if batch[0]:
+                layer.submit(*batch)
+
+    server = socketserver.ThreadingTCPServer((host, port), FeedHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server